@@ -1,27 +1,45 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, g, Response
+from flask.json import JSONEncoder
 import json
 import os
 from datetime import datetime, timedelta
 import secrets
+import base64
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
-from functools import wraps
-from youtube.youtube_api import get_videos_for_channels, get_channel_videos, get_channel_id_from_url
+from functools import wraps, partial
+from youtube.youtube_api import get_videos_for_channels, get_channel_videos, get_channel_id_from_url, known_channel_id, load_more_channel_videos, link_quota_cost
+from youtube.fetch_engine import fetch_all, new_deadline
+from youtube.quota_governor import quota_governor
+from youtube.retry_decorator import set_retry_deadline, reset_retry_deadline
+from youtube.metrics import http_request_duration, render_metrics
+from youtube.video_record import Video
+from guide_prewarmer import GuidePrewarmer, estimate_quota_cost
+from schedule_engine import ScheduleEngine
+from page_cache import PageCache, page_response
+from channel_repository import ChannelRepository, ChannelNotFoundError, sort_key
 import pytz
 
 app = Flask(__name__)
 
+# Cached videos are shared Video records, which jsonify sends as plain objects
+class AppJSONEncoder(JSONEncoder):
+    def default(self, o):
+        if isinstance(o, Video):
+            return o.to_dict()
+        return super().default(o)
+
+app.json_encoder = AppJSONEncoder
+
 # Add a secret key for session management
 app.secret_key = os.getenv('FLASK_SECRET_KEY', secrets.token_hex(16))
 
 # Define the server's time zone
 SERVER_TZ = pytz.timezone('UTC')
 
-# Load data from JSON file
+# Load data from JSON file (re-parsed only when the file changes)
 def load_data():
-    with open(os.path.join('data', 'data.json')) as f:
-        data = json.load(f)
-        validate_data(data)
-        return data
+    return channel_repository.all()
 
 # Validate data loaded from JSON file
 def validate_data(data):
@@ -35,26 +53,50 @@ def validate_data(data):
         if channel['displayOption'] not in ['random', 'popular', 'new']:
             raise ValueError("'displayOption' must be one of 'random', 'popular', or 'new'")
 
+# Channel lineup with id/stationId indexes and atomic, locked writes
+channel_repository = ChannelRepository(os.path.join('data', 'data.json'), validate=validate_data)
+
 # Save data to JSON file
 def save_data(data):
-    with open(os.path.join('data', 'data.json'), 'w') as f:
-        json.dump(data, f, indent=4)
+    channel_repository.replace_all(data)
+    data_changed()
+
+# Rebuild the guide snapshot with the new lineup
+def data_changed():
+    guide_prewarmer.request_refresh()
+
+# Time every request for the latency histograms on /metrics
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+# Bound every retry wait in a request by its fetch deadline, not only the
+# ones inside fetch_all
+@app.before_request
+def start_retry_deadline():
+    g.retry_deadline_token = set_retry_deadline(new_deadline())
+
+@app.teardown_request
+def end_retry_deadline(exc):
+    token = g.pop('retry_deadline_token', None)
+    if token is not None:
+        reset_retry_deadline(token)
+
+@app.after_request
+def record_request_latency(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+    return response
 
 # Get the current time in the server's time zone
 def get_current_time():
     return datetime.now(SERVER_TZ)
 
-# Determine if a video is in the current time slot
-def is_current_time_slot(video_index, total_videos):
-    now = get_current_time()
-    minutes_since_midnight = now.hour * 60 + now.minute
-    if total_videos == 0:
-        return False
-    minutes_per_slot = (24 * 60) / total_videos
-    video_start_time = video_index * minutes_per_slot
-    video_end_time = video_start_time + minutes_per_slot
-    return video_start_time <= minutes_since_midnight < video_end_time
-
 # Simple API key protection for API endpoints
 def require_api_key(view_function):
     @wraps(view_function)
@@ -76,111 +118,455 @@ def require_api_key(view_function):
         return view_function(*args, **kwargs)
     return decorated_function
 
+# A station's YouTube channel ID: the one stored when it was saved, or else
+# its first YouTube link's, resolved now
+def station_channel_id(channel):
+    if channel.get('channelId'):
+        return channel['channelId']
+    if channel['youtubeLinks']:
+        return get_channel_id_from_url(channel['youtubeLinks'][0])
+    return None
+
+# Store the channel ID of a channel's first YouTube link in the record as
+# 'channelId', so serving it never resolves the link. Its other links are
+# resolved too, into the resolution index. With resolve=False only links
+# resolved before are used.
+def attach_channel_id(channel, resolve=True):
+    if not isinstance(channel, dict):
+        return
+    if resolve:
+        resolve_links([('put', None, channel)])
+    links = channel.get('youtubeLinks')
+    link = links[0] if isinstance(links, list) and links and isinstance(links[0], str) else None
+    channel_id = known_channel_id(link) if link else None
+    if channel_id:
+        channel['channelId'] = channel_id
+    else:
+        channel.pop('channelId', None)
+
+# Resolve a station's channel ID and fetch its schedule videos
+def get_station_schedule(channel):
+    channel['channelId'] = station_channel_id(channel)
+    if channel.get('channelId'):
+        return get_channel_videos(channel['channelId'])
+    return None
+
+# Build the guide: every station with its full schedule, laid out into
+# programs by the schedule engine when the page is served
+def build_guide(data):
+    # One deadline bounds all the YouTube fetches for this build
+    deadline = new_deadline()
+    
+    # Add channel IDs and schedule videos to the data, all stations at once
+    schedules = fetch_all([partial(get_station_schedule, channel) for channel in data], deadline=deadline)
+    
+    # Fetch videos for each channel
+    channels_with_videos = get_videos_for_channels(data, deadline=deadline)
+    
+    for channel, videos in zip(channels_with_videos, schedules):
+        if isinstance(videos, Exception):
+            app.logger.error(f"Error fetching schedule for channel {channel.get('name')}: {videos}")
+            continue
+        # The channel's schedule when there is one, otherwise the link videos
+        channel['schedule'] = [video for video in (videos or channel.get('videos') or []) if video]
+    return channels_with_videos
+
+# Keeps a ready-to-render guide snapshot so requests don't wait on YouTube
+guide_prewarmer = GuidePrewarmer(load_data, build_guide, link_cost=link_quota_cost)
+
+# Station timelines and the current guide state, cached between changes
+schedule_engine = ScheduleEngine()
+
+# Number of station rows rendered with their videos; the rest load as they scroll into view
+GUIDE_INITIAL_ROWS = int(os.getenv('GUIDE_INITIAL_ROWS', 10))
+
+# Rendered guide pages; every viewer in the same time slot gets the same bytes
+guide_page_cache = PageCache()
+
 @app.route('/')
 def index():
-    data = load_data()
-    # Add channel IDs to the data
-    for channel in data:
-        # Use the first YouTube link to get the channel ID
-        if channel['youtubeLinks']:
-            channel['channelId'] = get_channel_id_from_url(channel['youtubeLinks'][0])
+    now = get_current_time()
+    # The page shows the time rounded down to its 30-minute slot (the
+    # browser keeps the clocks current), so it only changes with the slot,
+    # the guide state or the data
+    slot = now.replace(minute=now.minute - now.minute % 30, second=0, microsecond=0)
+    snapshot = guide_prewarmer.get_snapshot()
+    if snapshot:
+        # What's on now and next for every station, recomputed only when a program ends
+        # Rows and the window they hold for, from one read of the guide state
+        rows, (window_start, _) = schedule_engine.guide_at(snapshot['channels'], snapshot['built_at'], now)
+        built_at = SERVER_TZ.localize(snapshot['built_at'])
+        key = ('guide', snapshot['built_at'], window_start, slot)
+        last_modified = max(built_at, window_start, slot)
+    else:
+        rows = None
+        key = ('shell', channel_repository.version(), slot)
+        last_modified = slot
     
-    # Fetch videos for each channel
-    channels_with_videos = get_videos_for_channels(data)
-    
-    # Update videos with current playing status
-    for channel in channels_with_videos:
-        if 'channelId' in channel and channel['channelId']:
-            videos = get_channel_videos(channel['channelId'])
-            if videos:
-                # Only keep 3 videos for the 90-minute window
-                channel['videos'] = videos[:3]
-                
-                # Mark videos as current or not based on time slot
-                now = get_current_time()
-                minutes_since_midnight = now.hour * 60 + now.minute
-                for i, video in enumerate(channel['videos']):
-                    if video:
-                        start_time = minutes_since_midnight + (i * 30)
-                        end_time = start_time + 30
-                        video['is_current'] = (minutes_since_midnight >= start_time and 
-                                            minutes_since_midnight < end_time)
-    
-    # Format current time and pass current datetime for time slots
-    current_time = get_current_time().strftime("%I:%M %p")
-    return render_template('index.html', 
-                         channels=channels_with_videos, 
-                         current_time=current_time,
-                         now=get_current_time())
+    def render():
+        if rows is not None:
+            channels_with_videos = [
+                channel if i < GUIDE_INITIAL_ROWS else dict(channel, videos=[], lazy=True)
+                for i, channel in enumerate(rows)
+            ]
+        else:
+            # Before the first snapshot is ready, render a shell and let every row load itself
+            channels_with_videos = [dict(channel, videos=[], lazy=True) for channel in load_data()]
+        return render_template('index.html', 
+                             channels=channels_with_videos, 
+                             current_time=slot.strftime("%I:%M %p"),
+                             now=slot)
+    
+    page = guide_page_cache.get_or_render(key, render, last_modified)
+    return page_response(page, request)
 
 @app.route('/manage')
 def manage():
     return render_template('manage.html')
 
+# Default and maximum page sizes for /api/channels
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# Opaque paging cursor: the sort key of the last channel on the page
+def encode_cursor(channel):
+    return base64.urlsafe_b64encode(json.dumps(sort_key(channel)).encode()).decode()
+
+def decode_cursor(cursor):
+    station, channel_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return (int(station), str(channel_id))
+
+# Read an optional integer query parameter
+def int_arg(name, default=None):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+
 # Protected API routes
 @app.route('/api/channels')
 @require_api_key
 def api_channels():
-    data = load_data()
-    return jsonify(data)
+    # Filters: displayOption, stationIdMin/stationIdMax and namePrefix.
+    # Paging: page/pageSize, or cursor/pageSize for stable cursor paging.
+    # Without paging parameters the whole (filtered) list is returned as before.
+    # fields=a,b,c limits each channel to those fields (plus id).
+    try:
+        page = int_arg('page')
+        page_size = int_arg('pageSize')
+        station_min = int_arg('stationIdMin')
+        station_max = int_arg('stationIdMax')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    cursor = request.args.get('cursor')
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except Exception:
+        # Bad base64, JSON or shape: never echo the decoder's message
+        return jsonify({"error": "Invalid cursor"}), 400
+    
+    display_option = request.args.get('displayOption') or None
+    name_prefix = request.args.get('namePrefix') or None
+    fields = request.args.get('fields')
+    paged = page is not None or page_size is not None or cursor is not None
+    
+    if paged:
+        page = max(1, page or 1)
+        page_size = min(max(1, page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    
+    channels, total, has_more = channel_repository.query(
+        after=after,
+        offset=(page - 1) * page_size if paged and after is None else 0,
+        limit=page_size if paged else None,
+        display_option=display_option,
+        station_min=station_min,
+        station_max=station_max,
+        name_prefix=name_prefix,
+        count=paged and after is None
+    )
+    next_cursor = encode_cursor(channels[-1]) if has_more and channels else None
+    
+    if fields:
+        wanted = {'id'} | {field.strip() for field in fields.split(',') if field.strip()}
+        channels = [{key: value for key, value in channel.items() if key in wanted} for channel in channels]
+    
+    if not paged:
+        return jsonify(channels)
+    
+    response = {
+        'channels': channels,
+        'pageSize': page_size,
+        'nextCursor': next_cursor
+    }
+    if after is None:
+        response.update({
+            'page': page,
+            'total': total,
+            'totalPages': max(1, -(-total // page_size))
+        })
+    return jsonify(response)
 
 @app.route('/api/channels/<channel_id>')
 @require_api_key
 def api_channel(channel_id):
-    data = load_data()
-    for channel in data:
-        if channel['id'] == channel_id:
-            return jsonify(channel)
-    return jsonify({"error": "Channel not found"}), 404
+    channel = channel_repository.get(channel_id)
+    if channel is None:
+        return jsonify({"error": "Channel not found"}), 404
+    return jsonify(channel)
 
-@app.route('/api/channels', methods=['POST'])
-@require_api_key
-def add_channel():
-    data = load_data()
-    new_channel = request.json
+# Page size limits for /api/channels/<id>/videos
+DEFAULT_VIDEOS_PAGE_SIZE = 10
+MAX_VIDEOS_PAGE_SIZE = 50
+
+# Page token and page size of a /api/channels/<id>/videos request
+def videos_page_args():
+    max_results = int_arg('maxResults', DEFAULT_VIDEOS_PAGE_SIZE)
+    return request.args.get('pageToken') or None, min(max(1, max_results), MAX_VIDEOS_PAGE_SIZE)
+
+# Public like the guide itself: the guide page loads its lazy rows from here
+@app.route('/api/channels/<channel_id>/videos')
+def api_channel_videos(channel_id):
+    channel = channel_repository.get(channel_id)
+    if channel is None:
+        return jsonify({"error": "Channel not found"}), 404
+    
+    try:
+        page_token, max_results = videos_page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Generate a new ID (one more than the highest existing ID)
-    max_id = max([int(channel['id']) for channel in data]) if data else 0
-    new_channel['id'] = str(max_id + 1)
+    youtube_channel_id = station_channel_id(channel)
+    if not youtube_channel_id:
+        return jsonify({"videos": [], "nextPageToken": None})
     
-    # Set default station ID if not provided
-    if 'stationId' not in new_channel:
-        max_station_id = max([channel.get('stationId', 200) for channel in data]) if data else 200
-        new_channel['stationId'] = max_station_id + 1
+    try:
+        page = load_more_channel_videos(youtube_channel_id, page_token, max_results)
+    except Exception as e:
+        app.logger.error(f"Error loading videos for channel {channel_id}: {e}")
+        return jsonify({"error": "Failed to load videos"}), 502
     
-    data.append(new_channel)
-    save_data(data)
+    return jsonify({"videos": page['videos'], "nextPageToken": page['next_page_token']})
+
+# Maximum number of programs /api/channels/<id>/programs returns
+MAX_PROGRAMS = 48
+
+# A station's schedule from the guide snapshot, or None if it isn't in one
+def snapshot_schedule(channel_id):
+    snapshot = guide_prewarmer.get_snapshot()
+    if not snapshot:
+        return None
+    return next((row['schedule'] for row in snapshot['channels'] if row['id'] == channel_id and 'schedule' in row), None)
+
+# What's on a station now and the programs after it, from the same timeline
+# the guide page uses; lazy guide rows load from here
+@app.route('/api/channels/<channel_id>/programs')
+def api_channel_programs(channel_id):
+    channel = channel_repository.get(channel_id)
+    if channel is None:
+        return jsonify({"error": "Channel not found"}), 404
+    
+    try:
+        count = int_arg('count', 3)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    count = min(max(1, count), MAX_PROGRAMS)
+    
+    # Same schedule as the guide snapshot when the station is in it
+    videos = snapshot_schedule(channel_id)
+    try:
+        if videos is None:
+            videos = get_station_schedule(channel) or []
+    except Exception as e:
+        app.logger.error(f"Error loading schedule for channel {channel_id}: {e}")
+        return jsonify({"error": "Failed to load programs"}), 502
+    
+    programs = []
+    for program in schedule_engine.programs(channel_id, videos, get_current_time(), count):
+        program['start_time'] = program['start_time'].isoformat()
+        program['end_time'] = program['end_time'].isoformat()
+        programs.append(program)
+    return jsonify({"programs": programs})
+
+# Prometheus scrape endpoint: latency histograms, cache, YouTube call,
+# quota and retry counters for this process
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Today's YouTube quota spend and circuit state, with the cost of a full
+# guide rebuild, for planning how many stations the daily budget allows
+@app.route('/api/quota', methods=['GET'])
+@require_api_key
+def api_quota():
+    report = quota_governor.report()
+    rebuild_cost = estimate_quota_cost(load_data(), link_quota_cost)
+    report['guideRebuildCost'] = rebuild_cost
+    report['guideRebuildsRemaining'] = report['remaining'] // rebuild_cost if rebuild_cost else None
+    return jsonify(report)
+
+@app.route('/api/channels', methods=['POST'])
+@require_api_key
+def add_channel():
+    channel = request.json
+    attach_channel_id(channel)
+    # The repository assigns the new ID and default station ID under its write lock
+    new_channel = channel_repository.add(channel)
+    data_changed()
     
     return jsonify(new_channel), 201
 
 @app.route('/api/channels/<channel_id>', methods=['PUT'])
 @require_api_key
 def update_channel(channel_id):
-    data = load_data()
-    updated_channel = request.json
+    if channel_repository.get(channel_id) is None:
+        return jsonify({"error": "Channel not found"}), 404
+    channel = request.json
+    attach_channel_id(channel)
+    try:
+        updated_channel = channel_repository.update(channel_id, channel)
+    except ChannelNotFoundError:
+        return jsonify({"error": "Channel not found"}), 404
     
-    for i, channel in enumerate(data):
-        if channel['id'] == channel_id:
-            # Ensure ID remains the same
-            updated_channel['id'] = channel_id
-            data[i] = updated_channel
-            save_data(data)
-            return jsonify(updated_channel)
-    
-    return jsonify({"error": "Channel not found"}), 404
+    data_changed()
+    return jsonify(updated_channel)
 
 @app.route('/api/channels/<channel_id>', methods=['DELETE'])
 @require_api_key
 def delete_channel(channel_id):
-    data = load_data()
+    try:
+        deleted_channel = channel_repository.delete(channel_id)
+    except ChannelNotFoundError:
+        return jsonify({"error": "Channel not found"}), 404
     
-    for i, channel in enumerate(data):
-        if channel['id'] == channel_id:
-            deleted_channel = data.pop(i)
-            save_data(data)
-            return jsonify(deleted_channel)
+    data_changed()
+    return jsonify(deleted_channel)
+
+# Most operations one /api/channels/bulk request may carry
+MAX_BULK_OPERATIONS = 10000
+
+# Parse a bulk request body into (kind, channel_id, channel) operations.
+# The body is NDJSON (one item per line) or a JSON array, or an object with
+# an 'operations' array. Each item is {"op": "create", "channel": {...}},
+# {"op": "update", "id": ..., "channel": {...}}, {"op": "delete", "id": ...},
+# or a bare channel record with an id, which replaces or adds that channel;
+# so an export can be imported as it is.
+def parse_bulk_operations():
+    body = request.get_data(as_text=True)
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        items = []
+        for line_number, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Line {line_number} is not valid JSON")
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+        if isinstance(items, dict):
+            items = items.get('operations')
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array of operations")
+    if len(items) > MAX_BULK_OPERATIONS:
+        raise ValueError(f"At most {MAX_BULK_OPERATIONS} operations per request")
     
-    return jsonify({"error": "Channel not found"}), 404
+    operations = []
+    for number, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Operation {number}: expected a JSON object")
+        kind = item.get('op', 'put')
+        channel = item.get('channel') if 'op' in item else item
+        channel_id = item.get('id')
+        if kind in ('create', 'update', 'put') and not isinstance(channel, dict):
+            raise ValueError(f"Operation {number}: 'channel' must be an object")
+        if kind in ('update', 'put', 'delete') and channel_id is None:
+            raise ValueError(f"Operation {number}: 'id' is required")
+        operations.append((kind, None if channel_id is None else str(channel_id), channel))
+    return operations
+
+# Resolve the YouTube links in a batch, each distinct URL once, in parallel.
+# Links resolved before come from the resolution index without calling the
+# API. Returns {url: channel ID or None}.
+def resolve_links(operations):
+    links = list(dict.fromkeys(
+        link
+        for kind, _, channel in operations if kind != 'delete'
+        for link in channel.get('youtubeLinks') or [] if isinstance(link, str)
+    ))
+    channel_ids = fetch_all([partial(get_channel_id_from_url, link) for link in links])
+    return {
+        link: None if isinstance(channel_id, Exception) else channel_id
+        for link, channel_id in zip(links, channel_ids)
+    }
+
+# Create, update and delete many channels in one validated, atomic write.
+# ?resolve=false skips resolving YouTube links not resolved before.
+@app.route('/api/channels/bulk', methods=['POST'])
+@require_api_key
+def bulk_channels():
+    try:
+        operations = parse_bulk_operations()
+        # Validate before spending quota on resolving links; the real apply validates again
+        channel_repository.apply(operations, dry_run=True)
+        resolved = resolve_links(operations) if request.args.get('resolve', 'true').lower() != 'false' else {}
+        for kind, _, channel in operations:
+            if kind != 'delete':
+                # Every link is resolved by now, or left unresolved on purpose
+                attach_channel_id(channel, resolve=False)
+        results = channel_repository.apply(operations)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if operations:
+        data_changed()
+    counts = {kind: 0 for kind in ('create', 'update', 'put', 'delete')}
+    for kind, _ in results:
+        counts[kind] += 1
+    return jsonify({
+        'created': counts['create'],
+        'updated': counts['update'] + counts['put'],
+        'deleted': counts['delete'],
+        'results': [{'op': kind, 'id': channel['id']} for kind, channel in results],
+        'resolved': resolved,
+        'unresolved': [link for link, channel_id in resolved.items() if not channel_id]
+    })
+
+# Stream the whole lineup as NDJSON (default) or, with ?format=json, a JSON
+# array; either can be posted back to /api/channels/bulk
+@app.route('/api/channels/export')
+@require_api_key
+def export_channels():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'json'):
+        return jsonify({"error": "'format' must be 'ndjson' or 'json'"}), 400
+    channels = load_data()
+    
+    def generate():
+        if export_format == 'ndjson':
+            for channel in channels:
+                yield json.dumps(channel) + '\n'
+            return
+        yield '['
+        for i, channel in enumerate(channels):
+            yield (',\n' if i else '\n') + json.dumps(channel)
+        yield '\n]\n'
+    
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'application/json'
+    return Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=channels.{export_format}'
+    })
+
+# Start pre-warming the guide, except in the debug reloader's watcher process
+if os.getenv('PREWARM_ENABLED', 'true').lower() == 'true' and not (
+        __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'):
+    guide_prewarmer.start()
 
 if __name__ == '__main__':
     app.run(debug=True)
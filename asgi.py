@@ -0,0 +1,200 @@
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import HTTPException
+from app import app, channel_repository, snapshot_schedule, videos_page_args
+from youtube import async_api
+from youtube.fetch_engine import new_deadline
+from youtube.retry_decorator import retry_deadline
+from youtube.metrics import http_request_duration
+
+logger = logging.getLogger('youtube_api')
+
+# ASGI entry point (asgi:application) serving the same routes and templates
+# as the Flask app, for running under an ASGI server such as uvicorn.
+#
+# Requests that may have to wait on YouTube first load what they need with
+# youtube.async_api, on the event loop, so the wait holds a coroutine rather
+# than a thread. The Flask view then runs on a small thread pool and finds
+# everything in the cache; if the load fails the 502 is sent from here, so
+# the view never makes the call itself. Every other route (the guide page is
+# served from the pre-built snapshot) goes straight to the view.
+
+# Threads running Flask views; they only do CPU work and local file reads,
+# so a few are enough however many requests are waiting on YouTube
+ASGI_RENDER_THREADS = int(os.getenv('ASGI_RENDER_THREADS', 8))
+
+_render_executor = ThreadPoolExecutor(max_workers=ASGI_RENDER_THREADS, thread_name_prefix='asgi-render')
+
+# Async loaders for the routes that call YouTube, by Flask endpoint. Each
+# runs in the request's context and warms the cache the view reads from.
+
+async def _station_channel_id(channel):
+    # Async app.station_channel_id
+    if channel.get('channelId'):
+        return channel['channelId']
+    if channel['youtubeLinks']:
+        return await async_api.get_channel_id_from_url(channel['youtubeLinks'][0])
+    return None
+
+async def _load_channel_videos(channel_id):
+    channel = channel_repository.get(channel_id)
+    if channel is None:
+        return
+    try:
+        page_token, max_results = videos_page_args()
+    except ValueError:
+        return
+    youtube_channel_id = await _station_channel_id(channel)
+    if youtube_channel_id:
+        await async_api.load_more_channel_videos(youtube_channel_id, page_token, max_results)
+
+async def _load_channel_programs(channel_id):
+    channel = channel_repository.get(channel_id)
+    if channel is None or snapshot_schedule(channel_id) is not None:
+        return
+    youtube_channel_id = await _station_channel_id(channel)
+    if youtube_channel_id:
+        await async_api.get_channel_videos(youtube_channel_id)
+
+# Endpoint -> (loader, error message of the 502 sent when the loader fails)
+ASYNC_LOADERS = {
+    'api_channel_videos': (_load_channel_videos, "Failed to load videos"),
+    'api_channel_programs': (_load_channel_programs, "Failed to load programs")
+}
+
+def wsgi_environ(scope, body):
+    """Build a WSGI environ for an ASGI HTTP request scope."""
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    server = scope.get('server') or ('localhost', 80)
+    environ['SERVER_NAME'] = server[0]
+    environ['SERVER_PORT'] = str(server[1] or 80)
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = client[0], str(client[1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # The whole body has been read (and de-chunked) already
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body.extend(message.get('body', b''))
+        if not message.get('more_body'):
+            return bytes(body)
+
+async def _run_loader(environ):
+    # Returns an error response to send instead of running the view, or None
+    adapter = app.url_map.bind_to_environ(environ)
+    try:
+        rule, view_args = adapter.match(return_rule=True)
+    except HTTPException:
+        return None
+    if rule.endpoint not in ASYNC_LOADERS:
+        return None
+    loader, error_message = ASYNC_LOADERS[rule.endpoint]
+    started = time.perf_counter()
+    try:
+        # Retry waits in the loader stop at the request's fetch deadline
+        with app.request_context(environ), retry_deadline(new_deadline()):
+            await loader(**view_args)
+    except Exception as e:
+        # Answered here: the view would repeat the same call, blocking a render thread
+        logger.error(f"Async load for {environ['PATH_INFO']} failed: {e}")
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            endpoint=rule.rule, method=environ['REQUEST_METHOD'], status=502
+        )
+        return app.response_class(json.dumps({"error": error_message}), status=502, mimetype='application/json')
+    return None
+
+def _start_wsgi(environ, wsgi_app=app):
+    # Runs the view and reads the first body chunk in the same thread hop;
+    # returns (status, headers, iterable, its iterator, first chunk or None)
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    iterable = wsgi_app(environ, start_response)
+    iterator = iter(iterable)
+    first = next(iterator, None)
+    return started['status'], started['headers'], iterable, iterator, first
+
+async def _http(scope, receive, send):
+    body = await _read_body(receive)
+    if body is None:
+        return
+    environ = wsgi_environ(scope, body)
+    error_response = await _run_loader(environ)
+
+    loop = asyncio.get_running_loop()
+    status, headers, iterable, iterator, chunk = await loop.run_in_executor(
+        _render_executor, _start_wsgi, environ, app if error_response is None else error_response
+    )
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        # Streamed responses are read a chunk at a time off the event loop
+        while chunk is not None:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await loop.run_in_executor(_render_executor, next, iterator, None)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        if hasattr(iterable, 'close'):
+            await loop.run_in_executor(_render_executor, iterable.close)
+
+async def _lifespan(receive, send):
+    # The guide pre-warmer already started when app was imported
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            logger.info(f"ASGI application started with {ASGI_RENDER_THREADS} render threads")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        await _http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+    else:
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
@@ -0,0 +1,288 @@
+"""Local stand-in for the YouTube Data API, replaying recorded responses.
+
+Serves channels.list, playlistItems.list, videos.list and search.list under
+/youtube/v3/ from the responses recorded in recordings/youtube_v3.json. Each
+recorded item is a template: it is copied for every channel or video asked
+for, with the IDs, titles, durations and view counts filled in
+deterministically, so any number of stations can be served and every run
+sees the same data. Latency and error injection are configurable, and every
+request is counted per API method.
+
+Point the app at it with YOUTUBE_API_ENDPOINT=<server.url>.
+
+Usage:
+    python benchmarks/fake_youtube.py [--port N] [--latency S] [--error-rate F]
+"""
+import os
+import copy
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RECORDINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings', 'youtube_v3.json')
+
+API_PATH_PREFIX = '/youtube/v3/'
+
+# Uploads every fake channel has, served in playlistItems pages
+DEFAULT_UPLOADS_PER_CHANNEL = 60
+
+# Error reasons sent with injected errors, by status
+ERROR_REASONS = {403: 'rateLimitExceeded', 429: 'rateLimitExceeded', 500: 'backendError', 503: 'backendError'}
+
+# Upload dates count back from here, one video every 6 hours
+_EPOCH = datetime(2024, 6, 1)
+
+def _digest(*parts):
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+def _number(*parts):
+    return int(_digest(*parts)[:8], 16)
+
+def channel_id_for(name):
+    """The channel ID search.list and channels.list?forUsername resolve name to."""
+    return 'UC' + _digest('channel', name)[:22]
+
+def uploads_playlist_for(channel_id):
+    # Real uploads playlists are the channel ID with UU in place of UC
+    return 'UU' + channel_id[2:]
+
+def video_id_for(playlist_id, position):
+    # 11 characters like real IDs, ending in the playlist position
+    return _digest('playlist', playlist_id)[:6] + f"{position:05d}"
+
+def position_of(video_id):
+    suffix = video_id[6:]
+    return int(suffix) if suffix.isdigit() else _number('position', video_id) % 1000
+
+class FakeYouTube:
+    """Builds API responses from the recorded templates."""
+
+    def __init__(self, recordings_path=RECORDINGS_PATH, uploads_per_channel=DEFAULT_UPLOADS_PER_CHANNEL):
+        with open(recordings_path) as f:
+            self.recordings = json.load(f)
+        self.uploads_per_channel = uploads_per_channel
+
+    def _response(self, api_method, items, **fields):
+        response = {key: value for key, value in self.recordings[api_method].items() if key != 'items'}
+        response.update(fields)
+        response['items'] = items
+        response['pageInfo'] = dict(response.get('pageInfo', {}), resultsPerPage=len(items))
+        return response
+
+    def _item(self, api_method):
+        return copy.deepcopy(self.recordings[api_method]['items'][0])
+
+    def channels(self, params):
+        if 'forUsername' in params:
+            channel_ids = [channel_id_for(params['forUsername'])]
+        else:
+            channel_ids = [channel_id for channel_id in params.get('id', '').split(',') if channel_id]
+        items = []
+        for channel_id in channel_ids:
+            item = self._item('channels.list')
+            item['id'] = channel_id
+            item['etag'] = _digest('channel-etag', channel_id)[:27]
+            item['contentDetails']['relatedPlaylists']['uploads'] = uploads_playlist_for(channel_id)
+            items.append(item)
+        return self._response('channels.list', items, pageInfo={'totalResults': len(items)}), None
+
+    def search(self, params):
+        item = self._item('search.list')
+        item['id']['channelId'] = channel_id_for(params.get('q', ''))
+        return self._response('search.list', [item]), None
+
+    def playlist_items(self, params):
+        playlist_id = params.get('playlistId', '')
+        page_size = min(int(params.get('maxResults', 5)), 50)
+        offset = int(params.get('pageToken') or 0)
+        total = self.uploads_per_channel
+        items = []
+        for position in range(offset, min(offset + page_size, total)):
+            video_id = video_id_for(playlist_id, position)
+            item = self._item('playlistItems.list')
+            snippet = item['snippet']
+            item['id'] = _digest('item', video_id)[:40]
+            item['etag'] = _digest('item-etag', video_id)[:27]
+            snippet['playlistId'] = playlist_id
+            snippet['channelId'] = snippet['videoOwnerChannelId'] = 'UC' + playlist_id[2:]
+            snippet['position'] = position
+            snippet['title'] = f"{snippet['title']} (part {total - position})"
+            snippet['publishedAt'] = item['contentDetails']['videoPublishedAt'] = self._published_at(position)
+            snippet['resourceId']['videoId'] = item['contentDetails']['videoId'] = video_id
+            for thumbnail in snippet['thumbnails'].values():
+                thumbnail['url'] = thumbnail['url'].replace('lWQaJecRgfE', video_id)
+            items.append(item)
+        next_offset = offset + page_size
+        etag = _digest('page', playlist_id, offset, page_size, total)[:27]
+        fields = {'etag': etag, 'pageInfo': {'totalResults': total}}
+        response = self._response('playlistItems.list', items, **fields)
+        if next_offset < total:
+            response['nextPageToken'] = str(next_offset)
+        else:
+            response.pop('nextPageToken', None)
+        return response, etag
+
+    def videos(self, params):
+        items = []
+        for video_id in [video_id for video_id in params.get('id', '').split(',') if video_id]:
+            position = position_of(video_id)
+            item = self._item('videos.list')
+            item['id'] = video_id
+            item['etag'] = _digest('video-etag', video_id)[:27]
+            item['snippet']['publishedAt'] = self._published_at(position)
+            item['snippet']['title'] = f"{item['snippet']['title']} (part {self.uploads_per_channel - position})"
+            minutes = 3 + _number('minutes', video_id) % 57
+            item['contentDetails']['duration'] = f"PT{minutes}M{_number('seconds', video_id) % 60}S"
+            item['statistics']['viewCount'] = str(_number('views', video_id) % 5000000)
+            items.append(item)
+        return self._response('videos.list', items, pageInfo={'totalResults': len(items)}), None
+
+    def _published_at(self, position):
+        return (_EPOCH - timedelta(hours=6 * position)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class FakeYouTubeServer:
+    """Threaded HTTP server for FakeYouTube, with latency and error injection.
+
+    Args:
+        port: Port to listen on, 0 for any free port
+        latency: Seconds every response is delayed by
+        jitter: Up to this many extra seconds, added at random
+        error_rate: Fraction of requests answered with error_status instead
+        error_status: HTTP status of injected errors (403, 429, 500 or 503)
+        seed: Seed for the jitter and error injection, for repeatable runs
+    """
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0,
+                 uploads_per_channel=DEFAULT_UPLOADS_PER_CHANNEL, recordings_path=RECORDINGS_PATH):
+        self.api = FakeYouTube(recordings_path, uploads_per_channel)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-youtube', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_counts(self):
+        with self.lock:
+            self.calls.clear()
+
+    def counts(self):
+        """Requests served since the last reset, per API method and outcome."""
+        with self.lock:
+            return dict(sorted(self.calls.items()))
+
+    def _handler_class(self):
+        fake = self
+        routes = {
+            'channels': fake.api.channels,
+            'search': fake.api.search,
+            'playlistItems': fake.api.playlist_items,
+            'videos': fake.api.videos
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real API, so the pooled transport reuses connections
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                resource = parts.path[len(API_PATH_PREFIX):] if parts.path.startswith(API_PATH_PREFIX) else None
+                params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                with fake.lock:
+                    delay = fake.latency + (fake.random.random() * fake.jitter if fake.jitter else 0)
+                    fail = fake.error_rate > 0 and fake.random.random() < fake.error_rate
+                if delay:
+                    time.sleep(delay)
+
+                if resource not in routes:
+                    return self._send_error(404, 'notFound', 'unknown')
+                api_method = f"{resource}.list"
+                if fail:
+                    return self._send_error(fake.error_status, ERROR_REASONS.get(fake.error_status, 'backendError'), api_method)
+                response, etag = routes[resource](params)
+                if etag and self.headers.get('If-None-Match') == etag:
+                    fake._count(api_method, '304')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                fake._count(api_method, '200')
+                self._send_json(200, response, etag)
+
+            def _send_error(self, status, reason, api_method):
+                fake._count(api_method, str(status))
+                self._send_json(status, {'error': {
+                    'code': status,
+                    'message': f"Injected {reason} error",
+                    'errors': [{'message': f"Injected {reason} error", 'domain': 'youtube.fake', 'reason': reason}]
+                }})
+
+            def _send_json(self, status, body, etag=None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(payload)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _count(self, api_method, outcome):
+        with self.lock:
+            self.calls[f"{api_method} {outcome}"] += 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on (default 8765)')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response (default 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail (default 0)')
+    parser.add_argument('--error-status', type=int, default=503, choices=sorted(ERROR_REASONS), help='status of injected errors')
+    args = parser.parse_args()
+
+    server = FakeYouTubeServer(args.port, args.latency, args.jitter, args.error_rate, args.error_status)
+    print(f"Fake YouTube API on {server.url} (set YOUTUBE_API_ENDPOINT to this)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(server.counts(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+"""Benchmark the guide's hot paths offline, against a local YouTube stand-in.
+
+Every scenario runs in a fresh interpreter in its own temporary directory
+(channel data, catalog and cache start empty) with the YouTube client
+pointed at benchmarks/fake_youtube.py, so no quota is spent and results
+are repeatable. Scenarios:
+
+    index                 guide build from a cold cache, then index() renders,
+                          cached and conditional (304) responses
+    videos_10/100/1000    get_videos_for_channels cold and warm at 10, 100
+                          and 1000 stations
+    api_cache_memory      APICache get/set/get_or_load from 8 threads, per backend
+    api_cache_sqlite
+    channel_data_1000     save_data and load_data (cold and unchanged) on
+    channel_data_10000    large lineups
+
+Latencies are in ms (us for per-operation cache timings) and API calls are
+counted both by the app's metrics and by the stand-in server. The index
+and videos scenarios also report the memory the API cache holds at the
+end, per distinct video in it (cache_bytes_per_video). Results are written
+as JSON; with --baseline, the run fails if a latency or the memory per
+video got worse by more than --tolerance or any API call count went up.
+
+Usage:
+    python benchmarks/hot_path_benchmark.py [--only NAME ...] [--runs N]
+        [--latency S] [--error-rate F] [--output FILE] [--baseline FILE]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import threading
+from datetime import datetime
+
+from fake_youtube import FakeYouTubeServer, ERROR_REASONS, channel_id_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'hot_path_results.json')
+
+# name: (scenario function, parameters)
+SCENARIOS = {
+    'index': ('index', {'stations': 100}),
+    'videos_10': ('videos', {'stations': 10}),
+    'videos_100': ('videos', {'stations': 100}),
+    'videos_1000': ('videos', {'stations': 1000}),
+    'api_cache_memory': ('api_cache', {'backend': 'memory', 'ops_per_thread': 20000}),
+    'api_cache_sqlite': ('api_cache', {'backend': 'sqlite', 'ops_per_thread': 2000}),
+    'channel_data_1000': ('channel_data', {'stations': 1000}),
+    'channel_data_10000': ('channel_data', {'stations': 10000})
+}
+
+# Metrics where a higher value is better; for every other timing or call
+# count lower is better
+HIGHER_IS_BETTER = ('ops_per_sec', 'hit_ratio', 'stations_with_videos')
+
+def make_lineup(stations):
+    """A lineup of stations: mostly /channel/ links, every 10th an @handle
+    (resolved with search.list), every 5th with a second link."""
+    lineup = []
+    for i in range(1, stations + 1):
+        links = [f"https://www.youtube.com/channel/{channel_id_for(f'station-{i}')}"]
+        if i % 10 == 0:
+            links = [f"https://www.youtube.com/@benchstation{i}"]
+        if i % 5 == 0:
+            links.append(f"https://www.youtube.com/channel/{channel_id_for(f'station-{i}-extra')}")
+        lineup.append({
+            'id': str(i),
+            'name': f"Station {i}",
+            'youtubeLinks': links,
+            'displayOption': ('new', 'popular', 'random')[i % 3],
+            'stationId': 200 + i
+        })
+    return lineup
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+# Scenarios, run in the child interpreter
+
+def _api_calls():
+    from youtube.metrics import youtube_requests
+    return sum(youtube_requests.values.values())
+
+def _quota_spent():
+    from youtube.quota_governor import quota_governor
+    return quota_governor.report()['spent']
+
+def _timed_calls(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def _deep_size(value, seen):
+    # Bytes reachable from value, each object counted once however many
+    # cache entries share it
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item, seen) for item in value)
+    return size
+
+def _video_ids(value, ids):
+    # IDs of the Video records held in a cached value
+    from youtube.video_record import Video
+    if isinstance(value, Video):
+        ids.add(value.id)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _video_ids(item, ids)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _video_ids(item, ids)
+
+def _cache_memory():
+    from youtube.youtube_api import api_cache
+    values = [entry.value for entry in list(api_cache.backend.entries.values())]
+    ids = set()
+    _video_ids(values, ids)
+    cache_bytes = _deep_size(values, set())
+    return {
+        'cache_entries': len(values),
+        'cache_bytes': cache_bytes,
+        'cached_videos': len(ids),
+        'cache_bytes_per_video': round(cache_bytes / len(ids)) if ids else 0
+    }
+
+def _build_client():
+    # Client startup is covered by startup_benchmark.py, keep it out of the cold timings
+    from youtube.youtube_client import get_youtube
+    get_youtube()
+
+def scenario_index(params):
+    import app
+    client = app.app.test_client()
+    _build_client()
+
+    started = time.perf_counter()
+    app.guide_prewarmer.refresh()
+    cold_build = time.perf_counter() - started
+    cold_calls = _api_calls()
+
+    started = time.perf_counter()
+    response = client.get('/')
+    first_render = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+    etag = response.headers['ETag'].strip('"')
+
+    def render():
+        app.guide_page_cache.clear()
+        assert client.get('/').status_code == 200
+
+    render_samples = _timed_calls(render, 20)
+    warm_samples = _timed_calls(lambda: client.get('/'), 200)
+    not_modified_samples = _timed_calls(lambda: client.get('/', headers={'If-None-Match': f'"{etag}"'}), 200)
+
+    started = time.perf_counter()
+    app.guide_prewarmer.refresh()
+    warm_build = time.perf_counter() - started
+
+    return {
+        'cold_build_ms': _ms(cold_build),
+        'cold_build_api_calls': cold_calls,
+        'first_render_ms': _ms(first_render),
+        'render_ms': _ms(statistics.median(render_samples)),
+        'warm_ms': _ms(statistics.median(warm_samples)),
+        'warm_p95_ms': _ms(percentile(warm_samples, 0.95)),
+        'not_modified_ms': _ms(statistics.median(not_modified_samples)),
+        'warm_build_ms': _ms(warm_build),
+        'warm_build_api_calls': _api_calls() - cold_calls,
+        'page_bytes': len(response.get_data()),
+        'quota_units': _quota_spent(),
+        **_cache_memory()
+    }
+
+def scenario_videos(params):
+    from youtube.youtube_api import get_videos_for_channels
+    with open(os.path.join('data', 'data.json')) as f:
+        lineup = json.load(f)
+    _build_client()
+
+    started = time.perf_counter()
+    channels = get_videos_for_channels(lineup)
+    cold = time.perf_counter() - started
+    cold_calls = _api_calls()
+
+    warm_samples = _timed_calls(lambda: get_videos_for_channels(lineup), 5)
+    return {
+        'cold_ms': _ms(cold),
+        'cold_api_calls': cold_calls,
+        'warm_ms': _ms(statistics.median(warm_samples)),
+        'warm_api_calls': _api_calls() - cold_calls,
+        'stations_with_videos': sum(1 for channel in channels if channel['videos']),
+        'quota_units': _quota_spent(),
+        **_cache_memory()
+    }
+
+def scenario_api_cache(params):
+    from youtube.api_cache import APICache
+    from youtube.cache_backends import create_backend
+
+    threads = 8
+    keys = 5000
+    max_size = 2000
+    ops_per_thread = params['ops_per_thread']
+    cache = APICache(max_size=max_size, ttl=3600, backend=create_backend(params['backend'], max_size=max_size))
+    # A station's worth of link videos, the typical cached value
+    value = [
+        {'id': f"video{i:06d}", 'title': 'A video title of typical length', 'duration': 12, 'duration_str': '12m'}
+        for i in range(5)
+    ]
+    get_samples = [[] for _ in range(threads)]
+    hits = [0] * threads
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        rng = random.Random(index)
+        samples = get_samples[index]
+        start_barrier.wait()
+        for _ in range(ops_per_thread):
+            # 80% of lookups go to the hottest 20% of keys
+            hot = rng.random() < 0.8
+            key = f"videos:{rng.randrange(keys // 5) if hot else rng.randrange(keys)}"
+            if rng.random() < 0.05:
+                cache.get_or_load(key, lambda: value)
+                continue
+            started = time.perf_counter()
+            cached = cache.get(key)
+            samples.append(time.perf_counter() - started)
+            if cached is None:
+                cache.set(key, value)
+            else:
+                hits[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for thread_samples in get_samples for sample in thread_samples]
+    return {
+        'ops_per_sec': round(threads * ops_per_thread / elapsed),
+        'get_p50_us': round(percentile(samples, 0.5) * 1e6, 2),
+        'get_p99_us': round(percentile(samples, 0.99) * 1e6, 2),
+        'hit_ratio': round(sum(hits) / len(samples), 4)
+    }
+
+def scenario_channel_data(params):
+    import app
+    lineup = make_lineup(params['stations'])
+    path = app.channel_repository.path
+
+    save_samples = _timed_calls(lambda: app.save_data(lineup), 5)
+
+    def load_changed():
+        # Another process rewrote the file: the next load re-parses and re-validates it
+        with open(path, 'rb') as f:
+            contents = f.read()
+        with open(path, 'wb') as f:
+            f.write(contents)
+        os.utime(path, ns=(time.time_ns(), time.time_ns()))
+        started = time.perf_counter()
+        app.load_data()
+        return time.perf_counter() - started
+
+    cold_samples = [load_changed() for _ in range(5)]
+    warm_samples = _timed_calls(app.load_data, 20)
+    return {
+        'save_ms': _ms(statistics.median(save_samples)),
+        'load_cold_ms': _ms(statistics.median(cold_samples)),
+        'load_warm_ms': _ms(statistics.median(warm_samples)),
+        'file_bytes': os.path.getsize(path)
+    }
+
+def run_child(kind, params):
+    results = globals()[f"scenario_{kind}"](params)
+    print(json.dumps(results))
+
+# Driver
+
+def run_scenario(server, kind, params, args):
+    with tempfile.TemporaryDirectory(prefix='tubeguide-bench-') as workdir:
+        os.mkdir(os.path.join(workdir, 'data'))
+        with open(os.path.join(workdir, 'data', 'data.json'), 'w') as f:
+            json.dump(make_lineup(params.get('stations', 10)), f)
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+            VITE_YT_API_KEY='benchmark-key',
+            YOUTUBE_API_ENDPOINT=server.url,
+            YOUTUBE_HTTP2='false',
+            YOUTUBE_DAILY_QUOTA='1000000000',
+            PREWARM_ENABLED='false',
+            SKIP_API_KEY_CHECK='true',
+            CACHE_BACKEND='memory',
+            CACHE_MAX_SIZE=str(args.cache_max_size),
+            CACHE_MAX_BYTES='0',
+            CACHE_PATH=os.path.join('data', 'cache.sqlite3'),
+            CATALOG_PATH=os.path.join('data', 'catalog.sqlite3'),
+            FETCH_TIMEOUT=str(args.fetch_timeout),
+            LOG_SAMPLE_RATE='0'
+        )
+        server.reset_counts()
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', kind, json.dumps(params)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Scenario {kind} {params} failed:\n{result.stderr}")
+        results = json.loads(result.stdout.strip().splitlines()[-1])
+    served = server.counts()
+    if served:
+        results['server_requests'] = sum(served.values())
+        results['server_requests_by_method'] = served
+    return results
+
+def aggregate(runs):
+    """Median of each numeric metric over the runs; other values from the last run."""
+    results = {}
+    for name, value in runs[-1].items():
+        if isinstance(value, (int, float)):
+            median = statistics.median(run[name] for run in runs)
+            results[name] = round(median, 3) if isinstance(median, float) else median
+        else:
+            results[name] = value
+    return results
+
+def compare(results, baseline, tolerance):
+    """List the metrics that regressed against a previous results file."""
+    regressions = []
+    for scenario, old_metrics in baseline.get('results', {}).items():
+        for name, old in old_metrics.items():
+            new = results.get(scenario, {}).get(name)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            if name.endswith(HIGHER_IS_BETTER):
+                regressed = new < old * (1 - tolerance)
+            elif 'api_calls' in name or name in ('quota_units', 'server_requests'):
+                # Call counts are deterministic, so any increase is a regression
+                regressed = new > old
+            elif name.endswith('_ms'):
+                # Ignore sub-millisecond noise
+                regressed = new > old * (1 + tolerance) and new - old > 1
+            elif name.endswith('_us'):
+                regressed = new > old * (1 + tolerance) and new - old > 5
+            elif name.endswith('_per_video'):
+                regressed = new > old * (1 + tolerance)
+            else:
+                continue
+            if regressed:
+                regressions.append(f"{scenario}.{name}: {old} -> {new}")
+    return regressions
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], json.loads(sys.argv[3]))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help='scenarios to run (default all)')
+    parser.add_argument('--runs', type=int, default=1, help='fresh runs per scenario, medians are reported (default 1)')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds the stand-in API takes per response (default 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of API requests that fail (default 0)')
+    parser.add_argument('--error-status', type=int, default=503, choices=sorted(ERROR_REASONS), help='status of injected errors')
+    parser.add_argument('--seed', type=int, default=0, help='seed for jitter and error injection')
+    parser.add_argument('--cache-max-size', type=int, default=2000, help='CACHE_MAX_SIZE for the app (default 2000)')
+    parser.add_argument('--fetch-timeout', type=float, default=300, help='FETCH_TIMEOUT for the app, in seconds (default 300)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='results file (default benchmarks/hot_path_results.json)')
+    parser.add_argument('--baseline', help='previous results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative slowdown against the baseline (default 0.5)')
+    args = parser.parse_args()
+
+    names = args.only or list(SCENARIOS)
+    results = {}
+    with FakeYouTubeServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           error_status=args.error_status, seed=args.seed) as server:
+        for name in names:
+            kind, params = SCENARIOS[name]
+            runs = [run_scenario(server, kind, params, args) for _ in range(args.runs)]
+            results[name] = aggregate(runs)
+            summary = ', '.join(f"{key}={value}" for key, value in results[name].items() if not isinstance(value, dict))
+            print(f"{name}: {summary}")
+
+    report = {
+        'benchmark': 'hot_paths',
+        'created': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'config': {
+            'runs': args.runs,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate,
+            'error_status': args.error_status,
+            'seed': args.seed,
+            'cache_max_size': args.cache_max_size
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
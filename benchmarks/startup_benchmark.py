@@ -0,0 +1,72 @@
+"""Measure worker startup: importing app.py, the first requests and building the API client.
+
+Each run starts a fresh interpreter in the repository root, without an API
+key and with the guide pre-warmer off, so no YouTube traffic is made.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs N] [--json]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter and prints one JSON object of timings (ms)
+_CHILD = r"""
+import json, time
+started = time.perf_counter()
+import app
+timings = {'import_app': (time.perf_counter() - started) * 1000}
+client = app.app.test_client()
+for name, path in (('first_index', '/'), ('first_api_channels', '/api/channels')):
+    started = time.perf_counter()
+    response = client.get(path)
+    timings[name] = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200, (path, response.status_code)
+import os
+os.environ['VITE_YT_API_KEY'] = 'benchmark-key'
+from youtube.youtube_client import get_youtube
+started = time.perf_counter()
+get_youtube()
+timings['first_client_build'] = (time.perf_counter() - started) * 1000
+print(json.dumps(timings))
+"""
+
+def run_once():
+    env = dict(os.environ, PREWARM_ENABLED='false', SKIP_API_KEY_CHECK='true')
+    env.pop('VITE_YT_API_KEY', None)
+    result = subprocess.run(
+        [sys.executable, '-c', _CHILD], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start (default 5)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    results = {}
+    for name in runs[0]:
+        samples = [run[name] for run in runs]
+        results[name] = {
+            'median_ms': round(statistics.median(samples), 2),
+            'min_ms': round(min(samples), 2),
+            'max_ms': round(max(samples), 2)
+        }
+
+    if args.json:
+        print(json.dumps({'benchmark': 'startup', 'runs': args.runs, 'results': results}, indent=2))
+        return
+    print(f"startup benchmark ({args.runs} runs)")
+    for name, stats in results.items():
+        print(f"  {name:<20} median {stats['median_ms']:>9.2f} ms  (min {stats['min_ms']:.2f}, max {stats['max_ms']:.2f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+import os
+import json
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger('youtube_api')
+
+class ChannelNotFoundError(KeyError):
+    """Raised when no channel has the requested ID."""
+
+def station_number(channel):
+    # stationId is normally an int, but older records may hold a string
+    try:
+        return int(channel['stationId'])
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+def sort_key(channel):
+    """Stable listing order for paging: stationId, then id."""
+    return (station_number(channel), str(channel['id']))
+
+class ChannelRepository:
+    """Channel lineup stored in a JSON file, with in-memory indexes.
+
+    The file is parsed and validated only when its modification time or
+    size changes, and lookups by id or stationId are O(1). Every mutation
+    is a read-modify-write under a thread lock plus an exclusive lock file
+    shared with other processes, and the new file is written to a temporary
+    file and renamed over the old one so readers never see a partial write.
+    """
+
+    def __init__(self, path, validate=None):
+        self.path = path
+        self.validate = validate
+        self.lock = threading.RLock()
+        self.channels = []
+        self.by_id = {}
+        self.by_station_id = {}
+        # Channels in sort_key order, overall and per displayOption, for paging
+        self.sorted_views = {}
+        self.file_stamp = None
+
+    def _stamp(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _reload_if_changed(self):
+        stamp = self._stamp()
+        if stamp == self.file_stamp:
+            return
+        with open(self.path) as f:
+            channels = json.load(f)
+        if self.validate:
+            self.validate(channels)
+        self._index(channels)
+        self.file_stamp = stamp
+        logger.info(f"Loaded {len(channels)} channels from {self.path}")
+
+    def _index(self, channels):
+        self.channels = channels
+        self.by_id = {channel['id']: channel for channel in channels}
+        self.by_station_id = {channel['stationId']: channel for channel in channels}
+        ordered = sorted(channels, key=sort_key)
+        self.sorted_views = {None: ([sort_key(channel) for channel in ordered], ordered)}
+        for channel in ordered:
+            keys, view = self.sorted_views.setdefault(channel.get('displayOption'), ([], []))
+            keys.append(sort_key(channel))
+            view.append(channel)
+
+    def all(self):
+        """Return copies of every channel, in file order."""
+        with self.lock:
+            self._reload_if_changed()
+            # Callers add keys such as channelId, so they get their own dicts
+            return [dict(channel) for channel in self.channels]
+
+    def version(self):
+        """Changes whenever the channel file does."""
+        with self.lock:
+            self._reload_if_changed()
+            return self.file_stamp
+
+    def get(self, channel_id):
+        with self.lock:
+            self._reload_if_changed()
+            channel = self.by_id.get(channel_id)
+            return dict(channel) if channel is not None else None
+
+    def get_by_station_id(self, station_id):
+        with self.lock:
+            self._reload_if_changed()
+            channel = self.by_station_id.get(station_id)
+            return dict(channel) if channel is not None else None
+
+    def query(self, after=None, offset=0, limit=None, display_option=None,
+              station_min=None, station_max=None, name_prefix=None, count=True):
+        """Return a filtered slice of the lineup in sort_key order.
+
+        Unfiltered and stationId/displayOption-filtered queries only bisect
+        the precomputed sorted views, so their cost doesn't grow with the
+        lineup. A name prefix filter has to scan the matching range.
+
+        Args:
+            after: sort_key of the last channel already seen (cursor paging)
+            offset: Number of matching channels to skip (page-number paging)
+            limit: Maximum number of channels to return, None for all
+            display_option: Only channels with this displayOption
+            station_min: Lowest stationId to include
+            station_max: Highest stationId to include
+            name_prefix: Only channels whose name starts with this (case-insensitive)
+            count: Also count every match, for page totals
+
+        Returns:
+            A tuple of (channel copies, total matches or None, whether more follow)
+        """
+        with self.lock:
+            self._reload_if_changed()
+            keys, view = self.sorted_views.get(display_option, ([], []))
+            start = 0 if station_min is None else bisect.bisect_left(keys, (station_min, ''))
+            stop = len(keys) if station_max is None else bisect.bisect_left(keys, (station_max + 1, ''))
+            range_start = start
+            if after is not None:
+                start = max(start, bisect.bisect_right(keys, after))
+
+            if name_prefix is None:
+                total = stop - range_start if count else None
+                begin = min(start + offset, stop)
+                end = stop if limit is None else min(begin + limit, stop)
+                return [dict(channel) for channel in view[begin:end]], total, end < stop
+
+            prefix = name_prefix.casefold()
+            matches = (channel for channel in view[start:stop] if channel.get('name', '').casefold().startswith(prefix))
+            results = []
+            skipped = 0
+            has_more = False
+            for channel in matches:
+                if skipped < offset:
+                    skipped += 1
+                elif limit is None or len(results) < limit:
+                    results.append(dict(channel))
+                else:
+                    has_more = True
+                    break
+            total = None
+            if count:
+                total = sum(
+                    1 for channel in view[range_start:stop]
+                    if channel.get('name', '').casefold().startswith(prefix)
+                )
+            return results, total, has_more
+
+    @contextmanager
+    def _write_lock(self):
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, channels):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.data-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(channels, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._index(channels)
+        self.file_stamp = self._stamp()
+
+    def replace_all(self, channels):
+        with self._write_lock():
+            self._write(channels)
+
+    def add(self, channel):
+        """Add a channel, assigning the next id and, if missing, the next stationId."""
+        with self._write_lock():
+            self._reload_if_changed()
+            channels = list(self.channels)
+            # Generate a new ID (one more than the highest existing ID)
+            max_id = max([int(existing['id']) for existing in channels]) if channels else 0
+            channel['id'] = str(max_id + 1)
+            # Set default station ID if not provided
+            if 'stationId' not in channel:
+                max_station_id = max([existing.get('stationId', 200) for existing in channels]) if channels else 200
+                channel['stationId'] = max_station_id + 1
+            channels.append(channel)
+            self._write(channels)
+            return dict(channel)
+
+    def update(self, channel_id, channel):
+        """Replace a channel, keeping its id. Raises ChannelNotFoundError."""
+        with self._write_lock():
+            self._reload_if_changed()
+            if channel_id not in self.by_id:
+                raise ChannelNotFoundError(channel_id)
+            # Ensure ID remains the same
+            channel['id'] = channel_id
+            channels = [channel if existing['id'] == channel_id else existing for existing in self.channels]
+            self._write(channels)
+            return dict(channel)
+
+    def apply(self, operations, dry_run=False):
+        """Apply a batch of create, update, put and delete operations in one write.
+
+        Operations are (kind, channel_id, channel) tuples, applied in order:
+        create adds channel with the next id (and stationId, if missing),
+        update replaces channel_id, put replaces or adds the channel under its
+        own id, and delete removes channel_id. The channels created or
+        changed are validated together, and the batch is written atomically
+        or not at all.
+
+        Args:
+            operations: List of (kind, channel_id, channel) tuples
+            dry_run: Validate and return the results without writing
+
+        Returns:
+            One (kind, channel) tuple per operation, with the stored channel
+
+        Raises:
+            ValueError: An operation is invalid, names a missing channel, or
+                leaves a channel that fails validation
+        """
+        with self._write_lock():
+            self._reload_if_changed()
+            channels = {channel['id']: channel for channel in self.channels}
+            max_id = max([int(existing['id']) for existing in self.channels]) if self.channels else 0
+            max_station_id = max([existing.get('stationId', 200) for existing in self.channels]) if self.channels else 200
+            results = []
+            touched = {}
+            for number, (kind, channel_id, channel) in enumerate(operations, 1):
+                if kind == 'create':
+                    channel = dict(channel)
+                    max_id += 1
+                    channel['id'] = str(max_id)
+                    if 'stationId' not in channel:
+                        max_station_id += 1
+                        channel['stationId'] = max_station_id
+                elif kind in ('update', 'put'):
+                    if kind == 'update' and channel_id not in channels:
+                        raise ValueError(f"Operation {number}: channel {channel_id} not found")
+                    channel = dict(channel, id=channel_id)
+                elif kind == 'delete':
+                    if channel_id not in channels:
+                        raise ValueError(f"Operation {number}: channel {channel_id} not found")
+                    channel = channels.pop(channel_id)
+                    touched.pop(channel_id, None)
+                    results.append((kind, dict(channel)))
+                    continue
+                else:
+                    raise ValueError(f"Operation {number}: unknown operation '{kind}'")
+                if channel_id is not None and channel_id.isdigit():
+                    max_id = max(max_id, int(channel_id))
+                if isinstance(channel.get('stationId'), int):
+                    max_station_id = max(max_station_id, channel['stationId'])
+                channels[channel['id']] = touched[channel['id']] = channel
+                results.append((kind, dict(channel)))
+
+            # Untouched channels were validated when the file was loaded
+            if self.validate:
+                self.validate(list(touched.values()))
+            if not dry_run:
+                # dicts keep insertion order: existing channels stay in place, new ones go last
+                self._write(list(channels.values()))
+            return results
+
+    def delete(self, channel_id):
+        """Remove a channel and return it. Raises ChannelNotFoundError."""
+        with self._write_lock():
+            self._reload_if_changed()
+            deleted_channel = self.by_id.get(channel_id)
+            if deleted_channel is None:
+                raise ChannelNotFoundError(channel_id)
+            channels = [existing for existing in self.channels if existing['id'] != channel_id]
+            self._write(channels)
+            return dict(deleted_channel)
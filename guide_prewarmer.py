@@ -0,0 +1,88 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger('youtube_api')
+
+# Seconds between guide rebuilds. Kept below the 15 minute channel schedule
+# TTL so every rebuild finds the cache warm or refreshing in the background.
+PREWARM_INTERVAL = int(os.getenv('PREWARM_INTERVAL', 600))
+
+# YouTube quota units per day the pre-warmer may plan to spend (the default
+# API key allowance is 10,000). Rebuilds slow down to stay inside it.
+PREWARM_DAILY_QUOTA = int(os.getenv('PREWARM_DAILY_QUOTA', 8000))
+
+# Approximate quota cost of refreshing one station and one of its links
+# from a cold cache: channels.list + playlistItems.list + videos.list each
+STATION_QUOTA_COST = 3
+LINK_QUOTA_COST = 3
+
+def estimate_quota_cost(data, link_cost=None):
+    """Estimate the quota units a full guide rebuild costs with a cold cache.
+
+    link_cost(url) gives one link's cost, e.g. youtube_api.link_quota_cost,
+    which adds the channel resolution and catalog backfill a link still
+    needs; without it every link costs LINK_QUOTA_COST.
+    """
+    if link_cost is None:
+        link_cost = lambda link: LINK_QUOTA_COST
+    return sum(STATION_QUOTA_COST + sum(link_cost(link) for link in channel['youtubeLinks']) for channel in data)
+
+class GuidePrewarmer:
+    """Background thread that keeps a ready-to-render guide snapshot.
+
+    Every cycle it reads the channel data, builds the guide (which resolves
+    channel IDs and fetches videos through the cache) and swaps in the new
+    snapshot. Requests only ever read the latest snapshot.
+    """
+
+    def __init__(self, load_data, build_guide, interval=PREWARM_INTERVAL, daily_quota=PREWARM_DAILY_QUOTA, link_cost=None):
+        self.load_data = load_data
+        self.build_guide = build_guide
+        # Per-link quota cost for estimate_quota_cost
+        self.link_cost = link_cost
+        self.interval = interval
+        self.daily_quota = daily_quota
+        self.snapshot = None
+        self.refresh_event = threading.Event()
+        self.thread = None
+
+    def get_snapshot(self):
+        return self.snapshot
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name='guide-prewarmer', daemon=True)
+        self.thread.start()
+        logger.info(f"Guide pre-warmer started with interval={self.interval}s, daily_quota={self.daily_quota}")
+
+    def request_refresh(self):
+        # Rebuild as soon as possible, e.g. after the channel data changed
+        self.refresh_event.set()
+
+    def refresh(self):
+        """Build a new snapshot now and return the delay until the next one."""
+        started = time.monotonic()
+        data = self.load_data()
+        channels = self.build_guide(data)
+        self.snapshot = {'channels': channels, 'built_at': datetime.utcnow()}
+        logger.info(f"Guide snapshot rebuilt for {len(channels)} stations in {time.monotonic() - started:.2f}s")
+        return self._next_delay(data)
+
+    def _next_delay(self, data):
+        # Space rebuilds so a day of them stays within the quota budget
+        cycles_per_day = self.daily_quota / max(1, estimate_quota_cost(data, self.link_cost))
+        return max(self.interval, 24 * 3600 / max(cycles_per_day, 1e-9))
+
+    def _run(self):
+        while True:
+            try:
+                delay = self.refresh()
+            except Exception as e:
+                logger.error(f"Guide pre-warm failed: {e}")
+                delay = self.interval
+            self.refresh_event.wait(timeout=delay)
+            self.refresh_event.clear()
@@ -0,0 +1,72 @@
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from flask import Response
+
+logger = logging.getLogger('youtube_api')
+
+# Responses smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+class RenderedPage:
+    """A rendered page with its gzip encoding and validators, computed once."""
+
+    __slots__ = ('body', 'gzip_body', 'etag', 'last_modified')
+
+    def __init__(self, body, last_modified):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.gzip_body = gzip.compress(self.body, compresslevel=6) if len(self.body) >= MIN_COMPRESS_BYTES else None
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified = last_modified
+
+class PageCache:
+    """Small LRU of rendered pages keyed by whatever determines their content.
+
+    Keys must change whenever the output would (data version, guide state,
+    time slot), so an entry never needs invalidating; old keys just fall
+    out of the LRU.
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_render(self, key, render, last_modified=None):
+        with self.lock:
+            page = self.pages.get(key)
+            if page is not None:
+                self.pages.move_to_end(key)
+                return page
+        # Rendering outside the lock; two threads may render the same page once
+        page = RenderedPage(render(), last_modified)
+        with self.lock:
+            self.pages[key] = page
+            while len(self.pages) > self.max_entries:
+                self.pages.popitem(last=False)
+        logger.info(f"Rendered page for {key!r}, {len(page.body)} bytes")
+        return page
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+
+def page_response(page, request, mimetype='text/html'):
+    """Serve a RenderedPage with a strong ETag, 304 handling and negotiated gzip.
+
+    Each encoding is a separate representation, so the gzip body gets its
+    own strong ETag.
+    """
+    use_gzip = page.gzip_body is not None and request.accept_encodings['gzip'] > 0
+    response = Response(page.gzip_body if use_gzip else page.body, mimetype=mimetype)
+    response.set_etag(page.etag + '-gz' if use_gzip else page.etag)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Cacheable by browsers and proxies, but always revalidated
+    response.headers['Cache-Control'] = 'public, no-cache'
+    if page.last_modified is not None:
+        response.last_modified = page.last_modified
+    return response.make_conditional(request)
@@ -0,0 +1,160 @@
+import bisect
+import logging
+import threading
+from datetime import timedelta
+
+logger = logging.getLogger('youtube_api')
+
+DAY_SECONDS = 24 * 3600
+
+# Length assumed for a video whose duration is unknown, in minutes
+DEFAULT_PROGRAM_MINUTES = 30
+
+# Programs shown per station row: the one on now and the next two
+GUIDE_PROGRAMS_PER_ROW = 3
+
+def program_seconds(video):
+    # Durations are whole minutes; anything shorter still gets a minute
+    try:
+        minutes = int(video.get('duration') or DEFAULT_PROGRAM_MINUTES)
+    except (TypeError, ValueError):
+        minutes = DEFAULT_PROGRAM_MINUTES
+    return max(1, minutes) * 60
+
+class StationTimeline:
+    """A station's 24-hour program timeline.
+
+    The station's videos play back to back in order from midnight, looping
+    until the day is full, each for its real duration; the last program is
+    cut off at midnight so every day starts over from the first video. The
+    layout depends only on the videos and their durations, so it is the
+    same every day and is built once per change in content.
+    """
+
+    def __init__(self, videos):
+        self.videos = [video for video in videos if video]
+        self.signature = timeline_signature(self.videos)
+        # Program start offsets from midnight in seconds, and the video played
+        self.starts = []
+        self.programs = []
+        offset = 0
+        while self.videos and offset < DAY_SECONDS:
+            video = self.videos[len(self.starts) % len(self.videos)]
+            self.starts.append(offset)
+            self.programs.append(video)
+            offset += program_seconds(video)
+
+    def _end(self, index):
+        return self.starts[index + 1] if index + 1 < len(self.starts) else DAY_SECONDS
+
+    def index_at(self, offset):
+        """Index of the program on at offset seconds after midnight."""
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    def upcoming(self, when, count):
+        """The program on at when and the ones after it, as (start, end, video) tuples.
+
+        Args:
+            when: Timezone-aware datetime
+            count: Number of programs to return, continuing into the next day if needed
+
+        Returns:
+            A list of up to count (start datetime, end datetime, video) tuples
+        """
+        if not self.programs:
+            return []
+        day_start = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        index = self.index_at((when - day_start).total_seconds())
+        results = []
+        while len(results) < count:
+            results.append((
+                day_start + timedelta(seconds=self.starts[index]),
+                day_start + timedelta(seconds=self._end(index)),
+                self.programs[index]
+            ))
+            index += 1
+            if index == len(self.starts):
+                index = 0
+                day_start += timedelta(days=1)
+        return results
+
+def timeline_signature(videos):
+    return tuple((video.get('id'), video.get('duration')) for video in videos if video)
+
+def program_cells(timeline, when, count=GUIDE_PROGRAMS_PER_ROW):
+    """Video dicts for a guide row: copies with is_current and start/end times set."""
+    cells = []
+    for i, (start, end, video) in enumerate(timeline.upcoming(when, count)):
+        cells.append(dict(video, is_current=(i == 0), start_time=start, end_time=end))
+    return cells
+
+class ScheduleEngine:
+    """Builds and caches station timelines and the guide state computed from them.
+
+    Timelines are cached per station until its videos or their durations
+    change. The guide state (every station's program on now plus the next
+    ones) is cached until the first of those programs ends or the guide
+    version changes, so serving the guide is a single comparison and
+    dictionary lookup in between.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timelines = {}
+        # (version, valid_from, valid_until, channels) of the last guide state
+        self.guide_state = None
+
+    def timeline(self, station_key, videos):
+        signature = timeline_signature(videos)
+        with self.lock:
+            timeline = self.timelines.get(station_key)
+            if timeline is not None and timeline.signature == signature:
+                return timeline
+        timeline = StationTimeline(videos)
+        with self.lock:
+            self.timelines[station_key] = timeline
+        return timeline
+
+    def programs(self, station_key, videos, when, count=GUIDE_PROGRAMS_PER_ROW):
+        """What's on a station at when and the count - 1 programs after it."""
+        return program_cells(self.timeline(station_key, videos), when, count)
+
+    def guide_at(self, channels, version, when):
+        """Guide rows for when: each channel with 'videos' set to its programs.
+
+        Args:
+            channels: Stations with their full 'schedule' video lists
+            version: Changes whenever channels does, e.g. the snapshot build time
+            when: Timezone-aware datetime
+
+        Returns:
+            (rows, (valid_from, valid_until)): channel copies whose 'videos' are
+            the current and next programs, and the window those rows hold for,
+            both from the same guide state
+        """
+        state = self.guide_state
+        if state is not None and state[0] == version and state[1] <= when < state[2]:
+            return state[3], (state[1], state[2])
+
+        rows = []
+        valid_from = None
+        valid_until = None
+        for channel in channels:
+            videos = self.programs(channel['id'], channel.get('schedule') or [], when)
+            rows.append(dict(channel, videos=videos))
+            if videos:
+                # The state holds until any station's current program ends
+                start, end = videos[0]['start_time'], videos[0]['end_time']
+                valid_from = start if valid_from is None else max(valid_from, start)
+                valid_until = end if valid_until is None else min(valid_until, end)
+        if valid_until is None:
+            valid_from, valid_until = when, when + timedelta(minutes=DEFAULT_PROGRAM_MINUTES)
+
+        # Stations that left the lineup don't need their timelines anymore
+        with self.lock:
+            station_keys = {channel['id'] for channel in channels}
+            for station_key in list(self.timelines):
+                if station_key not in station_keys:
+                    del self.timelines[station_key]
+        self.guide_state = (version, valid_from, valid_until, rows)
+        return rows, (valid_from, valid_until)
@@ -0,0 +1,95 @@
+"""Production launcher for TubeGuide.
+
+Runs the app under a production server with SERVER_WORKERS processes:
+
+    wsgi  gunicorn with threaded workers, SERVER_CONCURRENCY threads each
+    asgi  uvicorn serving asgi:application; each worker holds up to
+          SERVER_CONCURRENCY open requests on one event loop
+
+gunicorn and uvicorn are optional; without them the app falls back to
+Werkzeug's server (fine for testing, not meant for production).
+
+Usage:
+    python serve.py [--mode wsgi|asgi] [--workers N] [--concurrency N] [--host H] [--port P]
+"""
+import os
+import logging
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger('youtube_api')
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('SERVER_PORT', 5000))
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 1))
+SERVER_CONCURRENCY = int(os.getenv('SERVER_CONCURRENCY', 100))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def run_asgi(args):
+    try:
+        import uvicorn
+    except ImportError:
+        logger.warning("uvicorn is not installed (pip install uvicorn), serving WSGI instead")
+        return run_wsgi(args)
+    uvicorn.run(
+        'asgi:application',
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_concurrency=args.concurrency,
+        app_dir=ROOT,
+        lifespan='on'
+    )
+
+def run_wsgi(args):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return run_werkzeug(args)
+
+    class GunicornApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{args.host}:{args.port}")
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', args.concurrency)
+
+        def load(self):
+            from app import app
+            return app
+
+    GunicornApplication().run()
+
+def run_werkzeug(args):
+    logger.warning("gunicorn is not installed (pip install gunicorn), using Werkzeug's development server")
+    from werkzeug.serving import run_simple
+    from app import app
+    # Werkzeug runs either threads or processes, not both
+    if args.workers > 1:
+        run_simple(args.host, args.port, app, processes=args.workers)
+    else:
+        run_simple(args.host, args.port, app, threaded=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default=SERVER_MODE, help='server interface (default SERVER_MODE)')
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='worker processes (default SERVER_WORKERS)')
+    parser.add_argument('--concurrency', type=int, default=SERVER_CONCURRENCY,
+                        help='requests each worker serves at once (default SERVER_CONCURRENCY)')
+    parser.add_argument('--host', default=SERVER_HOST, help='address to bind (default SERVER_HOST)')
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help='port to bind (default SERVER_PORT)')
+    args = parser.parse_args()
+
+    # Logging is configured (to youtube_api.log) when the app is imported
+    print(f"Starting {args.mode} server on {args.host}:{args.port} with {args.workers} workers")
+    if args.mode == 'asgi':
+        run_asgi(args)
+    else:
+        run_wsgi(args)
+
+if __name__ == '__main__':
+    main()
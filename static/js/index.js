@@ -12,6 +12,7 @@ import { switchTheme, loadSavedTheme } from './modules/theme.js';
 import { playVideo, closeVideoModal, openInYouTube, initVideoPlayer } from './modules/videoPlayer.js';
 import { initNavigation, getCurrentProgram, focusProgram, updateInfoDisplay } from './modules/navigation.js';
 import { hidePageLoader, initUtilities } from './modules/utilities.js';
+import { initLazyRows } from './modules/lazyRows.js';
 
 /**
  * Make certain functions available in the global scope
@@ -44,6 +45,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initNavigation();    // Set up keyboard navigation and focus management
     initVideoPlayer();   // Set up video player modal and events
     initUtilities();     // Set up time display, program widths and other utilities
+    initLazyRows();      // Load station rows rendered as placeholders when they scroll into view
     
     // Connect navigation module's escape key events to the video modal close function
     document.addEventListener('escapePressed', closeVideoModal);
@@ -0,0 +1,113 @@
+/**
+ * Lazy Rows module
+ * Loads guide rows that the server rendered as placeholders
+ * once they come close to the viewport
+ */
+import { updateInfoDisplay } from './navigation.js';
+import { updateProgramWidths } from './uiUtils.js';
+
+// Programs shown per row (the 90-minute window)
+const VIDEOS_PER_ROW = 3;
+
+/**
+ * Builds a program cell matching the server-rendered markup in index.html
+ *
+ * @param {Object} video - Program data from /api/channels/<id>/programs
+ * @param {number} rowIndex - Index of the guide row
+ * @param {number} colIndex - Index of the program within the row
+ * @returns {HTMLElement} - The program cell
+ */
+function buildProgramCell(video, rowIndex, colIndex) {
+    // The server marks the program on now; it is always the first one
+    const isCurrent = video.is_current !== undefined ? video.is_current : colIndex === 0;
+
+    const program = document.createElement('div');
+    program.className = isCurrent ? 'program current' : 'program unavailable';
+    program.setAttribute('role', 'gridcell');
+    program.tabIndex = isCurrent ? 0 : -1;
+    program.dataset.row = rowIndex;
+    program.dataset.col = colIndex;
+    program.dataset.videoId = video.id;
+    program.dataset.videoTitle = video.title;
+    program.dataset.description = video.description || 'No description available.';
+    program.dataset.duration = video.duration;
+    program.setAttribute('aria-label', isCurrent ? `Currently playing: ${video.title}` : `${video.title} (unavailable)`);
+
+    const info = document.createElement('div');
+    info.className = 'program-info';
+    const title = document.createElement('div');
+    title.className = 'program-title';
+    title.textContent = video.title;
+    info.appendChild(title);
+    program.appendChild(info);
+
+    program.addEventListener('mouseenter', function() {
+        updateInfoDisplay(this);
+    });
+    return program;
+}
+
+/**
+ * Fetches a row's videos and replaces its placeholder with program cells
+ *
+ * @param {HTMLElement} row - The .guide-row element to load
+ * @returns {Promise} - Resolves once the row has been filled
+ */
+function loadRow(row) {
+    const grid = row.querySelector('.program-grid');
+    const rows = Array.from(document.querySelectorAll('.guide-row'));
+    const rowIndex = rows.indexOf(row);
+    delete row.dataset.lazy;
+
+    return fetch(`/api/channels/${encodeURIComponent(row.dataset.channelId)}/programs?count=${VIDEOS_PER_ROW}`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Server error (${response.status})`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            grid.innerHTML = '';
+            const videos = data.programs.slice(0, VIDEOS_PER_ROW);
+            if (videos.length === 0) {
+                const empty = document.createElement('div');
+                empty.className = 'program no-content';
+                empty.setAttribute('role', 'status');
+                empty.innerHTML = '<p>No videos available</p>';
+                grid.appendChild(empty);
+                return;
+            }
+            videos.forEach((video, colIndex) => {
+                grid.appendChild(buildProgramCell(video, rowIndex, colIndex));
+            });
+            updateProgramWidths();
+        })
+        .catch(error => {
+            console.error('Error loading guide row:', error);
+            grid.innerHTML = '<div class="program no-content" role="status"><p>No videos available</p></div>';
+        });
+}
+
+// Load placeholder rows as they approach the viewport
+function initLazyRows() {
+    const lazyRows = document.querySelectorAll('.guide-row[data-lazy="true"]');
+    if (lazyRows.length === 0) return;
+
+    if (!('IntersectionObserver' in window)) {
+        lazyRows.forEach(loadRow);
+        return;
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadRow(entry.target);
+            }
+        });
+    }, { rootMargin: '200px 0px' });
+
+    lazyRows.forEach(row => observer.observe(row));
+}
+
+export { initLazyRows, loadRow, buildProgramCell };
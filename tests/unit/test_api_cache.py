@@ -0,0 +1,223 @@
+"""
+Unit tests for APICache
+
+These tests cover single-flight loads, stale-while-revalidate refreshes and
+the cross-process flight locks used with a shared backend
+"""
+
+import threading
+import time
+
+import pytest
+
+from youtube import api_cache as api_cache_module
+from youtube.api_cache import APICache, CacheMiss
+from youtube.cache_backends import SQLiteBackend
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def run_concurrently(count, target):
+    """Run target() in count threads at once; returns (results, errors) in thread order."""
+    results = [None] * count
+    errors = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+class SlowLoader:
+    """Loader that blocks until released and counts its calls."""
+
+    def __init__(self, cache, key, value='loaded', error=None):
+        self.cache = cache
+        self.key = key
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.cache.set(self.key, self.value)
+        return self.value
+
+
+@pytest.fixture
+def cache():
+    return APICache(max_size=100, ttl=60)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'cache.sqlite3')
+
+
+def test_get_returns_cached_value(cache):
+    cache.set('key', {'a': 1})
+    assert cache.get('key') == {'a': 1}
+    assert cache.get('missing') is None
+
+
+def test_cached_none_is_a_hit(cache):
+    cache.set('key', None)
+    assert cache.lookup('key') == (True, None)
+    assert cache.lookup('missing') == (False, None)
+    assert cache.get_or_load('key', lambda: pytest.fail("loader called for a cached None")) is None
+
+
+def test_concurrent_misses_share_one_load(cache):
+    loader = SlowLoader(cache, 'key')
+
+    def release_when_all_waiting():
+        loader.started.wait(5)
+        wait_until(lambda: 'key' in cache.flights)
+        time.sleep(0.05)
+        loader.release.set()
+
+    threading.Thread(target=release_when_all_waiting).start()
+    results, errors = run_concurrently(8, lambda: cache.get_or_load('key', loader))
+
+    assert loader.calls == 1
+    assert errors == [None] * 8
+    assert results == ['loaded'] * 8
+    assert cache.flights == {}
+
+
+def test_concurrent_misses_share_the_loader_exception(cache):
+    error = RuntimeError("YouTube is down")
+    loader = SlowLoader(cache, 'key', error=error)
+
+    def release_later():
+        loader.started.wait(5)
+        time.sleep(0.05)
+        loader.release.set()
+
+    threading.Thread(target=release_later).start()
+    results, errors = run_concurrently(4, lambda: cache.get_or_load('key', loader))
+
+    assert loader.calls == 1
+    assert all(e is error for e in errors)
+    # A failed load isn't cached, so the next caller tries again
+    assert cache.get_or_load('key', lambda: 'retried') == 'retried'
+
+
+def test_refreshable_entry_is_served_stale_then_refreshed(cache):
+    values = iter(['first', 'second'])
+    refreshed = threading.Event()
+
+    def loader():
+        value = next(values)
+        if value == 'second':
+            refreshed.set()
+        return value
+
+    assert cache.get_or_refresh('key', loader, soft_ttl=0.05, hard_ttl=60) == 'first'
+    assert cache.get_or_refresh('key', loader, soft_ttl=0.05, hard_ttl=60) == 'first'
+    time.sleep(0.1)
+
+    # Past the soft TTL: the stale value comes back at once while a refresh runs
+    assert cache.get_or_refresh('key', loader, soft_ttl=0.05, hard_ttl=60) == 'first'
+    assert refreshed.wait(2)
+    assert wait_until(lambda: cache.get_or_refresh('key', loader, soft_ttl=60, hard_ttl=60) == 'second')
+    assert cache.refreshing == set()
+
+
+def test_failed_refresh_keeps_serving_the_stale_value(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("refresh failed")
+        return 'stale'
+
+    cache.get_or_refresh('key', loader, soft_ttl=0.01, hard_ttl=60)
+    time.sleep(0.05)
+    assert cache.get_or_refresh('key', loader, soft_ttl=0.01, hard_ttl=60) == 'stale'
+    assert wait_until(lambda: len(calls) == 2 and not cache.refreshing)
+    assert cache.get_or_refresh('key', loader, soft_ttl=0.01, hard_ttl=60) == 'stale'
+
+
+def test_cached_call_answers_from_the_cache_or_raises_cache_miss(cache):
+    with pytest.raises(CacheMiss):
+        cache.cached_call(cache.get_or_load, 'key', lambda: pytest.fail("loader called under cached_call"))
+
+    cache.set('key', 'value')
+    assert cache.cached_call(cache.get_or_load, 'key', lambda: pytest.fail("loader called")) == 'value'
+    # Outside cached_call, lookups load again
+    assert cache.get_or_load('other', lambda: 'loaded') == 'loaded'
+
+
+def test_shared_backend_coalesces_loads_across_caches(sqlite_path):
+    # Two APICache instances over one database stand in for two worker processes
+    first = APICache(backend=SQLiteBackend(sqlite_path))
+    second = APICache(backend=SQLiteBackend(sqlite_path))
+    loader = SlowLoader(first, 'key')
+
+    leader = threading.Thread(target=lambda: first.get_or_load('key', loader))
+    leader.start()
+    assert loader.started.wait(5)
+
+    def release_later():
+        time.sleep(0.1)
+        loader.release.set()
+
+    threading.Thread(target=release_later).start()
+    assert second.get_or_load('key', lambda: pytest.fail("second process loaded too")) == 'loaded'
+    leader.join(5)
+
+    assert loader.calls == 1
+    assert first.backend.get('flight:key') is None
+
+
+def test_shared_backend_shares_the_leaders_exception(sqlite_path):
+    first = APICache(backend=SQLiteBackend(sqlite_path))
+    second = APICache(backend=SQLiteBackend(sqlite_path))
+    loader = SlowLoader(first, 'key', error=ValueError("bad channel"))
+
+    leader = threading.Thread(target=lambda: pytest.raises(ValueError, first.get_or_load, 'key', loader))
+    leader.start()
+    assert loader.started.wait(5)
+    threading.Timer(0.1, loader.release.set).start()
+
+    with pytest.raises(ValueError, match="bad channel"):
+        second.get_or_load('key', lambda: pytest.fail("second process loaded too"))
+    leader.join(5)
+
+
+def test_abandoned_flight_lock_times_out(sqlite_path, monkeypatch):
+    monkeypatch.setattr(api_cache_module, 'FLIGHT_LOCK_TTL', 0.3)
+    cache = APICache(backend=SQLiteBackend(sqlite_path))
+    # A leader in another process took the lock and died without a result
+    assert cache.backend.add('flight:key', 'dead-leader', 0.3)
+
+    started = time.monotonic()
+    assert cache.get_or_load('key', lambda: cache.set('key', 'mine') or 'mine') == 'mine'
+
+    assert time.monotonic() - started >= 0.25
+    assert cache.backend.get('flight:key') is None
@@ -0,0 +1,169 @@
+"""
+Unit tests for bulk channel import and export
+
+These tests drive /api/channels/bulk and /api/channels/export through the
+Flask app: parsing NDJSON and JSON bodies, applying a batch atomically,
+resolving each distinct link once, and round-tripping an export
+"""
+
+import json
+import os
+
+import pytest
+
+# Keep the guide pre-warmer from starting when app is imported
+os.environ.setdefault('PREWARM_ENABLED', 'false')
+
+import app as app_module
+from channel_repository import ChannelRepository
+from youtube import video_catalog, youtube_api
+from youtube.video_catalog import VideoCatalog
+
+
+def channel(channel_id, station_id, name='Station'):
+    return {
+        'id': channel_id,
+        'name': name,
+        'youtubeLinks': ['https://www.youtube.com/channel/UC1'],
+        'displayOption': 'random',
+        'stationId': station_id,
+        'channelId': 'UC1'
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    catalog = VideoCatalog(str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.setattr(video_catalog, '_catalog', catalog)
+    return catalog
+
+
+@pytest.fixture
+def resolved(catalog, monkeypatch):
+    """Links passed to the resolver; a handle @Name resolves to UC-name."""
+    calls = []
+
+    def get_channel_id_from_url(url):
+        calls.append(url)
+        kind, value = youtube_api.parse_channel_url(url)
+        if kind == 'channel':
+            return value
+        if value == 'Missing':
+            raise ValueError("Channel not found")
+        catalog.set_linked_channel_id(f'handle:{value.lower()}', f'UC-{value.lower()}')
+        return f'UC-{value.lower()}'
+
+    monkeypatch.setattr(app_module, 'get_channel_id_from_url', get_channel_id_from_url)
+    return calls
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps([channel('1', 201, name='News'), channel('2', 202, name='Music')]))
+    repository = ChannelRepository(str(path), validate=app_module.validate_data)
+    monkeypatch.setattr(app_module, 'channel_repository', repository)
+    monkeypatch.setattr(app_module, 'data_changed', lambda: None)
+    return repository
+
+
+@pytest.fixture
+def client(repository, resolved, monkeypatch):
+    monkeypatch.setenv('SKIP_API_KEY_CHECK', 'true')
+    return app_module.app.test_client()
+
+
+def ndjson(*items):
+    return '\n'.join(json.dumps(item) for item in items) + '\n'
+
+
+def new_channel(link, name):
+    return {'name': name, 'youtubeLinks': [link], 'displayOption': 'new'}
+
+
+def test_ndjson_batch_creates_updates_and_deletes(client, repository, resolved):
+    body = ndjson(
+        {'op': 'create', 'channel': new_channel('https://www.youtube.com/@Cooking', 'Cooking')},
+        {'op': 'create', 'channel': new_channel('https://www.youtube.com/@cooking', 'Cooking 2')},
+        {'op': 'update', 'id': '1', 'channel': channel('1', 201, name='World News')},
+        {'op': 'delete', 'id': '2'},
+        channel('9', 209, name='Sports'),
+    )
+
+    response = client.post('/api/channels/bulk', data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result['created'], result['updated'], result['deleted']) == (2, 2, 1)
+    assert result['results'] == [
+        {'op': 'create', 'id': '3'}, {'op': 'create', 'id': '4'},
+        {'op': 'update', 'id': '1'}, {'op': 'delete', 'id': '2'}, {'op': 'put', 'id': '9'}
+    ]
+    assert [c['name'] for c in repository.all()] == ['World News', 'Cooking', 'Cooking 2', 'Sports']
+    assert [c['stationId'] for c in repository.all()] == [201, 203, 204, 209]
+    assert repository.get('3')['channelId'] == repository.get('4')['channelId'] == 'UC-cooking'
+    assert repository.get('1')['channelId'] == 'UC1'
+    # Each distinct link is resolved once
+    assert sorted(resolved) == [
+        'https://www.youtube.com/@Cooking', 'https://www.youtube.com/@cooking', 'https://www.youtube.com/channel/UC1'
+    ]
+
+
+def test_unresolved_links_are_reported_and_stored_without_an_id(client, repository):
+    body = [{'op': 'create', 'channel': new_channel('https://www.youtube.com/@Missing', 'Gone')}]
+
+    result = client.post('/api/channels/bulk', json=body).get_json()
+
+    assert result['unresolved'] == ['https://www.youtube.com/@Missing']
+    assert 'channelId' not in repository.get('3')
+
+
+def test_resolve_false_skips_the_resolver(client, resolved):
+    body = {'operations': [{'op': 'create', 'channel': new_channel('https://www.youtube.com/@New', 'New')}]}
+
+    result = client.post('/api/channels/bulk?resolve=false', json=body).get_json()
+
+    assert result['created'] == 1 and result['resolved'] == {}
+    assert resolved == []
+
+
+@pytest.mark.parametrize('body, content_type, error', [
+    ('{"op": "delete", "id": "1"}\nnot json\n', 'application/x-ndjson', 'Line 2 is not valid JSON'),
+    ('not json', 'application/json', 'Request body is not valid JSON'),
+    ('{"channels": []}', 'application/json', 'Expected a JSON array of operations'),
+    ('[{"op": "update", "channel": {}}]', 'application/json', "Operation 1: 'id' is required"),
+])
+def test_malformed_bodies_are_rejected(client, body, content_type, error):
+    response = client.post('/api/channels/bulk', data=body, content_type=content_type)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+
+
+def test_an_invalid_operation_leaves_the_lineup_and_quota_untouched(client, repository, resolved):
+    body = [
+        {'op': 'create', 'channel': new_channel('https://www.youtube.com/@Valid', 'Valid')},
+        {'op': 'update', 'id': '1', 'channel': dict(channel('1', 201), displayOption='sideways')},
+    ]
+
+    response = client.post('/api/channels/bulk', json=body)
+
+    assert response.status_code == 400
+    assert [c['id'] for c in repository.all()] == ['1', '2']
+    assert resolved == []
+
+
+@pytest.mark.parametrize('export_format', ['ndjson', 'json'])
+def test_an_export_imports_back_unchanged(client, repository, export_format):
+    before = repository.all()
+    response = client.get(f'/api/channels/export?format={export_format}')
+    assert response.headers['Content-Disposition'] == f'attachment; filename=channels.{export_format}'
+
+    result = client.post('/api/channels/bulk', data=response.get_data(), content_type=response.mimetype).get_json()
+
+    assert result['updated'] == 2 and result['created'] == 0
+    assert repository.all() == before
+
+
+def test_unknown_export_format_is_rejected(client):
+    response = client.get('/api/channels/export?format=csv')
+    assert response.status_code == 400
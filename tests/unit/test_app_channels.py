@@ -0,0 +1,85 @@
+"""
+Unit tests for the /api/channels listing
+
+These tests cover offset paging, stable cursor paging and the errors returned
+for malformed paging parameters
+"""
+
+import base64
+import json
+import os
+
+import pytest
+
+# Keep the guide pre-warmer from starting when app is imported
+os.environ.setdefault('PREWARM_ENABLED', 'false')
+
+import app as app_module
+from channel_repository import ChannelRepository
+
+
+def channel(channel_id, station_id, name='Station'):
+    return {
+        'id': channel_id,
+        'name': name,
+        'youtubeLinks': ['https://www.youtube.com/channel/UC123456'],
+        'displayOption': 'random',
+        'stationId': station_id
+    }
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps([channel(str(i), 200 + i, f'Station {i}') for i in range(1, 6)]))
+    monkeypatch.setattr(app_module, 'channel_repository',
+                        ChannelRepository(str(path), validate=app_module.validate_data))
+    monkeypatch.setenv('SKIP_API_KEY_CHECK', 'true')
+    return app_module.app.test_client()
+
+
+def ids(response):
+    return [c['id'] for c in response.get_json()['channels']]
+
+
+def test_unpaged_listing_returns_every_channel(client):
+    response = client.get('/api/channels')
+    assert response.status_code == 200
+    assert [c['id'] for c in response.get_json()] == ['1', '2', '3', '4', '5']
+
+
+def test_page_paging_reports_totals(client):
+    body = client.get('/api/channels?page=2&pageSize=2').get_json()
+    assert [c['id'] for c in body['channels']] == ['3', '4']
+    assert (body['page'], body['total'], body['totalPages']) == (2, 5, 3)
+    assert body['nextCursor']
+
+
+def test_cursor_paging_walks_every_channel_once(client):
+    seen, cursor = [], None
+    while True:
+        url = '/api/channels?pageSize=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        seen += [c['id'] for c in body['channels']]
+        cursor = body['nextCursor']
+        if not cursor:
+            break
+    assert seen == ['1', '2', '3', '4', '5']
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    base64.urlsafe_b64encode(b'{not json').decode(),
+    base64.urlsafe_b64encode(b'[1]').decode(),
+    base64.urlsafe_b64encode(b'["x", "1"]').decode(),
+])
+def test_malformed_cursor_is_a_fixed_400(client, cursor):
+    response = client.get('/api/channels', query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_non_integer_page_names_the_parameter(client):
+    response = client.get('/api/channels?page=two')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': "'page' must be an integer"}
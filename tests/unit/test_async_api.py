@@ -0,0 +1,107 @@
+"""
+Unit tests for the async fetch functions used by the ASGI server
+
+These tests cover which calls stay on the event loop, which go to the fetch
+pool, and the retries done on the event loop
+"""
+
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from youtube import async_api, retry_decorator, youtube_api
+from youtube.api_cache import APICache
+from youtube.cache_backends import SQLiteBackend
+from youtube.retry_decorator import retry_on_error
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = APICache()
+    monkeypatch.setattr(async_api, 'api_cache', cache)
+    monkeypatch.setattr(youtube_api, 'api_cache', cache)
+    return cache
+
+
+def recording(result):
+    threads = []
+
+    def func(*args):
+        threads.append(threading.current_thread().name)
+        return result
+
+    return func, threads
+
+
+def test_memory_cache_hits_stay_on_the_event_loop(cache):
+    func, threads = recording('fetched')
+    cache.set('key', 'cached')
+    loader = lambda *args: cache.get_or_load('key', lambda: func(*args))
+
+    assert asyncio.run(async_api._call('key', loader)) == 'cached'
+    assert threads == []
+
+
+def test_misses_run_on_the_fetch_pool(cache):
+    func, threads = recording('fetched')
+    loader = lambda: cache.get_or_load('key', lambda: func())
+
+    assert asyncio.run(async_api._call('key', loader)) == 'fetched'
+    assert threads[0].startswith('youtube-fetch')
+
+
+def test_shared_backends_always_use_the_pool(cache, tmp_path):
+    cache.backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'))
+    cache.set('key', 'cached')
+    calls = []
+
+    def loader():
+        calls.append(threading.current_thread().name)
+        return cache.get_or_load('key', lambda: 'fetched')
+
+    assert asyncio.run(async_api._call('key', loader)) == 'cached'
+    assert calls[0].startswith('youtube-fetch')
+
+
+def test_channel_id_lookups_only_read_the_cache_on_the_loop(cache, monkeypatch):
+    monkeypatch.setattr(youtube_api, 'known_channel_id', lambda url: pytest.fail("catalog read on the event loop"))
+    url = 'https://www.youtube.com/@someone'
+    cache.set(youtube_api.channel_id_cache_key(url), 'UC123')
+
+    assert asyncio.run(async_api.get_channel_id_from_url(url)) == 'UC123'
+    assert asyncio.run(async_api.get_channel_id_from_url('https://www.youtube.com/channel/UC9')) == 'UC9'
+
+
+def test_pool_failures_are_retried_from_the_event_loop(cache, monkeypatch):
+    # No backoff wait, so the test doesn't sleep
+    monkeypatch.setattr(retry_decorator.random, 'uniform', lambda low, high: 0)
+    attempts = []
+
+    @retry_on_error(max_retries=5)
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise requests.ConnectionError("connection reset")
+        return 'ok'
+
+    assert asyncio.run(async_api._call(None, flaky)) == 'ok'
+    # Each pool task made one try; the three tries came from async retries
+    assert len(attempts) == 3
+
+
+def test_failed_resolution_is_cached_briefly(cache, monkeypatch):
+    lookups = []
+
+    def failing_search(query):
+        lookups.append(query)
+        raise RuntimeError("quota exhausted")
+
+    monkeypatch.setattr(youtube_api, 'known_channel_id', lambda url: None)
+    monkeypatch.setattr(youtube_api, 'get_channel_id_by_search', failing_search)
+    url = 'https://www.youtube.com/@unreachable'
+
+    assert youtube_api.get_channel_id_from_url(url) is None
+    assert youtube_api.get_channel_id_from_url(url) is None
+    assert lookups == ['unreachable']
@@ -0,0 +1,348 @@
+"""
+Unit tests for the APICache backends
+
+These tests cover LRU eviction in the memory backend, the sqlite backend's
+expiry, batched access-time updates and pruning, and the redis backend's
+RESP client against a small in-process fake server
+"""
+
+import fnmatch
+import socketserver
+import threading
+import time
+
+import pytest
+
+from youtube.api_cache import APICache
+from youtube.cache_backends import MemoryBackend, SQLiteBackend, RedisBackend, RedisError
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_size=3)
+
+
+def accessed_at(backend, key):
+    return backend._connection().execute("SELECT accessed_at FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_size=2)
+    backend.set('a', 1, 60)
+    backend.set('b', 2, 60)
+    backend.get('a')
+    backend.set('c', 3, 60)
+
+    assert backend.get('a') == 1
+    assert backend.get('b') is None
+    assert backend.get('c') == 3
+
+
+def test_memory_backend_add_only_stores_absent_keys():
+    backend = MemoryBackend()
+    assert backend.add('lock', 'first', 60)
+    assert not backend.add('lock', 'second', 60)
+    assert backend.get('lock') == 'first'
+
+
+def test_sqlite_backend_round_trips_and_expires(sqlite_backend):
+    sqlite_backend.set('key', {'videos': [1, 2]}, 60)
+    sqlite_backend.set('gone', 'value', 0.01)
+    time.sleep(0.02)
+
+    assert sqlite_backend.get('key') == {'videos': [1, 2]}
+    assert sqlite_backend.get('gone') is None
+
+
+def test_sqlite_backend_hits_do_not_write_within_the_update_interval(sqlite_backend):
+    sqlite_backend.set('key', 'value', 60)
+    written = accessed_at(sqlite_backend, 'key')
+    time.sleep(0.01)
+
+    for _ in range(5):
+        assert sqlite_backend.get('key') == 'value'
+    assert accessed_at(sqlite_backend, 'key') == written
+
+
+def test_sqlite_backend_refreshes_stale_access_times(sqlite_backend, monkeypatch):
+    monkeypatch.setattr(SQLiteBackend, 'ACCESS_UPDATE_INTERVAL', 0)
+    sqlite_backend.set('key', 'value', 60)
+    written = accessed_at(sqlite_backend, 'key')
+    time.sleep(0.01)
+
+    sqlite_backend.get('key')
+    assert accessed_at(sqlite_backend, 'key') > written
+
+
+def test_sqlite_backend_prunes_to_max_size(sqlite_backend, monkeypatch):
+    monkeypatch.setattr(SQLiteBackend, 'PRUNE_INTERVAL', 5)
+    for key in 'abcde':
+        sqlite_backend.set(key, key, 60)
+        time.sleep(0.001)
+
+    count = sqlite_backend._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count == 3
+    assert sqlite_backend.get('a') is None
+    assert sqlite_backend.get('e') == 'e'
+
+
+def test_sqlite_backend_add_replaces_expired_locks(sqlite_backend):
+    assert sqlite_backend.add('flight:key', 'old', 0.01)
+    assert not sqlite_backend.add('flight:key', 'other', 60)
+    time.sleep(0.02)
+    assert sqlite_backend.add('flight:key', 'new', 60)
+    assert sqlite_backend.get('flight:key') == 'new'
+
+
+@pytest.mark.parametrize('make_backend', [
+    lambda tmp_path: MemoryBackend(),
+    lambda tmp_path: SQLiteBackend(str(tmp_path / 'cache.sqlite3'))
+])
+def test_incr_counts_and_keeps_the_first_expiry(make_backend, tmp_path):
+    backend = make_backend(tmp_path)
+    assert backend.incr('counter', 5, 0.05) == 5
+    assert backend.incr('counter', -2, 60) == 3
+    assert backend.incr('counter', 0, 60) == 3
+    time.sleep(0.06)
+    assert backend.incr('counter', 0, 60) == 0
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Just enough of a Redis server for RedisBackend, on an ephemeral port.
+
+    Records every command with the connection it arrived on, can require a
+    password, and can be told to drop the next connection mid-command.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(('127.0.0.1', 0), FakeRedisHandler)
+        self.password = password
+        self.dbs = {}
+        self.lock = threading.Lock()
+        self.commands = []
+        self.connections = 0
+        self.drop_next = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        auth = f':{self.password}@' if self.password else ''
+        return f'redis://{auth}{host}:{port}'
+
+    def names(self):
+        return [command[1][0] for command in self.commands]
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            connection = server.connections
+        self.db = 0
+        self.authed = server.password is None
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            with server.lock:
+                server.commands.append((connection, [args[0].upper().decode()] + args[1:]))
+                if server.drop_next:
+                    server.drop_next -= 1
+                    return
+                reply = self.run(args[0].upper().decode(), args[1:])
+            self.wfile.write(reply)
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def store(self):
+        store = self.server.dbs.setdefault(self.db, {})
+        now = time.monotonic()
+        for key in [k for k, (_, expires) in store.items() if expires is not None and expires <= now]:
+            del store[key]
+        return store
+
+    def run(self, name, args):
+        if name == 'AUTH':
+            if args[0].decode() != self.server.password:
+                return b'-WRONGPASS invalid password\r\n'
+            self.authed = True
+            return b'+OK\r\n'
+        if not self.authed:
+            return b'-NOAUTH Authentication required.\r\n'
+        if name == 'SELECT':
+            self.db = int(args[0])
+            return b'+OK\r\n'
+        store = self.store()
+        if name == 'GET':
+            entry = store.get(args[0])
+            return bulk(entry[0] if entry else None)
+        if name == 'SET':
+            options = [arg.upper() for arg in args[2:]]
+            if b'NX' in options and args[0] in store:
+                return bulk(None)
+            expires = None
+            if b'PX' in options:
+                expires = time.monotonic() + int(args[2 + options.index(b'PX') + 1]) / 1000
+            store[args[0]] = (args[1], expires)
+            return b'+OK\r\n'
+        if name == 'DEL':
+            return b':%d\r\n' % sum(store.pop(key, None) is not None for key in args)
+        if name == 'INCRBY':
+            value, expires = store.get(args[0], (b'0', None))
+            if not value.lstrip(b'-').isdigit():
+                return b'-ERR value is not an integer or out of range\r\n'
+            value = int(value) + int(args[1])
+            store[args[0]] = (str(value).encode(), expires)
+            return b':%d\r\n' % value
+        if name == 'PEXPIRE':
+            if args[0] not in store:
+                return b':0\r\n'
+            store[args[0]] = (store[args[0]][0], time.monotonic() + int(args[1]) / 1000)
+            return b':1\r\n'
+        if name == 'SCAN':
+            pattern = args[args.index(b'MATCH') + 1].decode()
+            keys = [key for key in store if fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b'*2\r\n' + bulk(b'0') + b'*%d\r\n' % len(keys) + b''.join(bulk(key) for key in keys)
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+def bulk(value):
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer()
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_backend(redis_server):
+    return RedisBackend(redis_server.url, prefix='test:', socket_timeout=2)
+
+
+def test_redis_backend_round_trips_values_and_locks(redis_backend):
+    redis_backend.set('key', {'videos': [1, 2]}, 60)
+    assert redis_backend.get('key') == {'videos': [1, 2]}
+    assert redis_backend.get('missing') is None
+
+    assert redis_backend.add('lock', 'first', 60)
+    assert not redis_backend.add('lock', 'second', 60)
+    assert redis_backend.get('lock') == 'first'
+
+    redis_backend.set('gone', 'value', 0.01)
+    time.sleep(0.02)
+    assert redis_backend.get('gone') is None
+
+
+def test_redis_backend_clear_only_removes_its_prefix(redis_server, redis_backend):
+    other = RedisBackend(redis_server.url, prefix='other:')
+    redis_backend.set('a', 1, 60)
+    redis_backend.set('b', 2, 60)
+    other.set('a', 'kept', 60)
+
+    redis_backend.clear()
+    assert redis_backend.get('a') is None
+    assert redis_backend.get('b') is None
+    assert other.get('a') == 'kept'
+
+
+def test_redis_backend_incr_sets_expiry_only_on_new_counters(redis_server, redis_backend):
+    assert redis_backend.incr('counter', 5, 60) == 5
+    assert redis_backend.incr('counter', -2, 60) == 3
+    assert redis_server.names().count('PEXPIRE') == 1
+
+
+def test_redis_backend_authenticates_and_selects_on_connect(redis_server):
+    redis_server.password = 'secret'
+    backend = RedisBackend(redis_server.url + '/3')
+    backend.set('key', 'value', 60)
+    assert backend.get('key') == 'value'
+
+    assert redis_server.names() == ['AUTH', 'SELECT', 'SET', 'GET']
+    assert redis_server.commands[0][1][1] == b'secret'
+    assert set(redis_server.dbs) == {3}
+
+
+def test_redis_backend_raises_error_replies(redis_server, redis_backend):
+    redis_backend.execute('SET', 'test:text', 'not a number')
+    with pytest.raises(RedisError, match='not an integer'):
+        redis_backend.incr('text', 1, 60)
+
+    # An error reply leaves the connection usable
+    redis_backend.set('key', 'value', 60)
+    assert redis_backend.get('key') == 'value'
+    assert redis_server.connections == 1
+
+
+def test_redis_backend_rejects_a_wrong_password(redis_server):
+    redis_server.password = 'secret'
+    backend = RedisBackend(redis_server.url.replace('redis://', 'redis://:wrong@'))
+    with pytest.raises(RedisError, match='WRONGPASS'):
+        backend.get('key')
+
+
+def test_redis_backend_reconnects_once_after_a_dropped_connection(redis_server, redis_backend):
+    redis_backend.set('key', 'value', 60)
+    redis_server.drop_next = 1
+
+    assert redis_backend.get('key') == 'value'
+    assert redis_server.connections == 2
+    # The dropped GET was sent again on the new connection
+    assert [(conn, args[0]) for conn, args in redis_server.commands[1:]] == [(1, 'GET'), (2, 'GET')]
+
+
+def test_redis_backend_gives_up_after_the_second_drop(redis_server, redis_backend):
+    redis_backend.set('key', 'value', 60)
+    redis_server.drop_next = 2
+
+    with pytest.raises(ConnectionError):
+        redis_backend.get('key')
+    # The next command connects afresh
+    assert redis_backend.get('key') == 'value'
+    assert redis_server.connections == 3
+
+
+def test_redis_backend_coalesces_loads_across_caches(redis_server):
+    # Two APICache instances over one server stand in for two worker processes
+    first = APICache(backend=RedisBackend(redis_server.url, prefix='test:'))
+    second = APICache(backend=RedisBackend(redis_server.url, prefix='test:'))
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        first.set('key', 'loaded')
+        return 'loaded'
+
+    leader = threading.Thread(target=lambda: first.get_or_load('key', loader))
+    leader.start()
+    assert started.wait(5)
+    threading.Timer(0.1, release.set).start()
+
+    assert second.get_or_load('key', lambda: pytest.fail("second process loaded too")) == 'loaded'
+    leader.join(5)
+
+    assert calls == [1]
+    assert first.backend.get('flight:key') is None
+    assert 'SET' in redis_server.names() and 'DEL' in redis_server.names()
@@ -0,0 +1,142 @@
+"""
+Unit tests for ChannelRepository
+
+These tests cover the indexed lookups, atomic writes and reloading when the
+channel file changes on disk
+"""
+
+import json
+import os
+
+import pytest
+
+from channel_repository import ChannelRepository, ChannelNotFoundError
+
+
+def channel(channel_id, station_id, name='Station', display_option='random'):
+    return {
+        'id': channel_id,
+        'name': name,
+        'youtubeLinks': ['https://www.youtube.com/channel/UC123456'],
+        'displayOption': display_option,
+        'stationId': station_id
+    }
+
+
+def write_file(path, channels):
+    with open(path, 'w') as f:
+        json.dump(channels, f)
+
+
+def touch_later(path):
+    # Some filesystems only keep whole-second mtimes; make the change visible
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def leftover_temp_files(directory):
+    return [name for name in os.listdir(directory) if name.startswith('.data-')]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'data.json'
+    write_file(path, [channel('1', 201, 'News'), channel('2', 202, 'Music')])
+    return str(path)
+
+
+@pytest.fixture
+def repository(path):
+    return ChannelRepository(path)
+
+
+def test_lookups_by_id_and_station_id(repository):
+    assert repository.get('1')['name'] == 'News'
+    assert repository.get_by_station_id(202)['name'] == 'Music'
+    assert repository.get('missing') is None
+
+
+def test_returned_channels_are_copies(repository):
+    repository.get('1')['name'] = 'Changed'
+    repository.all()[0]['channelId'] = 'UC1'
+    assert repository.get('1') == channel('1', 201, 'News')
+
+
+def test_add_writes_the_file_atomically(repository, path):
+    added = repository.add(channel(None, 203, 'Sports'))
+
+    assert added['id'] == '3'
+    with open(path) as f:
+        assert [c['name'] for c in json.load(f)] == ['News', 'Music', 'Sports']
+    assert leftover_temp_files(os.path.dirname(path)) == []
+
+
+def test_failed_write_leaves_the_file_untouched(repository, path, monkeypatch):
+    with open(path) as f:
+        before = f.read()
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr('channel_repository.json.dump', failing_dump)
+    with pytest.raises(OSError):
+        repository.update('1', channel('1', 201, 'Renamed'))
+
+    with open(path) as f:
+        assert f.read() == before
+    assert leftover_temp_files(os.path.dirname(path)) == []
+    assert repository.get('1')['name'] == 'News'
+
+
+def test_update_and_delete(repository):
+    repository.update('2', channel('2', 202, 'Jazz'))
+    assert repository.get('2')['name'] == 'Jazz'
+
+    assert repository.delete('1')['name'] == 'News'
+    assert repository.get('1') is None
+    with pytest.raises(ChannelNotFoundError):
+        repository.delete('1')
+
+
+def test_reloads_when_the_file_changes(repository, path):
+    assert repository.get('3') is None
+    version = repository.version()
+
+    # Another process (or an editor) rewrites the file
+    write_file(path, [channel('3', 301, 'Weather')])
+    touch_later(path)
+
+    assert repository.get('3')['name'] == 'Weather'
+    assert repository.get('1') is None
+    assert repository.version() != version
+
+
+def test_does_not_reparse_an_unchanged_file(repository, monkeypatch):
+    repository.all()
+    monkeypatch.setattr('channel_repository.json.load', lambda f: pytest.fail("file parsed again"))
+    assert repository.get('1')['name'] == 'News'
+
+
+def test_writes_see_changes_made_by_other_processes(repository, path):
+    other = ChannelRepository(path)
+    other.add(channel(None, 203, 'Sports'))
+    touch_later(path)
+
+    added = repository.add(channel(None, 204, 'Kids'))
+    assert added['id'] == '4'
+    assert [c['name'] for c in repository.all()] == ['News', 'Music', 'Sports', 'Kids']
+
+
+def test_apply_validates_the_whole_batch_before_writing(path):
+    def validate(channels):
+        for c in channels:
+            if not c['name']:
+                raise ValueError("Channel name is required")
+
+    repository = ChannelRepository(path, validate=validate)
+    with pytest.raises(ValueError):
+        repository.apply([
+            ('create', None, channel(None, 203, 'Sports')),
+            ('update', '1', channel('1', 201, ''))
+        ])
+    assert [c['name'] for c in repository.all()] == ['News', 'Music']
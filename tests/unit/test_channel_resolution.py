@@ -0,0 +1,93 @@
+"""
+Unit tests for the channel link resolution index
+
+These tests cover reading IDs from channel URLs, resolving handles, custom
+URLs and usernames once into the catalog, and the quota a link is
+estimated to cost
+"""
+
+import pytest
+
+from youtube import video_catalog, youtube_api
+from youtube.api_cache import APICache
+from youtube.video_catalog import VideoCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    catalog = VideoCatalog(str(tmp_path / 'catalog.sqlite3'))
+    monkeypatch.setattr(video_catalog, '_catalog', catalog)
+    monkeypatch.setattr(youtube_api, 'api_cache', APICache())
+    return catalog
+
+
+@pytest.fixture
+def searches(catalog, monkeypatch):
+    """Queries sent to the search API; every one finds UC-<query>."""
+    searches = []
+
+    def get_channel_id_by_search(query):
+        searches.append(query)
+        return f'UC-{query.lower()}'
+
+    monkeypatch.setattr(youtube_api, 'get_channel_id_by_search', get_channel_id_by_search)
+    return searches
+
+
+def test_channel_urls_never_call_the_api(searches):
+    url = 'https://www.youtube.com/channel/UCabc?view=0'
+
+    assert youtube_api.known_channel_id(url) == 'UCabc'
+    assert youtube_api.get_channel_id_from_url(url) == 'UCabc'
+    assert searches == []
+
+
+def test_handles_resolve_once_into_the_catalog(catalog, searches, monkeypatch):
+    url = 'https://www.youtube.com/@Cooking'
+    assert youtube_api.known_channel_id(url) is None
+
+    assert youtube_api.get_channel_id_from_url(url) == 'UC-cooking'
+    assert catalog.get_linked_channel_id('handle:cooking') == 'UC-cooking'
+
+    # After a restart the cache is empty but the index still answers,
+    # for every spelling of the handle
+    monkeypatch.setattr(youtube_api, 'api_cache', APICache())
+    assert youtube_api.get_channel_id_from_url('https://www.youtube.com/@COOKING') == 'UC-cooking'
+    assert youtube_api.known_channel_id('https://www.youtube.com/@cooking') == 'UC-cooking'
+    assert searches == ['Cooking']
+
+
+def test_custom_urls_are_case_sensitive(catalog, searches):
+    youtube_api.get_channel_id_from_url('https://www.youtube.com/c/Cooking')
+
+    assert youtube_api.known_channel_id('https://www.youtube.com/c/Cooking') == 'UC-cooking'
+    assert youtube_api.known_channel_id('https://www.youtube.com/c/cooking') is None
+
+
+def test_links_matching_no_channel_are_not_indexed(catalog, monkeypatch):
+    monkeypatch.setattr(youtube_api, 'get_channel_id_by_search', lambda query: None)
+
+    assert youtube_api.get_channel_id_from_url('https://www.youtube.com/@nobody') is None
+    assert catalog.get_linked_channel_id('handle:nobody') is None
+
+
+def test_unsupported_urls_resolve_to_none(searches):
+    assert youtube_api.get_channel_id_from_url('https://example.com/@Cooking') is None
+    assert youtube_api.known_channel_id('https://example.com/@Cooking') is None
+    assert searches == []
+
+
+def test_link_quota_cost_counts_only_pending_one_time_work(catalog, searches):
+    refresh = youtube_api.LINK_REFRESH_QUOTA_COST
+    backfill = youtube_api.CATALOG_BACKFILL_MAX_PAGES
+    handle = 'https://www.youtube.com/@Cooking'
+
+    assert youtube_api.link_quota_cost(handle) == refresh + 100 + backfill
+    assert youtube_api.link_quota_cost('https://www.youtube.com/user/cook') == refresh + 1 + backfill
+
+    youtube_api.get_channel_id_from_url(handle)
+    assert youtube_api.link_quota_cost(handle) == refresh + backfill
+
+    catalog.mark_backfilled('UC-cooking')
+    assert youtube_api.link_quota_cost(handle) == refresh
+    assert youtube_api.link_quota_cost('https://example.com/x') == 0
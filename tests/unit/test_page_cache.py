@@ -0,0 +1,92 @@
+"""
+Unit tests for the rendered page cache
+
+These tests cover rendering each key once, the LRU bound, and serving pages
+with negotiated gzip, strong ETags and 304 responses
+"""
+
+import gzip
+from datetime import datetime
+
+import pytest
+import pytz
+from flask import Flask, request
+
+from page_cache import PageCache, page_response, MIN_COMPRESS_BYTES
+
+LAST_MODIFIED = pytz.utc.localize(datetime(2024, 1, 1, 12, 0))
+BODY = '<p>' + 'x' * MIN_COMPRESS_BYTES + '</p>'
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    cache = PageCache()
+    pages = {'big': BODY, 'small': '<p>hi</p>'}
+
+    @app.route('/<name>')
+    def page(name):
+        return page_response(cache.get_or_render(name, lambda: pages[name], LAST_MODIFIED), request)
+
+    return app.test_client()
+
+
+def test_pages_render_once_per_key_and_evict_least_recently_used():
+    cache = PageCache(max_entries=2)
+    renders = []
+
+    def render(key):
+        return lambda: renders.append(key) or key
+
+    for key in ['a', 'b', 'a', 'c', 'a', 'b']:
+        cache.get_or_render(key, render(key))
+
+    assert renders == ['a', 'b', 'c', 'b']
+    assert list(cache.pages) == ['a', 'b']
+
+
+def test_gzip_is_served_when_accepted(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.get_data()).decode() == BODY
+    assert response.headers['ETag'].endswith('-gz"')
+
+
+def test_identity_is_served_otherwise(client):
+    response = client.get('/big')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data(as_text=True) == BODY
+    # Small pages are never compressed
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'identity'])
+def test_matching_etag_is_a_304_per_encoding(client, encoding):
+    headers = {'Accept-Encoding': encoding}
+    etag = client.get('/big', headers=headers).headers['ETag']
+
+    response = client.get('/big', headers=dict(headers, **{'If-None-Match': etag}))
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_the_other_encodings_etag_does_not_match(client):
+    gzip_etag = client.get('/big', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    response = client.get('/big', headers={'If-None-Match': gzip_etag})
+
+    assert response.status_code == 200
+
+
+def test_if_modified_since_is_honoured(client):
+    response = client.get('/big', headers={'If-Modified-Since': 'Mon, 01 Jan 2024 12:00:00 GMT'})
+    assert response.status_code == 304
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+    response = client.get('/big', headers={'If-Modified-Since': 'Mon, 01 Jan 2024 11:59:00 GMT'})
+    assert response.status_code == 200
@@ -0,0 +1,194 @@
+"""
+Unit tests for the YouTube API quota governor
+
+These tests cover quota accounting, spend shared between processes through
+a cache backend, the circuit breaker's closed, open and half-open states and
+the guide pre-warmer's rebuild cost estimate
+"""
+
+import pytest
+
+from guide_prewarmer import estimate_quota_cost
+from youtube import quota_governor as quota_governor_module
+from youtube.cache_backends import SQLiteBackend
+from youtube.quota_governor import QuotaGovernor, QuotaUnavailableError, method_for_request
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(quota_governor_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def governor(clock):
+    return QuotaGovernor(daily_quota=500, failure_threshold=3, reset_timeout=60)
+
+
+def trip(governor):
+    for _ in range(governor.failure_threshold):
+        governor.before_call('videos.list')
+        governor.record_failure(503)
+
+
+def test_method_for_request():
+    assert method_for_request('/youtube/v3/search', 'GET') == 'search.list'
+    assert method_for_request('/youtube/v3/playlistItems', 'GET') == 'playlistItems.list'
+    assert method_for_request('/youtube/v3/videos', 'POST') == 'videos.insert'
+    assert method_for_request('/discovery/v1/apis', 'GET') is None
+
+
+def test_charges_each_call(governor):
+    governor.before_call('search.list')
+    governor.before_call('videos.list')
+
+    report = governor.report()
+    assert report['spent'] == 101
+    assert report['methods']['search.list'] == {'calls': 1, 'units': 100}
+
+
+def test_refuses_calls_past_the_daily_quota(governor):
+    for _ in range(5):
+        governor.before_call('search.list')
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('videos.list')
+    assert governor.spent == 500
+
+
+def test_opens_after_consecutive_failures(governor):
+    governor.before_call('videos.list')
+    governor.record_failure(503)
+    governor.record_failure(None)
+    assert not governor.is_open()
+
+    governor.record_failure(429)
+    assert governor.is_open()
+    assert governor.report()['circuit']['state'] == 'open'
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('videos.list')
+
+
+def test_client_errors_and_successes_do_not_open(governor):
+    governor.record_failure(503)
+    governor.record_failure(503)
+    governor.record_success()
+    governor.record_failure(503)
+    governor.record_failure(404)
+    governor.record_failure(400)
+    assert not governor.is_open()
+
+
+def test_half_open_lets_one_probe_through(governor, clock):
+    trip(governor)
+    clock.now += 61
+
+    assert governor.report()['circuit']['state'] == 'half-open'
+    governor.before_call('videos.list')
+    # Only the probe goes out until it reports back
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('videos.list')
+
+
+def test_successful_probe_closes(governor, clock):
+    trip(governor)
+    clock.now += 61
+    governor.before_call('videos.list')
+    governor.record_success()
+
+    assert governor.report()['circuit'] == {'state': 'closed', 'failures': 0, 'retryInSeconds': 0}
+    governor.before_call('videos.list')
+
+
+def test_failed_probe_reopens(governor, clock):
+    trip(governor)
+    clock.now += 61
+    governor.before_call('videos.list')
+    governor.record_failure(500)
+
+    assert governor.is_open()
+    assert governor.report()['circuit']['retryInSeconds'] == 60
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('videos.list')
+
+
+def test_client_error_probe_closes(governor, clock):
+    trip(governor)
+    clock.now += 61
+    governor.before_call('videos.list')
+    governor.record_failure(404)
+
+    assert governor.report()['circuit']['state'] == 'closed'
+
+
+def test_exhausted_quota_opens_until_the_daily_reset(governor, clock):
+    governor.before_call('videos.list')
+    governor.record_failure(403, quota_exhausted=True)
+
+    assert governor.open_until == governor._next_reset()
+    clock.now += 3600
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('videos.list')
+
+
+@pytest.fixture
+def shared_backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'cache.sqlite3'))
+
+
+def test_shared_backend_counts_spend_across_processes(shared_backend, clock):
+    # Two governors over one database stand in for two worker processes
+    first = QuotaGovernor(daily_quota=250, backend=shared_backend)
+    second = QuotaGovernor(daily_quota=250, backend=shared_backend)
+
+    first.before_call('search.list')
+    second.before_call('search.list')
+    with pytest.raises(QuotaUnavailableError):
+        first.before_call('search.list')
+    second.before_call('videos.list')
+
+    for governor in (first, second):
+        report = governor.report()
+        assert report['spent'] == 201
+        assert report['remaining'] == 49
+        assert report['methods'] == {
+            'search.list': {'calls': 2, 'units': 200},
+            'videos.list': {'calls': 1, 'units': 1}
+        }
+
+
+def test_refused_calls_give_their_reservation_back(shared_backend, clock):
+    governor = QuotaGovernor(daily_quota=150, backend=shared_backend)
+    governor.before_call('search.list')
+    with pytest.raises(QuotaUnavailableError):
+        governor.before_call('search.list')
+    governor.before_call('videos.list')
+    assert governor.report()['spent'] == 101
+
+
+def test_unshared_backends_count_locally(clock):
+    from youtube.cache_backends import MemoryBackend
+
+    governor = QuotaGovernor(backend=MemoryBackend())
+    assert governor.backend is None
+    governor.before_call('videos.list')
+    assert governor.report()['spent'] == 1
+
+
+def test_rebuild_estimate_includes_pending_one_time_costs():
+    data = [
+        {'youtubeLinks': ['https://www.youtube.com/@new', 'https://www.youtube.com/channel/UC1']},
+        {'youtubeLinks': []}
+    ]
+    costs = {'https://www.youtube.com/@new': 123, 'https://www.youtube.com/channel/UC1': 3}
+
+    assert estimate_quota_cost(data) == 3 + 3 + 3 + 3
+    assert estimate_quota_cost(data, costs.get) == 3 + 123 + 3 + 3
@@ -0,0 +1,126 @@
+"""
+Unit tests for the retry decorators
+
+These tests cover retries of transient errors, nested decorators, the
+request deadline, deferred retries and the async variant
+"""
+
+import asyncio
+import time
+
+import pytest
+import requests
+
+from youtube import retry_decorator
+from youtube.retry_decorator import (
+    RetryBudget, async_retry_on_error, retries_deferred, retry_deadline, retry_on_error
+)
+
+
+class Flaky:
+    """Callable failing with a connection error a given number of times."""
+
+    __name__ = 'flaky'
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise requests.ConnectionError("connection reset")
+        return 'ok'
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    budget = RetryBudget(capacity=100, refill_rate=0)
+    monkeypatch.setattr(retry_decorator, 'retry_budget', budget)
+    return budget
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(retry_decorator.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_retries_transient_errors(sleeps):
+    flaky = Flaky(2)
+    assert retry_on_error(max_retries=3, base_delay=1)(flaky)() == 'ok'
+    assert flaky.calls == 3
+    assert len(sleeps) == 2
+    assert sleeps[1] > sleeps[0]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    flaky = Flaky(10)
+    with pytest.raises(requests.ConnectionError):
+        retry_on_error(max_retries=2)(flaky)()
+    assert flaky.calls == 3
+
+
+def test_nested_decorators_do_not_multiply_attempts(sleeps):
+    flaky = Flaky(10)
+    inner = retry_on_error(max_retries=2)(flaky)
+    outer = retry_on_error(max_retries=2)(lambda: inner())
+    with pytest.raises(requests.ConnectionError):
+        outer()
+    assert flaky.calls == 3
+
+
+def test_no_retry_past_the_deadline(sleeps):
+    flaky = Flaky(10)
+    with retry_deadline(time.monotonic() + 0.5):
+        with pytest.raises(requests.ConnectionError):
+            retry_on_error(max_retries=3, base_delay=1)(flaky)()
+    assert flaky.calls == 1
+
+
+def test_retry_budget_limits_retries(budget, sleeps):
+    budget.tokens = 1
+    flaky = Flaky(10)
+    with pytest.raises(requests.ConnectionError):
+        retry_on_error(max_retries=5)(flaky)()
+    assert flaky.calls == 2
+
+
+def test_deferred_retries_make_one_attempt(sleeps):
+    flaky = Flaky(1)
+    with retries_deferred():
+        with pytest.raises(requests.ConnectionError) as error:
+            retry_on_error(max_retries=3)(flaky)()
+    assert flaky.calls == 1
+    assert sleeps == []
+    # Not marked as given up, so the async caller still retries it
+    assert not getattr(error.value, '_retries_exhausted', False)
+
+
+def test_async_retries_wait_on_the_event_loop(sleeps):
+    flaky = Flaky(2)
+
+    @async_retry_on_error(max_retries=3, base_delay=0.01)
+    async def fetch():
+        return flaky()
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.001)
+
+        ticking = asyncio.ensure_future(ticker())
+        result = await fetch()
+        ticking.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == 'ok'
+    assert flaky.calls == 3
+    # The loop kept running other work during the backoff, and no thread slept
+    assert len(ticks) > 2
+    assert sleeps == []
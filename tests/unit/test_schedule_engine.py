@@ -0,0 +1,89 @@
+"""
+Unit tests for the schedule engine
+
+These tests cover the bisected station timelines, wrapping past midnight and
+caching timelines and guide state until something changes
+"""
+
+from datetime import datetime, timedelta
+
+import pytz
+
+from schedule_engine import ScheduleEngine, StationTimeline, DAY_SECONDS
+
+MIDNIGHT = pytz.utc.localize(datetime(2024, 1, 1))
+
+
+def video(video_id, duration):
+    return {'id': video_id, 'duration': duration}
+
+
+def at(hours=0, minutes=0, seconds=0):
+    return MIDNIGHT + timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+
+def test_timeline_loops_videos_until_midnight():
+    timeline = StationTimeline([video('a', 60), video('b', 30), None])
+
+    assert timeline.starts[:4] == [0, 3600, 5400, 9000]
+    assert [v['id'] for v in timeline.programs[:3]] == ['a', 'b', 'a']
+    assert timeline.starts[-1] < DAY_SECONDS
+    # Unknown durations count as the default, bad ones too
+    assert StationTimeline([video('x', None), video('y', 'n/a')]).starts[:3] == [0, 1800, 3600]
+
+
+def test_index_at_bisects_program_boundaries():
+    timeline = StationTimeline([video('a', 60), video('b', 30)])
+
+    assert timeline.index_at(0) == 0
+    assert timeline.index_at(3599) == 0
+    assert timeline.index_at(3600) == 1
+    assert timeline.index_at(5399) == 1
+    assert timeline.index_at(5400) == 2
+
+
+def test_upcoming_cuts_the_last_program_and_wraps_to_the_next_day():
+    # 7-hour programs: 00:00, 07:00, 14:00, 21:00 cut short at midnight
+    timeline = StationTimeline([video('a', 7 * 60), video('b', 7 * 60)])
+
+    programs = timeline.upcoming(at(22), 3)
+
+    assert [(start, end, v['id']) for start, end, v in programs] == [
+        (at(21), at(24), 'b'),
+        (at(24), at(31), 'a'),
+        (at(31), at(38), 'b'),
+    ]
+
+
+def test_timelines_are_rebuilt_only_when_videos_change():
+    engine = ScheduleEngine()
+    videos = [video('a', 60)]
+    first = engine.timeline('station', videos)
+
+    assert engine.timeline('station', [dict(v) for v in videos]) is first
+    assert engine.timeline('station', [video('a', 45)]) is not first
+
+
+def test_guide_state_holds_until_the_first_current_program_ends():
+    engine = ScheduleEngine()
+    channels = [
+        {'id': '1', 'schedule': [video('a', 60)]},
+        {'id': '2', 'schedule': [video('b', 45)]},
+    ]
+
+    rows, window = engine.guide_at(channels, 'v1', at(0, 10))
+    assert window == (at(0), at(0, 45))
+    assert [[v['id'] for v in row['videos']] for row in rows] == [['a'] * 3, ['b'] * 3]
+    assert rows[0]['videos'][0]['is_current'] and not rows[0]['videos'][1]['is_current']
+
+    assert engine.guide_at(channels, 'v1', at(0, 44))[0] is rows
+    assert engine.guide_at(channels, 'v1', at(0, 45))[0] is not rows
+    assert engine.guide_at(channels, 'v2', at(0, 46))[1] == (at(0, 45), at(1))
+
+
+def test_guide_drops_timelines_of_removed_stations():
+    engine = ScheduleEngine()
+    engine.guide_at([{'id': '1', 'schedule': [video('a', 60)]}, {'id': '2', 'schedule': []}], 'v1', at())
+    engine.guide_at([{'id': '2', 'schedule': []}], 'v2', at())
+
+    assert set(engine.timelines) == {'2'}
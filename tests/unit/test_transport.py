@@ -0,0 +1,149 @@
+"""
+Unit tests for the pooled YouTube transport
+
+These tests drive PooledHttp against a local http.server stand-in for the API
+"""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from youtube import transport
+from youtube.quota_governor import QuotaGovernor
+from youtube.transport import PooledHttp
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        server.connections.add(self.client_address)
+        if self.path.startswith('/youtube/v3/fail'):
+            body = json.dumps({'error': {'errors': [{'reason': 'backendError'}]}}).encode('utf-8')
+            status = 503
+        else:
+            body = json.dumps({'items': [], 'path': self.path}).encode('utf-8')
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"abc"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeApiHandler)
+    httpd.requests = []
+    httpd.connections = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    governor = QuotaGovernor(daily_quota=1000, failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(transport, 'quota_governor', governor)
+    return governor
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_returns_httplib2_response_and_body(server, governor):
+    http = PooledHttp(pool_size=2)
+    try:
+        response, content = http.request(url(server, '/youtube/v3/videos?id=a'))
+    finally:
+        http.close()
+
+    assert response.status == 200
+    assert response['etag'] == '"abc"'
+    assert json.loads(content)['path'] == '/youtube/v3/videos?id=a'
+
+
+def test_reuses_keep_alive_connections(server, governor):
+    http = PooledHttp(pool_size=2)
+    try:
+        for _ in range(5):
+            http.request(url(server, '/youtube/v3/videos'))
+    finally:
+        http.close()
+
+    assert len(server.requests) == 5
+    assert len(server.connections) == 1
+
+
+def test_charges_api_calls_to_the_quota_governor(server, governor):
+    http = PooledHttp(pool_size=2)
+    try:
+        http.request(url(server, '/youtube/v3/playlistItems'))
+        http.request(url(server, '/youtube/v3/search'))
+        http.request(url(server, '/not-the-api'))
+    finally:
+        http.close()
+
+    assert governor.spent == 101
+    assert governor.calls == {'playlistItems.list': 1, 'search.list': 1}
+
+
+def test_server_errors_count_towards_the_circuit(server, governor):
+    http = PooledHttp(pool_size=2)
+    try:
+        response, _ = http.request(url(server, '/youtube/v3/fail'))
+        assert response.status == 503
+        http.request(url(server, '/youtube/v3/fail'))
+    finally:
+        http.close()
+
+    assert governor.is_open()
+
+
+def test_connection_errors_surface_as_requests_errors(governor):
+    http = PooledHttp(pool_size=2, connect_timeout=1, read_timeout=1)
+    try:
+        with pytest.raises(requests.ConnectionError):
+            http.request(f"http://127.0.0.1:{closed_port()}/youtube/v3/videos")
+    finally:
+        http.close()
+
+    assert governor.failures == 1
+
+
+def test_httpx_errors_surface_as_requests_errors(server, governor):
+    httpx = pytest.importorskip('httpx')
+    http = PooledHttp(pool_size=2)
+    # The HTTP/2 code path with a plain httpx client, since h2 may not be installed
+    http.client = httpx.Client(timeout=httpx.Timeout(1.0))
+    try:
+        response, content = http.request(url(server, '/youtube/v3/videos'))
+        assert response.status == 200
+        with pytest.raises(requests.ConnectionError):
+            http.request(f"http://127.0.0.1:{closed_port()}/youtube/v3/videos")
+    finally:
+        http.close()
+        http.session.close()
+
+    assert governor.failures == 1
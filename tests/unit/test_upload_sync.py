@@ -0,0 +1,111 @@
+"""
+Unit tests for the incremental uploads sync
+
+These tests cover the conditional first-page request, reusing the index on a
+304 and merging only the uploads newer than the last one seen
+"""
+
+import googleapiclient.errors
+import httplib2
+import pytest
+
+from youtube import video_catalog, youtube_api
+from youtube.api_cache import APICache
+from youtube.video_catalog import VideoCatalog
+
+
+def upload(video_id, privacy='public'):
+    return {
+        'contentDetails': {'videoId': video_id},
+        'snippet': {'title': video_id, 'publishedAt': '2021-01-01T00:00:00Z'},
+        'status': {'privacyStatus': privacy}
+    }
+
+
+class FakePlaylistItems:
+    """playlistItems() stand-in serving one page per token, with 304s for a matching ETag."""
+
+    def __init__(self):
+        self.pages = {}
+        self.etag = '"v1"'
+        self.requests = []
+
+    def list(self, **kwargs):
+        return FakeRequest(self, kwargs.get('pageToken'))
+
+
+class FakeRequest:
+
+    def __init__(self, resource, page_token):
+        self.resource = resource
+        self.page_token = page_token
+        self.headers = {}
+
+    def execute(self):
+        resource = self.resource
+        resource.requests.append((self.page_token, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == resource.etag:
+            raise googleapiclient.errors.HttpError(httplib2.Response({'status': 304}), b'')
+        return dict(resource.pages[self.page_token], etag=resource.etag)
+
+
+class FakeYouTube:
+
+    def __init__(self):
+        self.playlist_items = FakePlaylistItems()
+
+    def playlistItems(self):
+        return self.playlist_items
+
+
+@pytest.fixture
+def youtube(tmp_path, monkeypatch):
+    youtube = FakeYouTube()
+    catalog = VideoCatalog(str(tmp_path / 'catalog.sqlite3'))
+    catalog.set_uploads_playlist_id('UC1', 'UU1')
+    monkeypatch.setattr(video_catalog, '_catalog', catalog)
+    monkeypatch.setattr(youtube_api, 'api_cache', APICache())
+    monkeypatch.setattr(youtube_api, 'get_youtube', lambda: youtube)
+    return youtube
+
+
+def ids(index):
+    return [video['id'] for video in index['items']]
+
+
+def test_first_sync_indexes_the_first_page_without_private_uploads(youtube):
+    youtube.playlist_items.pages[None] = {'items': [upload('c'), upload('p', 'private'), upload('b')], 'nextPageToken': 'T2'}
+
+    index = youtube_api.sync_channel_uploads('UC1')
+
+    assert ids(index) == ['c', 'b']
+    assert (index['etag'], index['next_page_token'], index['last_video_id']) == ('"v1"', 'T2', 'c')
+    assert youtube.playlist_items.requests == [(None, None)]
+
+
+def test_unchanged_uploads_are_a_304_and_reuse_the_index(youtube):
+    youtube.playlist_items.pages[None] = {'items': [upload('b'), upload('a')]}
+    first = youtube_api.sync_channel_uploads('UC1')
+
+    second = youtube_api.sync_channel_uploads('UC1')
+
+    assert second == first
+    assert youtube.playlist_items.requests[-1] == (None, '"v1"')
+
+
+def test_changed_uploads_merge_only_the_new_videos(youtube):
+    playlist_items = youtube.playlist_items
+    playlist_items.pages[None] = {'items': [upload('b'), upload('a')]}
+    youtube_api.sync_channel_uploads('UC1')
+
+    # Three new uploads push the last seen one onto the second page
+    playlist_items.etag = '"v2"'
+    playlist_items.pages[None] = {'items': [upload('e'), upload('d')], 'nextPageToken': 'T2'}
+    playlist_items.pages['T2'] = {'items': [upload('c'), upload('b')], 'nextPageToken': 'T3'}
+    index = youtube_api.sync_channel_uploads('UC1')
+
+    assert ids(index) == ['e', 'd', 'c', 'b', 'a']
+    assert index['etag'] == '"v2"' and index['last_video_id'] == 'e'
+    # The walk stops at the last seen upload, never reaching T3
+    assert playlist_items.requests[1:] == [(None, '"v1"'), ('T2', None)]
+    assert video_catalog.get_catalog().count_videos('UC1') == 5
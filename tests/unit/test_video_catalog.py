@@ -0,0 +1,47 @@
+"""
+Unit tests for VideoCatalog
+
+These tests cover opening the shared catalog lazily at CATALOG_PATH and the
+per-channel queries over its stored history
+"""
+
+import pytest
+
+from youtube import video_catalog
+from youtube.video_catalog import VideoCatalog, get_catalog
+
+
+def playlist_item(video_id, published_at):
+    return {
+        'contentDetails': {'videoId': video_id},
+        'snippet': {'title': video_id, 'publishedAt': published_at}
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return VideoCatalog(str(tmp_path / 'catalog.sqlite3'))
+
+
+def test_get_catalog_opens_lazily_at_catalog_path(tmp_path, monkeypatch):
+    path = tmp_path / 'nested' / 'catalog.sqlite3'
+    monkeypatch.setenv('CATALOG_PATH', str(path))
+    monkeypatch.setattr(video_catalog, '_catalog', None)
+
+    assert not path.exists()
+    first = get_catalog()
+    assert first.path == str(path)
+    assert get_catalog() is first
+
+
+def test_query_videos_orders_by_recency_and_views(catalog):
+    catalog.upsert_playlist_items('UC1', [
+        playlist_item('old', '2020-01-01T00:00:00Z'),
+        playlist_item('new', '2021-01-01T00:00:00Z'),
+    ])
+    catalog.set_view_counts({'old': 100, 'new': 5})
+
+    assert [v['video_id'] for v in catalog.query_videos('UC1', 'new')] == ['new', 'old']
+    assert [v['video_id'] for v in catalog.query_videos('UC1', 'popular')] == ['old', 'new']
+    assert catalog.count_videos('UC1') == 2
+    assert catalog.count_videos('UC2') == 0
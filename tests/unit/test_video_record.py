@@ -0,0 +1,73 @@
+"""
+Unit tests for shared Video records
+
+These tests cover the mapping interface, interning one live record per
+video, replacing a record when a field changes, and releasing records once
+nothing refers to them
+"""
+
+import gc
+import json
+import pickle
+
+from youtube import video_record as video_record_module
+from youtube.video_record import Video, video_record, live_record_count
+
+
+def test_video_reads_like_the_dict_it_replaces():
+    video = Video('abc', title='Title', duration=90)
+
+    assert video['title'] == 'Title'
+    assert video.get('viewCount') is None
+    assert video['link'] == 'https://www.youtube.com/watch?v=abc'
+    assert dict(video) == {
+        'id': 'abc', 'title': 'Title', 'link': 'https://www.youtube.com/watch?v=abc',
+        'duration': 90, 'duration_str': video['duration_str']
+    }
+    assert json.loads(json.dumps(video.to_dict()))['title'] == 'Title'
+
+
+def test_long_descriptions_are_truncated_within_the_limit(monkeypatch):
+    monkeypatch.setattr(video_record_module, 'DESCRIPTION_MAX_CHARS', 10)
+    video = Video('abc', description='x' * 50)
+
+    assert len(video['description']) == 10 and video['description'].endswith('…')
+    assert video_record_module.truncate_description(video['description']) == video['description']
+
+
+def test_records_are_interned_and_filled_in():
+    first = video_record('intern', title='Title')
+    second = video_record('intern', title='Title', view_count=10)
+
+    assert second is first
+    assert first['viewCount'] == 10
+
+
+def test_a_changed_field_replaces_the_record_and_keeps_the_old_one_intact():
+    old = video_record('changed', title='Title', view_count=10)
+    new = video_record('changed', view_count=20)
+
+    assert new is not old
+    assert (old['viewCount'], new['viewCount']) == (10, 20)
+    # Fields the change didn't mention carry over
+    assert new['title'] == 'Title'
+    assert video_record('changed') is new
+
+
+def test_unpickled_records_are_interned():
+    record = video_record('pickled', title='Title', duration=5)
+
+    assert pickle.loads(pickle.dumps([record]))[0] is record
+
+
+def test_records_are_released_once_unreferenced():
+    record = video_record('released', title='Title')
+    count = live_record_count()
+
+    del record
+    gc.collect()
+
+    assert live_record_count() == count - 1
+    assert 'released' not in video_record_module._records
+    # A later lookup builds a fresh record instead of resurrecting the old one
+    assert video_record('released', title='Other')['title'] == 'Other'
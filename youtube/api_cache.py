@@ -1,40 +1,276 @@
+import os
 import time
+import uuid
+import pickle
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from .cache_backends import create_backend
+from .metrics import cache_requests
+from .log_config import sampled
+from .retry_decorator import retry_deadline
 
 logger = logging.getLogger('youtube_api')
 
+# Background refreshes for stale-while-revalidate entries run here, off the request threads
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CACHE_REFRESH_WORKERS', 4)),
+    thread_name_prefix='cache-refresh'
+)
+
+# Seconds a background refresh may spend retrying before it gives up
+REFRESH_TIMEOUT = float(os.getenv('CACHE_REFRESH_TIMEOUT', 60))
+
+# Seconds another process may hold a shared-backend flight lock; a leader
+# that dies mid-load only blocks others this long
+FLIGHT_LOCK_TTL = float(os.getenv('CACHE_FLIGHT_LOCK_TTL', 30))
+
+# How often waiters in other processes poll for the leader's result
+FLIGHT_POLL_INTERVAL = 0.05
+
+# Set while APICache.cached_call runs: lookups answer from the cache or raise CacheMiss
+_cache_only = contextvars.ContextVar('cache_only', default=False)
+
+class _NotFound:
+    """Type of NOT_FOUND; pickles by name so every process reads back the same object."""
+
+    def __reduce__(self):
+        return 'NOT_FOUND'
+
+    def __repr__(self):
+        return 'NOT_FOUND'
+
+# What the backend holds for a key cached as None, e.g. a channel search with no match
+NOT_FOUND = _NotFound()
+
+class CacheMiss(Exception):
+    """Raised by APICache.cached_call when the call would have to load a missing key."""
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
 class APICache:
-    def __init__(self, max_size=100, ttl=3600):
-        self.cache = {}
+    def __init__(self, max_size=100, ttl=3600, backend=None, max_bytes=None):
         self.max_size = max_size
         self.ttl = ttl
-        self.access_times = {}
-        logger.info(f"Initialized API cache with max_size={max_size}, ttl={ttl}s")
+        self.backend = backend if backend is not None else create_backend('memory', max_size=max_size, max_bytes=max_bytes)
+        # Keys with a background refresh in flight, so each key refreshes once at a time
+        self.refreshing = set()
+        self.refresh_lock = threading.Lock()
+        # Loads in flight in this process, by key, for get_or_load
+        self.flights = {}
+        self.flight_lock = threading.Lock()
+        logger.info(f"Initialized API cache with backend={type(self.backend).__name__}, max_size={max_size}, ttl={ttl}s")
+
+    @classmethod
+    def from_env(cls, max_size=100, ttl=3600, max_bytes=None):
+        # CACHE_MAX_SIZE, CACHE_MAX_BYTES and CACHE_TTL override the defaults, CACHE_BACKEND picks the store
+        max_size = int(os.getenv('CACHE_MAX_SIZE', max_size))
+        max_bytes = int(os.getenv('CACHE_MAX_BYTES', max_bytes or 0)) or None
+        ttl = int(os.getenv('CACHE_TTL', ttl))
+        return cls(max_size=max_size, ttl=ttl, backend=create_backend(max_size=max_size, max_bytes=max_bytes))
+
+    def lookup(self, key):
+        # (True, value) if key is cached, a cached None included, otherwise (False, None)
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # A cache outage should only cost a refetch
+            logger.error(f"Cache backend error reading key {key}: {e}")
+            return False, None
+        if value is None:
+            cache_requests.inc(result='miss')
+            return False, None
+        cache_requests.inc(result='hit')
+        if sampled():
+            logger.info(f"Cache hit for key: {key}")
+        return True, (None if value is NOT_FOUND else value)
 
     def get(self, key):
-        if key in self.cache:
-            timestamp = self.access_times.get(key, 0)
-            if time.time() - timestamp <= self.ttl:
-                self.access_times[key] = time.time()
-                logger.info(f"Cache hit for key: {key}")
-                return self.cache[key]
-            else:
-                del self.cache[key]
-                del self.access_times[key]
-                logger.info(f"Cache expired for key: {key}")
-        return None
+        # The cached value, or None if key isn't cached or None was cached for it
+        return self.lookup(key)[1]
 
-    def set(self, key, value):
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.access_times, key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
-            logger.info(f"Cache eviction for key: {oldest_key}")
-        self.cache[key] = value
-        self.access_times[key] = time.time()
-        logger.info(f"Cached value for key: {key}")
+    def set(self, key, value, ttl=None):
+        # Each entry may carry its own TTL, otherwise the cache default applies
+        try:
+            # Backends treat None as a miss, so a cached None is stored as NOT_FOUND
+            self.backend.set(key, NOT_FOUND if value is None else value, self.ttl if ttl is None else ttl)
+            if sampled():
+                logger.info(f"Cached value for key: {key}")
+        except Exception as e:
+            logger.error(f"Cache backend error writing key {key}: {e}")
 
     def clear(self):
-        self.cache.clear()
-        self.access_times.clear()
+        self.backend.clear()
         logger.info("Cache cleared")
+
+    def get_or_load(self, key, loader):
+        # Single-flight lookup: return the cached value for key, or else
+        # loader()'s result, where concurrent misses on the same key wait for
+        # one loader call and share its result, None and exceptions included.
+        # loader is expected to cache what it loads. With a shared backend the
+        # loads are coalesced across processes too.
+        found, value = self.lookup(key)
+        if found:
+            return value
+        if _cache_only.get():
+            raise CacheMiss(key)
+        with self.flight_lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+        if not leader:
+            logger.info(f"Waiting for in-flight load of key: {key}")
+            return flight.result()
+        try:
+            flight.value = self._load_once(key, loader)
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self.flight_lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result()
+
+    def cached_call(self, func, *args):
+        # Run func(*args) with every get_or_load/get_or_refresh lookup inside
+        # it answered from what the cache holds (stale entries still refresh in
+        # the background); a lookup that would load or wait on a load raises
+        # CacheMiss instead, so the call never blocks on the network
+        token = _cache_only.set(True)
+        try:
+            return func(*args)
+        finally:
+            _cache_only.reset(token)
+
+    def _load_once(self, key, loader):
+        if not getattr(self.backend, 'shared', False):
+            return loader()
+        lock_key = f"flight:{key}"
+        while True:
+            token = uuid.uuid4().hex
+            try:
+                acquired = self.backend.add(lock_key, token, FLIGHT_LOCK_TTL)
+            except Exception as e:
+                logger.error(f"Cache backend error locking key {key}: {e}")
+                return loader()
+            if acquired:
+                break
+            # Another process is loading this key; wait for its result
+            outcome = self._wait_for_flight(key, lock_key)
+            if outcome is not None:
+                kind, value = outcome
+                if kind == 'error':
+                    raise value
+                return value
+        try:
+            # The previous leader may have finished between our miss and the lock
+            found, value = self.lookup(key)
+            if found:
+                outcome = ('value', value)
+            else:
+                try:
+                    outcome = ('value', loader())
+                except Exception as e:
+                    outcome = ('error', e)
+            self._publish_flight_result(lock_key, token, outcome)
+        finally:
+            try:
+                self.backend.delete(lock_key)
+            except Exception as e:
+                logger.error(f"Cache backend error unlocking key {key}: {e}")
+        if outcome[0] == 'error':
+            raise outcome[1]
+        return outcome[1]
+
+    def _publish_flight_result(self, lock_key, token, outcome):
+        # Waiters poll for the result under the leader's token
+        try:
+            pickle.dumps(outcome)
+        except Exception:
+            outcome = ('error', RuntimeError(str(outcome[1])))
+        try:
+            self.backend.set(f"{lock_key}:{token}", outcome, FLIGHT_LOCK_TTL)
+        except Exception as e:
+            logger.error(f"Cache backend error publishing result for {lock_key}: {e}")
+
+    def _wait_for_flight(self, key, lock_key):
+        # Returns the leader's (kind, value) outcome, or None if the lock went
+        # away without a result and the caller should try to lead instead
+        token = None
+        waited_until = time.monotonic() + FLIGHT_LOCK_TTL
+        while time.monotonic() < waited_until:
+            try:
+                current = self.backend.get(lock_key)
+                if current is not None:
+                    token = current
+                if token is not None:
+                    outcome = self.backend.get(f"{lock_key}:{token}")
+                    if outcome is not None:
+                        return outcome
+                if current is None:
+                    found, value = self.lookup(key)
+                    return ('value', value) if found else None
+            except Exception as e:
+                logger.error(f"Cache backend error waiting for key {key}: {e}")
+                return None
+            time.sleep(FLIGHT_POLL_INTERVAL)
+        return None
+
+    def get_or_refresh(self, key, loader, soft_ttl=None, hard_ttl=None):
+        # Stale-while-revalidate lookup. Fresh entries are returned as is. Once
+        # soft_ttl has passed the stale value is still returned immediately and
+        # a single background refresh is started; hard_ttl bounds how stale a
+        # served value can get. Only a missing entry makes the caller wait on loader.
+        soft_ttl = self.ttl if soft_ttl is None else soft_ttl
+        hard_ttl = soft_ttl * 4 if hard_ttl is None else hard_ttl
+        entry = self.get(key)
+        if entry is not None:
+            value, fresh_until = entry
+            if time.time() >= fresh_until:
+                self._refresh_in_background(key, loader, soft_ttl, hard_ttl)
+            return value
+        # Concurrent misses share one load
+        return self.get_or_load(key, lambda: self._load_refreshable(key, loader, soft_ttl, hard_ttl))[0]
+
+    def _load_refreshable(self, key, loader, soft_ttl, hard_ttl):
+        entry = (loader(), time.time() + soft_ttl)
+        self.set(key, entry, ttl=hard_ttl)
+        return entry
+
+    def _set_refreshable(self, key, value, soft_ttl, hard_ttl):
+        self.set(key, (value, time.time() + soft_ttl), ttl=hard_ttl)
+
+    def _refresh_in_background(self, key, loader, soft_ttl, hard_ttl):
+        with self.refresh_lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+        logger.info(f"Serving stale value and refreshing key: {key}")
+        _refresh_executor.submit(self._refresh, key, loader, soft_ttl, hard_ttl)
+
+    def _refresh(self, key, loader, soft_ttl, hard_ttl):
+        try:
+            # Refreshes have no request around them, so they get their own retry deadline
+            with retry_deadline(time.monotonic() + REFRESH_TIMEOUT):
+                value = loader()
+            self._set_refreshable(key, value, soft_ttl, hard_ttl)
+        except Exception as e:
+            # Keep serving the stale value until the hard TTL runs out
+            logger.error(f"Background refresh failed for key {key}: {e}")
+        finally:
+            with self.refresh_lock:
+                self.refreshing.discard(key)
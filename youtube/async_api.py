@@ -0,0 +1,157 @@
+import time
+import asyncio
+import logging
+from functools import partial
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+from . import youtube_api
+from .youtube_api import (
+    api_cache, channel_id_cache_key, videos_cache_key, channel_videos_cache_key,
+    more_videos_cache_key, VIDEOS_PER_STATION, DEFAULT_MAX_SCHEDULE_VIDEOS
+)
+from .api_cache import CacheMiss
+from .video_record import Video
+from .fetch_engine import submit, new_deadline, FetchTimeoutError
+from .retry_decorator import async_retry_on_error, retries_deferred, retry_deadline
+
+logger = logging.getLogger('youtube_api')
+
+# Async versions of the youtube_api fetch functions, for the ASGI server.
+#
+# googleapiclient only does blocking I/O, so the YouTube calls themselves
+# still run on the shared fetch pool (FETCH_MAX_WORKERS threads). What the
+# async versions change is who waits: a request waiting on YouTube is a
+# suspended coroutine rather than a blocked thread, calls the in-memory
+# cache can answer never leave the event loop, concurrent misses for the same key
+# share one load, and retry backoff waits on the event loop too. Results and cache entries are the same as the
+# synchronous functions'.
+
+# Attempts for one call: the pool task makes a single try and failures are
+# retried here, so backoff waits are asyncio.sleep rather than a pool thread
+ASYNC_MAX_RETRIES = 2
+
+# Loads in flight, by cache key
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _attempt(func: Callable[..., Any], *args: Any) -> Any:
+    # Runs on the pool: decorated calls inside make one try, _load retries
+    with retries_deferred():
+        return func(*args)
+
+@async_retry_on_error(max_retries=ASYNC_MAX_RETRIES)
+async def _load(func: Callable[..., Any], args: tuple, deadline: float) -> Any:
+    return await asyncio.wrap_future(submit(partial(_attempt, func, *args), deadline))
+
+def _cached_value(cache_key: str) -> Any:
+    found, value = api_cache.lookup(cache_key)
+    if not found:
+        raise CacheMiss(cache_key)
+    return value
+
+async def _call(cache_key: Optional[str], func: Callable[..., Any], *args: Any,
+                deadline: Optional[float] = None, peek: Optional[Callable[[], Any]] = None) -> Any:
+    """Run func(*args) on the event loop if the cache can answer it, otherwise on the fetch pool.
+
+    Only the memory backend answers without I/O, so with a shared (sqlite or
+    redis) backend every call goes to the pool. peek, if given, answers from
+    the cache in place of func when func does other I/O before its lookup;
+    it raises CacheMiss if it can't.
+    """
+    if cache_key is not None and not api_cache.backend.shared:
+        try:
+            # Answered from the entry read here (a stale one refreshes in the background)
+            return peek() if peek is not None else api_cache.cached_call(func, *args)
+        except CacheMiss:
+            pass
+
+    task = _inflight.get(cache_key) if cache_key is not None else None
+    if task is None:
+        if deadline is None:
+            deadline = new_deadline()
+        # The task's copy of the context bounds its retry waits by the deadline
+        with retry_deadline(deadline):
+            task = asyncio.ensure_future(_load(func, args, deadline))
+        if cache_key is not None:
+            _inflight[cache_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    # Shielded so a cancelled request doesn't cancel a load others are waiting on
+    return await asyncio.shield(task)
+
+async def _gather_until(calls: List[Awaitable[Any]], deadline: float) -> List[Any]:
+    """Like fetch_engine.fetch_all for coroutines: one result or exception per call, in order."""
+    if not calls:
+        return []
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    await asyncio.wait(tasks, timeout=max(0, deadline - time.monotonic()))
+
+    results = []
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+            results.append(FetchTimeoutError("Fetch did not finish before the request deadline"))
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+
+    timed_out = sum(isinstance(result, FetchTimeoutError) for result in results)
+    if timed_out:
+        logger.warning(f"{timed_out}/{len(tasks)} fetches missed the request deadline")
+    return results
+
+async def get_channel_id_from_url(channel_url: str) -> Optional[str]:
+    """Async youtube_api.get_channel_id_from_url."""
+    parsed = youtube_api.parse_channel_url(channel_url) if channel_url else None
+    if parsed is None:
+        # Logs the bad URL and returns None without any I/O
+        return youtube_api.get_channel_id_from_url(channel_url)
+    kind, value = parsed
+    if kind == 'channel':
+        return value
+    # The resolution index lives in the catalog database, so only the cache
+    # entry is read on the event loop
+    cache_key = channel_id_cache_key(channel_url)
+    return await _call(cache_key, youtube_api.get_channel_id_from_url, channel_url,
+                       peek=partial(_cached_value, cache_key))
+
+async def get_videos_for_channel(channel_url: str, display_option: str = 'random', max_results: int = 5,
+                                 deadline: Optional[float] = None) -> List[Video]:
+    """Async youtube_api.get_videos_for_channel."""
+    return await _call(
+        videos_cache_key(channel_url, display_option, max_results),
+        youtube_api.get_videos_for_channel, channel_url, display_option, max_results,
+        deadline=deadline
+    )
+
+async def get_videos_for_channels(channels_data: List[Dict[str, Any]], deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Async youtube_api.get_videos_for_channels: every link of every station at once.
+
+    Args:
+        channels_data: List of channel data dictionaries
+        deadline: time.monotonic() value after which slow links are skipped
+
+    Returns:
+        List of channel data with videos included
+    """
+    if deadline is None:
+        deadline = new_deadline()
+    link_results = await _gather_until([
+        get_videos_for_channel(url, channel['displayOption'], VIDEOS_PER_STATION, deadline)
+        for channel in channels_data
+        for url in channel['youtubeLinks']
+    ], deadline)
+    return youtube_api._assemble_stations(channels_data, link_results)
+
+async def get_channel_videos(channel_id: str, max_results: int = DEFAULT_MAX_SCHEDULE_VIDEOS) -> List[Optional[Video]]:
+    """Async youtube_api.get_channel_videos."""
+    return await _call(
+        channel_videos_cache_key(channel_id, max_results),
+        youtube_api.get_channel_videos, channel_id, max_results
+    )
+
+async def load_more_channel_videos(channel_id: str, page_token: Optional[str], max_results: int = 10) -> Dict[str, Any]:
+    """Async youtube_api.load_more_channel_videos."""
+    return await _call(
+        more_videos_cache_key(channel_id, page_token, max_results),
+        youtube_api.load_more_channel_videos, channel_id, page_token, max_results
+    )
@@ -0,0 +1,376 @@
+import os
+import sys
+import time
+import pickle
+import socket
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+from .metrics import cache_evictions
+from .log_config import sampled
+
+logger = logging.getLogger('youtube_api')
+
+# Backends used by APICache. Every backend stores opaque values with a hard
+# expiry and exposes get/set/add/incr/delete/clear; a miss and an expired
+# entry both read back as None. add() stores only if the key is absent, so it
+# can serve as a lock. incr() atomically adds to an integer counter, which is
+# only ever read with incr(key, 0). `shared` says whether other processes see
+# the entries.
+
+class _MemoryEntry:
+    __slots__ = ('value', 'inserted_at', 'accessed_at', 'expires_at', 'size')
+
+    def __init__(self, value, inserted_at, expires_at, size):
+        self.value = value
+        self.inserted_at = inserted_at
+        self.accessed_at = inserted_at
+        self.expires_at = expires_at
+        self.size = size
+
+def approximate_size(value):
+    """Rough in-memory size of a cached value in bytes, following containers."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+class MemoryBackend:
+    """Per-process LRU store, the default backend.
+
+    Entries live in an OrderedDict kept in least- to most-recently-used
+    order, so get, set and eviction are all O(1). The store is bounded by
+    entry count and, optionally, by the approximate total size of its values.
+    """
+
+    shared = False
+
+    def __init__(self, max_size=100, max_bytes=None):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            if now >= entry.expires_at:
+                self._remove(key)
+                if sampled():
+                    logger.info(f"Cache expired for key: {key}")
+                return None
+            entry.accessed_at = now
+            self.entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key, value, ttl):
+        size = approximate_size(value) if self.max_bytes else 0
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            now = time.time()
+            self.entries[key] = _MemoryEntry(value, now, now + ttl, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_size or (self.max_bytes and self.total_bytes > self.max_bytes and len(self.entries) > 1):
+                oldest_key = next(iter(self.entries))
+                self._remove(oldest_key)
+                cache_evictions.inc()
+                if sampled():
+                    logger.info(f"Cache eviction for key: {oldest_key}")
+
+    def add(self, key, value, ttl):
+        with self.lock:
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def incr(self, key, amount, ttl):
+        with self.lock:
+            value = self.get(key)
+            if value is None:
+                self.set(key, amount, ttl)
+                return amount
+            # Keeps the counter's original expiry
+            self.entries[key].value = value + amount
+            return value + amount
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        self.total_bytes -= self.entries.pop(key).size
+
+class SQLiteBackend:
+    """Local-disk store shared by every process on the host and kept across restarts."""
+
+    # Expired rows are purged and the size bound enforced once per this many writes
+    PRUNE_INTERVAL = 100
+
+    # A hit only rewrites its row's accessed_at once it is this many seconds
+    # old, so most reads don't take the database's write lock. LRU order is
+    # only that precise, which is plenty for eviction every PRUNE_INTERVAL writes.
+    ACCESS_UPDATE_INTERVAL = 60
+
+    shared = True
+
+    def __init__(self, path, max_size=100):
+        self.path = path
+        self.max_size = max_size
+        self.writes = 0
+        self.local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if now >= expires_at:
+            # Left for _prune: deleting here would make every expired read a write
+            if sampled():
+                logger.info(f"Cache expired for key: {key}")
+            return None
+        if now - accessed_at >= self.ACCESS_UPDATE_INTERVAL:
+            with conn:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now)
+            )
+        self.writes += 1
+        if self.writes % self.PRUNE_INTERVAL == 0:
+            self._prune(conn)
+
+    def add(self, key, value, ttl):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now)
+            )
+        return cursor.rowcount == 1
+
+    def incr(self, key, amount, ttl):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            # Takes the write lock before reading, so concurrent increments serialize
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now < row[1]:
+                value = pickle.loads(row[0]) + amount
+                conn.execute("UPDATE cache SET value = ? WHERE key = ?", (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key))
+            else:
+                value = amount
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now)
+                )
+        return value
+
+    def _prune(self, conn):
+        with conn:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            evicted = conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            ).rowcount
+        if evicted > 0:
+            cache_evictions.inc(evicted)
+
+    def delete(self, key):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+class RedisBackend:
+    """Store on any Redis-protocol server, shared by every process and host pointing at it.
+
+    Speaks RESP directly over a socket, so no client library is needed. Keys
+    are namespaced with a prefix so clear() only removes this app's entries.
+    CACHE_MAX_SIZE does not apply: entries only leave on expiry, so bound the
+    server's memory with maxmemory and an eviction policy such as allkeys-lru.
+    """
+
+    shared = True
+
+    def __init__(self, url, prefix='tubeguide:', socket_timeout=2):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.socket_timeout = socket_timeout
+        self.local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.socket_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.local.sock = sock
+        self.local.reader = sock.makefile('rb')
+        if self.password:
+            self._send('AUTH', self.password)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def _disconnect(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is not None:
+            try:
+                self.local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self.local.sock = None
+
+    def _send(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.local.sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self.local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self.local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply from Redis server: {line!r}")
+
+    def execute(self, *args):
+        """Run one command, reconnecting once if the connection went away."""
+        for attempt in range(2):
+            if getattr(self.local, 'sock', None) is None:
+                self._connect()
+            try:
+                return self._send(*args)
+            except (ConnectionError, OSError):
+                self._disconnect()
+                if attempt:
+                    raise
+
+    def get(self, key):
+        data = self.execute('GET', self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl):
+        self.execute('SET', self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), 'PX', max(1, int(ttl * 1000)))
+
+    def add(self, key, value, ttl):
+        reply = self.execute('SET', self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), 'PX', max(1, int(ttl * 1000)), 'NX')
+        return reply is not None
+
+    def incr(self, key, amount, ttl):
+        # Counters are plain integers on the server (INCRBY can't add to a pickle)
+        value = self.execute('INCRBY', self.prefix + key, int(amount))
+        if value == amount:
+            # A new counter; an existing one keeps its expiry
+            self.execute('PEXPIRE', self.prefix + key, max(1, int(ttl * 1000)))
+        return value
+
+    def delete(self, key):
+        self.execute('DEL', self.prefix + key)
+
+    def clear(self):
+        cursor = '0'
+        while True:
+            cursor, keys = self.execute('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 500)
+            if keys:
+                self.execute('DEL', *keys)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if cursor == '0':
+                break
+
+def create_backend(name=None, max_size=100, max_bytes=None):
+    """Create the cache backend selected by the CACHE_BACKEND environment variable.
+
+    Args:
+        name: 'memory', 'sqlite' or 'redis'; defaults to CACHE_BACKEND, then 'memory'
+        max_size: Entry bound for the memory and sqlite backends (redis relies on the server's maxmemory)
+        max_bytes: Approximate size bound for the memory backend
+
+    Returns:
+        A cache backend instance
+    """
+    name = (name or os.getenv('CACHE_BACKEND', 'memory')).lower()
+    if name == 'memory':
+        return MemoryBackend(max_size=max_size, max_bytes=max_bytes)
+    if name == 'sqlite':
+        path = os.getenv('CACHE_PATH', os.path.join('data', 'cache.sqlite3'))
+        return SQLiteBackend(path, max_size=max_size)
+    if name == 'redis':
+        url = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        return RedisBackend(url, prefix=os.getenv('CACHE_REDIS_PREFIX', 'tubeguide:'))
+    raise ValueError(f"Unknown cache backend '{name}'. Use 'memory', 'sqlite' or 'redis'.")
@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+import logging
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List, Callable, Optional, Any
+from .retry_decorator import retry_deadline
+
+logger = logging.getLogger('youtube_api')
+
+# Maximum number of YouTube fetches running at the same time
+FETCH_MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', 8))
+
+# Seconds a single page request may spend waiting on YouTube fetches
+FETCH_TIMEOUT = float(os.getenv('FETCH_TIMEOUT', 20))
+
+_executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix='youtube-fetch')
+
+# Marks pool threads so nested fetch_all calls run inline instead of
+# queueing behind (and waiting on) the tasks that are occupying the pool
+_worker_state = threading.local()
+
+class FetchTimeoutError(Exception):
+    """Raised in place of a task's result when it misses the request deadline."""
+
+def new_deadline(timeout: Optional[float] = None) -> float:
+    """Create a deadline for one request's worth of fetches.
+
+    Args:
+        timeout: Seconds from now, defaults to FETCH_TIMEOUT
+
+    Returns:
+        The deadline as a time.monotonic() value
+    """
+    return time.monotonic() + (FETCH_TIMEOUT if timeout is None else timeout)
+
+def _run_in_worker(task: Callable[[], Any], deadline: float) -> Any:
+    _worker_state.active = True
+    try:
+        with retry_deadline(deadline):
+            return task()
+    finally:
+        _worker_state.active = False
+
+def submit(task: Callable[[], Any], deadline: Optional[float] = None) -> Future:
+    """Start one fetch task on the shared pool, as fetch_all does for each of its tasks.
+
+    The task runs in a copy of the caller's context with retries bounded by
+    deadline. Async callers wait on the result with asyncio.wrap_future.
+
+    Args:
+        task: Zero-argument callable to run
+        deadline: time.monotonic() value retries must not wait past, defaults to new_deadline()
+
+    Returns:
+        A concurrent.futures.Future for the task's result
+    """
+    if deadline is None:
+        deadline = new_deadline()
+    # The copied context carries an outer retry_deadline into the pool thread
+    return _executor.submit(contextvars.copy_context().run, _run_in_worker, task, deadline)
+
+def fetch_all(tasks: List[Callable[[], Any]], deadline: Optional[float] = None) -> List[Any]:
+    """Run fetch tasks concurrently on the shared bounded pool.
+
+    A failing task never affects the others: its exception is returned in
+    its slot instead of being raised. Tasks still running at the deadline
+    get a FetchTimeoutError in their slot, and retries inside tasks never
+    wait past the deadline.
+
+    Args:
+        tasks: Zero-argument callables to run
+        deadline: time.monotonic() value to stop waiting at, defaults to new_deadline()
+
+    Returns:
+        One result or exception per task, in the same order as tasks
+    """
+    if deadline is None:
+        deadline = new_deadline()
+
+    if getattr(_worker_state, 'active', False):
+        results = []
+        with retry_deadline(deadline):
+            for task in tasks:
+                try:
+                    results.append(task())
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    futures = [submit(task, deadline) for task in tasks]
+    wait(futures, timeout=max(0, deadline - time.monotonic()))
+
+    results = []
+    for future in futures:
+        if not future.done():
+            future.cancel()
+            results.append(FetchTimeoutError("Fetch did not finish before the request deadline"))
+        elif future.exception() is not None:
+            results.append(future.exception())
+        else:
+            results.append(future.result())
+
+    timed_out = sum(isinstance(result, FetchTimeoutError) for result in results)
+    if timed_out:
+        logger.warning(f"{timed_out}/{len(tasks)} fetches missed the request deadline")
+    return results
@@ -0,0 +1,37 @@
+import os
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+
+# Fraction of per-lookup cache log lines (hits, stores, expiries, evictions)
+# that are actually written; the counters in metrics.py count all of them
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+
+_listener = None
+
+def configure_logging(filename='youtube_api.log', level=logging.INFO):
+    """Send log records through a queue to a background thread that writes the file.
+
+    Logging calls on request threads only enqueue the record, so they never
+    wait on disk I/O. Safe to call more than once.
+    """
+    global _listener
+    root = logging.getLogger()
+    # Like logging.basicConfig, leave an already configured root logger alone
+    if _listener is not None or root.handlers:
+        return
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what's queued when the process exits
+    atexit.register(_listener.stop)
+
+def sampled():
+    """True for LOG_SAMPLE_RATE of calls; guards high-volume log lines."""
+    return random.random() < LOG_SAMPLE_RATE
@@ -0,0 +1,215 @@
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+import pytz
+from .metrics import Gauge, youtube_quota_units
+
+logger = logging.getLogger('youtube_api')
+
+# Quota units the API key may spend per day (the default allowance is 10,000)
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))
+
+# Consecutive 403/429/5xx responses or connection errors that open the circuit
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+
+# Seconds the circuit stays open before one trial request is let through
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 60))
+
+# Unit cost per API method; every other read (list) costs 1 unit and every
+# write (insert, update, delete) 50
+QUOTA_COSTS = {
+    'search.list': 100
+}
+READ_QUOTA_COST = 1
+WRITE_QUOTA_COST = 50
+
+# The daily quota resets at midnight Pacific time
+QUOTA_TIMEZONE = pytz.timezone('America/Los_Angeles')
+
+API_PATH_PREFIX = '/youtube/v3/'
+
+class QuotaUnavailableError(Exception):
+    """Raised instead of calling the API while the circuit is open or the daily quota is spent."""
+
+def method_for_request(path: str, method: str) -> Optional[str]:
+    """Map a request path and HTTP method to an API method name such as 'videos.list'."""
+    if not path.startswith(API_PATH_PREFIX):
+        return None
+    resource = path[len(API_PATH_PREFIX):].split('/')[0]
+    verb = {'GET': 'list', 'POST': 'insert', 'PUT': 'update', 'DELETE': 'delete'}.get(method.upper(), method.lower())
+    return f"{resource}.{verb}"
+
+def method_cost(api_method: str) -> int:
+    if api_method in QUOTA_COSTS:
+        return QUOTA_COSTS[api_method]
+    return READ_QUOTA_COST if api_method.endswith('.list') else WRITE_QUOTA_COST
+
+# Methods always listed in the shared spend report, besides those this process called
+REPORTED_METHODS = ('channels.list', 'playlistItems.list', 'search.list', 'videos.list')
+
+# Shared spend counters outlive their quota day by a day, then expire
+QUOTA_COUNTER_TTL = 2 * 24 * 3600
+
+class QuotaGovernor:
+    """Tracks the day's quota spend and trips a circuit breaker on API failures.
+
+    Every API request is charged before it is sent, since YouTube charges
+    for failed requests too. A request that would go over the daily quota,
+    or that arrives while the circuit is open, raises QuotaUnavailableError
+    so callers can fall back to cached or catalog data. With a shared cache
+    backend (see use_backend) the day's spend is counted there, across every
+    worker process; otherwise it is counted per process. The circuit is
+    always per process.
+    """
+
+    def __init__(self, daily_quota=YOUTUBE_DAILY_QUOTA, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=CIRCUIT_RESET_TIMEOUT, backend=None):
+        self.daily_quota = daily_quota
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.day = self._quota_day()
+        self.spent = 0
+        self.calls = defaultdict(int)
+        self.units = defaultdict(int)
+        self.failures = 0
+        # time.time() until which the circuit is open, None while closed
+        self.open_until = None
+        self.probe_in_flight = False
+        self.backend = None
+        self.use_backend(backend)
+
+    def use_backend(self, backend) -> None:
+        """Count spend in backend if other processes share it (sqlite or redis)."""
+        self.backend = backend if getattr(backend, 'shared', False) else None
+
+    def _shared_incr(self, name: str, amount: int) -> Optional[int]:
+        # The day's shared counter after adding amount, or None if there is
+        # no shared backend or it failed (spend is then counted locally)
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.incr(f"quota:{self.day.isoformat()}:{name}", amount, QUOTA_COUNTER_TTL)
+        except Exception as e:
+            logger.error(f"Shared quota counter {name} unavailable, counting locally: {e}")
+            return None
+
+    def _quota_day(self):
+        return datetime.now(QUOTA_TIMEZONE).date()
+
+    def _roll_day(self):
+        today = self._quota_day()
+        if today != self.day:
+            logger.info(f"New quota day, spent {self.spent} units on {self.day}")
+            self.day = today
+            self.spent = 0
+            self.calls.clear()
+            self.units.clear()
+
+    def _next_reset(self):
+        now = datetime.now(QUOTA_TIMEZONE)
+        midnight = QUOTA_TIMEZONE.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        return midnight.timestamp()
+
+    def before_call(self, api_method: str) -> None:
+        """Charge a request against the quota, or raise QuotaUnavailableError."""
+        cost = method_cost(api_method)
+        with self.lock:
+            self._roll_day()
+            if self.open_until is not None:
+                if time.time() < self.open_until or self.probe_in_flight:
+                    raise QuotaUnavailableError(f"YouTube API circuit is open, not calling {api_method}")
+                # Half-open: let a single trial request through
+                self.probe_in_flight = True
+            spent = self._shared_incr('spent', cost)
+            if spent is None:
+                spent = self.spent + cost
+            elif spent > self.daily_quota:
+                # Give back the units reserved above
+                self._shared_incr('spent', -cost)
+            if spent > self.daily_quota:
+                self.probe_in_flight = False
+                raise QuotaUnavailableError(
+                    f"Daily quota would be exceeded by {api_method} ({spent - cost}+{cost} > {self.daily_quota} units)"
+                )
+            self.spent = spent
+            self._shared_incr(f"calls:{api_method}", 1)
+            self._shared_incr(f"units:{api_method}", cost)
+            youtube_quota_units.inc(cost, method=api_method)
+            self.calls[api_method] += 1
+            self.units[api_method] += cost
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.open_until is not None:
+                logger.info("YouTube API circuit closed")
+            self.failures = 0
+            self.open_until = None
+            self.probe_in_flight = False
+
+    def record_failure(self, status: Optional[int] = None, quota_exhausted: bool = False) -> None:
+        """Count a failed request: a 403, 429 or 5xx response, or a connection error (status None)."""
+        with self.lock:
+            if quota_exhausted:
+                # Nothing will succeed again until the quota resets
+                self.open_until = self._next_reset()
+                self.probe_in_flight = False
+                logger.error("YouTube API quota exhausted, circuit open until the daily reset")
+                return
+            if status is not None and status not in (403, 429) and status < 500:
+                # Client errors such as 400/404 say nothing about the API's health
+                if self.probe_in_flight:
+                    self.open_until = None
+                    self.probe_in_flight = False
+                return
+            self.failures += 1
+            if self.probe_in_flight or self.failures >= self.failure_threshold:
+                self.open_until = time.time() + self.reset_timeout
+                self.probe_in_flight = False
+                logger.error(f"YouTube API circuit open for {self.reset_timeout:.0f}s after {self.failures} failures")
+
+    def is_open(self) -> bool:
+        with self.lock:
+            return self.open_until is not None and time.time() < self.open_until
+
+    def report(self) -> Dict[str, Any]:
+        """Return today's spend, per method, and the circuit state."""
+        with self.lock:
+            self._roll_day()
+            now = time.time()
+            spent = self._shared_incr('spent', 0)
+            if spent is None:
+                spent = self.spent
+                methods = {
+                    api_method: {'calls': self.calls[api_method], 'units': self.units[api_method]}
+                    for api_method in sorted(self.calls)
+                }
+            else:
+                methods = {}
+                for api_method in sorted(set(REPORTED_METHODS) | set(self.calls)):
+                    calls = self._shared_incr(f"calls:{api_method}", 0) or 0
+                    if calls:
+                        methods[api_method] = {'calls': calls, 'units': self._shared_incr(f"units:{api_method}", 0) or 0}
+            return {
+                'day': self.day.isoformat(),
+                'dailyQuota': self.daily_quota,
+                'spent': spent,
+                'remaining': max(0, self.daily_quota - spent),
+                'methods': methods,
+                'circuit': {
+                    'state': 'closed' if self.open_until is None else ('open' if now < self.open_until else 'half-open'),
+                    'failures': self.failures,
+                    'retryInSeconds': round(max(0, self.open_until - now), 1) if self.open_until else 0
+                }
+            }
+
+quota_governor = QuotaGovernor()
+
+Gauge('tubeguide_youtube_quota_spent_units', "Quota units spent today (Pacific time) by this process.",
+      lambda: quota_governor.report()['spent'])
+Gauge('tubeguide_youtube_circuit_open', "1 while the YouTube API circuit breaker is open.",
+      lambda: int(quota_governor.is_open()))
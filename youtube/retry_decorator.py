@@ -1,17 +1,201 @@
+import os
+import json
 import random
 import time
+import asyncio
 import logging
+import threading
+import contextvars
 import requests
 import googleapiclient.errors
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from functools import wraps
+from typing import Optional, Set
+from .metrics import retries as retry_counter
 
 logger = logging.getLogger('youtube_api')
 
+# Token bucket shared by every retry in the process: at most this many
+# retries in a burst, refilled at this rate per second. When YouTube is
+# failing, calls stop retrying instead of piling up waits.
+RETRY_BUDGET_CAPACITY = float(os.getenv('RETRY_BUDGET_CAPACITY', 20))
+RETRY_BUDGET_REFILL_RATE = float(os.getenv('RETRY_BUDGET_REFILL_RATE', 1))
+
+# Longest single wait between attempts, including a server's Retry-After
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 30))
+
+# HttpError reasons that mean the daily quota is gone; retrying can't help
+QUOTA_EXHAUSTED_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+# HttpError reasons for short-term rate limits, which are worth retrying
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+# Deadline (time.monotonic()) of the request the current code is running for
+_deadline = contextvars.ContextVar('retry_deadline', default=None)
+
+# Set while an async caller does the retrying, see retries_deferred()
+_retries_deferred = contextvars.ContextVar('retries_deferred', default=False)
+
+class RetryBudget:
+    """Thread-safe token bucket limiting how many retries may happen."""
+
+    def __init__(self, capacity=RETRY_BUDGET_CAPACITY, refill_rate=RETRY_BUDGET_REFILL_RATE):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+retry_budget = RetryBudget()
+
+@contextmanager
+def retry_deadline(deadline: Optional[float]):
+    """Bound every retry wait in this context (and fetch_all tasks started in it) by deadline."""
+    token = set_retry_deadline(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def set_retry_deadline(deadline: Optional[float]) -> contextvars.Token:
+    """retry_deadline() for code that can't use a with block, such as Flask request hooks.
+
+    Returns:
+        A token to pass to reset_retry_deadline() when the request ends
+    """
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    return _deadline.set(deadline)
+
+def reset_retry_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+@contextmanager
+def retries_deferred():
+    """Make retry_on_error calls in this context attempt once and re-raise.
+
+    Used around a pool task whose async caller retries the whole call with
+    async_retry_on_error, so backoff waits on the event loop instead of in
+    a pool thread.
+    """
+    token = _retries_deferred.set(True)
+    try:
+        yield
+    finally:
+        _retries_deferred.reset(token)
+
+def error_reasons(content) -> Set[str]:
+    """Return the 'reason' codes in the body of a YouTube API error response."""
+    if not content:
+        return set()
+    try:
+        data = json.loads(content.decode('utf-8') if isinstance(content, bytes) else content)
+        return {item.get('reason') for item in data['error'].get('errors', []) if item.get('reason')}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+def http_error_reasons(error: Exception) -> Set[str]:
+    return error_reasons(getattr(error, 'content', None))
+
+def is_quota_exhausted(error: Exception) -> bool:
+    return isinstance(error, googleapiclient.errors.HttpError) and bool(http_error_reasons(error) & QUOTA_EXHAUSTED_REASONS)
+
+def _status_code(error: Exception) -> Optional[int]:
+    if isinstance(error, googleapiclient.errors.HttpError):
+        return error.resp.status
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def _is_retriable(error: Exception) -> bool:
+    # Only errors that can go away on their own: rate limits, 5xx and
+    # connection problems. 400/404 or an exhausted quota would fail again.
+    status = _status_code(error)
+    if status is None:
+        return True
+    if status == 403:
+        return bool(http_error_reasons(error) & RATE_LIMIT_REASONS)
+    return status == 429 or status >= 500
+
+def _retry_after(error: Exception) -> Optional[float]:
+    if isinstance(error, googleapiclient.errors.HttpError):
+        value = error.resp.get('retry-after')
+    else:
+        value = getattr(getattr(error, 'response', None), 'headers', {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _next_delay(func_name, error, retries, max_retries, delay):
+    """Return how long to wait before retrying, or None to give up and re-raise."""
+    if getattr(error, '_retries_exhausted', False):
+        # An inner retrying call already gave up on this error
+        return None
+    if not _is_retriable(error):
+        logger.error(f"Not retrying {func_name}: {error}")
+        return None
+    if retries > max_retries:
+        logger.error(f"Max retries ({max_retries}) exceeded for {func_name}: {error}")
+        return None
+
+    retry_after = _retry_after(error)
+    sleep_time = retry_after if retry_after is not None else delay * random.uniform(0.8, 1.2)
+    if sleep_time > RETRY_MAX_DELAY:
+        logger.error(f"Not retrying {func_name}: server asked to wait {sleep_time:.0f}s: {error}")
+        return None
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() + sleep_time >= deadline:
+        logger.error(f"Not retrying {func_name}: retry would pass the request deadline: {error}")
+        return None
+    if not retry_budget.try_acquire():
+        logger.error(f"Not retrying {func_name}: retry budget exhausted: {error}")
+        return None
+
+    logger.warning(f"Retry {retries}/{max_retries} for {func_name} after {sleep_time:.2f}s: {error}")
+    retry_counter.inc(function=func_name, outcome='retry')
+    return sleep_time
+
+def _give_up(func_name, error):
+    if not getattr(error, '_retries_exhausted', False):
+        retry_counter.inc(function=func_name, outcome='gave_up')
+    # Mark the error so retrying callers further up don't retry it again
+    try:
+        error._retries_exhausted = True
+    except AttributeError:
+        pass
+
 # Retry decorator for API functions
+#
+# Retries only transient errors, honours Retry-After, never waits past the
+# request deadline set with retry_deadline() and draws each retry from the
+# shared retry_budget. An error that a nested decorated call already retried
+# is passed straight through, so nested decorators don't multiply attempts.
+# Under retries_deferred() it makes one attempt and leaves retrying to the
+# async caller.
 def retry_on_error(max_retries=3, base_delay=1, backoff_factor=2, retriable_exceptions=(requests.RequestException, googleapiclient.errors.HttpError)):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            if _retries_deferred.get():
+                return func(*args, **kwargs)
             retries = 0
             delay = base_delay
             while True:
@@ -19,13 +203,34 @@ def retry_on_error(max_retries=3, base_delay=1, backoff_factor=2, retriable_exce
                     return func(*args, **kwargs)
                 except retriable_exceptions as e:
                     retries += 1
-                    if retries > max_retries:
-                        logger.error(f"Max retries ({max_retries}) exceeded for {func.__name__}: {e}")
+                    sleep_time = _next_delay(func.__name__, e, retries, max_retries, delay)
+                    if sleep_time is None:
+                        _give_up(func.__name__, e)
                         raise
-                    jitter = random.uniform(0.8, 1.2)
-                    sleep_time = delay * jitter
-                    logger.warning(f"Retry {retries}/{max_retries} for {func.__name__} after {sleep_time:.2f}s: {e}")
                     time.sleep(sleep_time)
                     delay *= backoff_factor
         return wrapper
     return decorator
+
+# Same as retry_on_error for coroutine functions; waits with asyncio.sleep
+# so a retrying call doesn't hold a thread. async_api uses it around pool
+# tasks that run under retries_deferred().
+def async_retry_on_error(max_retries=3, base_delay=1, backoff_factor=2, retriable_exceptions=(requests.RequestException, googleapiclient.errors.HttpError)):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            retries = 0
+            delay = base_delay
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except retriable_exceptions as e:
+                    retries += 1
+                    sleep_time = _next_delay(func.__name__, e, retries, max_retries, delay)
+                    if sleep_time is None:
+                        _give_up(func.__name__, e)
+                        raise
+                    await asyncio.sleep(sleep_time)
+                    delay *= backoff_factor
+        return wrapper
+    return decorator
@@ -0,0 +1,120 @@
+import os
+import logging
+import threading
+import httplib2
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from .quota_governor import quota_governor, method_for_request
+from .metrics import youtube_requests
+from .retry_decorator import error_reasons, QUOTA_EXHAUSTED_REASONS
+
+logger = logging.getLogger('youtube_api')
+
+# Connections kept open to each host; one per concurrent fetch is enough
+HTTP_POOL_SIZE = int(os.getenv('YOUTUBE_HTTP_POOL_SIZE', 16))
+
+# Seconds to wait for a connection and then for each read, so a hung socket
+# can never hold a worker forever
+HTTP_CONNECT_TIMEOUT = float(os.getenv('YOUTUBE_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('YOUTUBE_READ_TIMEOUT', 15))
+
+# Use HTTP/2 when the optional httpx[http2] package is installed
+HTTP2_ENABLED = os.getenv('YOUTUBE_HTTP2', 'false').lower() == 'true'
+
+class PooledHttp:
+    """httplib2-compatible transport backed by a shared, pooled HTTP session.
+
+    googleapiclient only calls request() on its http object, so this lets
+    the API client share keep-alive connections across threads instead of
+    opening one httplib2 connection per thread. Errors surface as
+    requests.RequestException on both the HTTP/1.1 and the HTTP/2 (httpx)
+    path, so retry_on_error retries them, and every API call goes through
+    the quota governor.
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT,
+                 read_timeout=HTTP_READ_TIMEOUT, http2=HTTP2_ENABLED):
+        self.timeout = (connect_timeout, read_timeout)
+        self.client = None
+        if http2:
+            self.client = self._create_http2_client(pool_size, connect_timeout, read_timeout)
+        if self.client is None:
+            self.session = requests.Session()
+            # Retries are handled by retry_on_error, not by the adapter
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        logger.info(f"HTTP transport ready with pool_size={pool_size}, timeouts={self.timeout}, http2={self.client is not None}")
+
+    def _create_http2_client(self, pool_size, connect_timeout, read_timeout):
+        try:
+            import httpx
+            import h2  # noqa: F401 - httpx needs it for http2=True
+        except ImportError:
+            logger.warning("YOUTUBE_HTTP2 is set but httpx[http2] is not installed, using HTTP/1.1")
+            return None
+        return httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            follow_redirects=True
+        )
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        # Every API call is charged to the quota governor, which raises
+        # QuotaUnavailableError instead while its circuit is open
+        api_method = method_for_request(urlsplit(uri).path, method)
+        if api_method:
+            quota_governor.before_call(api_method)
+        try:
+            if self.client is not None:
+                response = self._request_http2(method, uri, body, headers)
+            else:
+                response = self.session.request(method, uri, data=body, headers=headers, timeout=self.timeout)
+        except Exception:
+            if api_method:
+                youtube_requests.inc(method=api_method, status='error')
+                quota_governor.record_failure()
+            raise
+        if api_method:
+            youtube_requests.inc(method=api_method, status=response.status_code)
+            if response.status_code < 400:
+                quota_governor.record_success()
+            else:
+                quota_governor.record_failure(
+                    response.status_code,
+                    quota_exhausted=bool(error_reasons(response.content) & QUOTA_EXHAUSTED_REASONS)
+                )
+        info = dict(response.headers)
+        info['status'] = str(response.status_code)
+        return httplib2.Response(info), response.content
+
+    def _request_http2(self, method, uri, body, headers):
+        import httpx
+        try:
+            return self.client.request(method, uri, content=body, headers=headers)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.RequestException(str(e)) from e
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        else:
+            self.session.close()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """Return the process-wide transport shared by all YouTube traffic."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = PooledHttp()
+    return _transport
@@ -0,0 +1,217 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+
+logger = logging.getLogger('youtube_api')
+
+# Location of the catalog database when CATALOG_PATH isn't set
+DEFAULT_CATALOG_PATH = os.path.join('data', 'catalog.sqlite3')
+
+# The shared catalog is opened on first use rather than at import, so
+# importing the package never creates a database file
+_catalog = None
+_catalog_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id TEXT PRIMARY KEY,
+    uploads_playlist_id TEXT,
+    backfilled_at REAL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    thumbnail TEXT,
+    published_at TEXT NOT NULL,
+    duration INTEGER,
+    view_count INTEGER,
+    stats_updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS videos_channel_published ON videos (channel_id, published_at DESC);
+CREATE INDEX IF NOT EXISTS videos_channel_views ON videos (channel_id, view_count DESC);
+CREATE TABLE IF NOT EXISTS channel_links (
+    link_key TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    resolved_at REAL NOT NULL
+);
+"""
+
+_VIDEO_COLUMNS = 'video_id, channel_id, title, description, thumbnail, published_at, duration, view_count'
+
+class VideoCatalog:
+    """Persistent SQLite store of channels and their uploads.
+
+    Holds every upload seen for a channel with its duration, view count and
+    publish date, so schedules can be sorted over a channel's whole history
+    without calling the API, and the channel ID every handle, custom URL
+    and username resolved to, so none is looked up twice.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv('CATALOG_PATH', DEFAULT_CATALOG_PATH)
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT uploads_playlist_id FROM channels WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row['uploads_playlist_id'] if row else None
+
+    def set_uploads_playlist_id(self, channel_id: str, uploads_playlist_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO channels (channel_id, uploads_playlist_id) VALUES (?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET uploads_playlist_id = excluded.uploads_playlist_id",
+                (channel_id, uploads_playlist_id)
+            )
+
+    def get_linked_channel_id(self, link_key: str) -> Optional[str]:
+        """The channel ID a handle, custom URL or username (e.g. 'handle:name') resolved to."""
+        row = self._connection().execute(
+            "SELECT channel_id FROM channel_links WHERE link_key = ?", (link_key,)
+        ).fetchone()
+        return row['channel_id'] if row else None
+
+    def set_linked_channel_id(self, link_key: str, channel_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO channel_links (link_key, channel_id, resolved_at) VALUES (?, ?, ?)",
+                (link_key, channel_id, time.time())
+            )
+
+    def is_backfilled(self, channel_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT backfilled_at FROM channels WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return bool(row and row['backfilled_at'])
+
+    def mark_backfilled(self, channel_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO channels (channel_id, backfilled_at) VALUES (?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET backfilled_at = excluded.backfilled_at",
+                (channel_id, time.time())
+            )
+
+    def upsert_playlist_items(self, channel_id: str, items: Iterable[Dict[str, Any]]) -> None:
+        """Store uploads from playlistItems responses, keeping known durations and stats."""
+        rows = []
+        for item in items:
+            snippet = item['snippet']
+            rows.append((
+                item['contentDetails']['videoId'],
+                channel_id,
+                snippet.get('title', 'Untitled Video'),
+                snippet.get('description', ''),
+                snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+                snippet.get('publishedAt', '')
+            ))
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO videos (video_id, channel_id, title, description, thumbnail, published_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title, "
+                "description = excluded.description, thumbnail = excluded.thumbnail, "
+                "published_at = excluded.published_at",
+                rows
+            )
+
+    def get_durations(self, video_ids: List[str]) -> Dict[str, int]:
+        if not video_ids:
+            return {}
+        placeholders = ','.join('?' * len(video_ids))
+        rows = self._connection().execute(
+            f"SELECT video_id, duration FROM videos WHERE video_id IN ({placeholders}) AND duration IS NOT NULL",
+            video_ids
+        ).fetchall()
+        return {row['video_id']: row['duration'] for row in rows}
+
+    def set_durations(self, durations: Dict[str, int]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "UPDATE videos SET duration = ? WHERE video_id = ?",
+                [(duration, video_id) for video_id, duration in durations.items()]
+            )
+
+    def delete_videos(self, video_ids: List[str]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM videos WHERE video_id = ?", [(video_id,) for video_id in video_ids])
+
+    def get_stale_stats_ids(self, channel_id: str, max_age: float) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT video_id FROM videos WHERE channel_id = ? "
+            "AND (stats_updated_at IS NULL OR stats_updated_at < ?)",
+            (channel_id, time.time() - max_age)
+        ).fetchall()
+        return [row['video_id'] for row in rows]
+
+    def set_view_counts(self, view_counts: Dict[str, int]) -> None:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "UPDATE videos SET view_count = ?, stats_updated_at = ? WHERE video_id = ?",
+                [(count, now, video_id) for video_id, count in view_counts.items()]
+            )
+
+    def query_videos(self, channel_id: str, order: str = 'new', limit: int = 10) -> List[Dict[str, Any]]:
+        """Get a channel's videos from its whole known history.
+
+        Args:
+            channel_id: YouTube channel ID
+            order: 'new' (newest first), 'popular' (most viewed first) or 'random'
+            limit: Maximum number of videos to return
+
+        Returns:
+            A list of video rows as dictionaries
+        """
+        order_by = {
+            'new': 'published_at DESC',
+            'popular': 'view_count IS NULL, view_count DESC, published_at DESC',
+            'random': 'RANDOM()'
+        }.get(order, 'published_at DESC')
+        rows = self._connection().execute(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE channel_id = ? ORDER BY {order_by} LIMIT ?",
+            (channel_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_videos(self, channel_id: str) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM videos WHERE channel_id = ?", (channel_id,)
+        ).fetchone()[0]
+
+def get_catalog() -> VideoCatalog:
+    """Return the shared catalog, opening it (at CATALOG_PATH) on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = VideoCatalog()
+    return _catalog
@@ -0,0 +1,151 @@
+import os
+import sys
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+from .youtube_utils import format_duration
+
+# Descriptions are kept in memory up to this many characters (the catalog
+# keeps them in full); 0 keeps them whole
+DESCRIPTION_MAX_CHARS = int(os.getenv('VIDEO_DESCRIPTION_MAX_CHARS', 500))
+
+# Mapping keys of a Video and the slots holding them
+_FIELDS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('thumbnail', 'thumbnail'),
+    ('publishedAt', 'published_at'),
+    ('viewCount', 'view_count'),
+    ('duration', 'duration')
+)
+_SLOT_FOR_KEY = dict(_FIELDS)
+
+def truncate_description(description: Optional[str]) -> Optional[str]:
+    if not description or not DESCRIPTION_MAX_CHARS or len(description) <= DESCRIPTION_MAX_CHARS:
+        return description
+    # Truncated text stays within the limit, so truncating again changes nothing
+    return description[:DESCRIPTION_MAX_CHARS - 1].rstrip() + '…'
+
+class Video(Mapping):
+    """A video as the fetch functions return and cache it.
+
+    Reads like the dicts it replaces (video['title'], video.get('viewCount'),
+    dict(video), Jinja's video.title) but holds its fields in slots. Only the
+    fields that are known are keys, plus 'link' and 'duration_str', derived
+    from the ID and duration. Records are shared: video_record() returns the
+    one live record per video, so every cache entry listing a video points at
+    the same object. Treat records as read-only; copy with dict(video) to
+    add keys. The json module can't serialise a Video itself: use to_dict()
+    (the Flask app's JSON encoder does this for jsonify).
+    """
+
+    __slots__ = ('id', 'title', 'description', 'thumbnail', 'published_at', 'view_count', 'duration', '__weakref__')
+
+    def __init__(self, video_id: str, title: Optional[str] = None, description: Optional[str] = None,
+                 thumbnail: Optional[str] = None, published_at: Optional[str] = None,
+                 view_count: Optional[int] = None, duration: Optional[int] = None):
+        self.id = video_id
+        self.title = title
+        self.description = truncate_description(description)
+        self.thumbnail = thumbnail
+        self.published_at = published_at
+        self.view_count = view_count
+        self.duration = duration
+
+    @property
+    def link(self) -> str:
+        return f'https://www.youtube.com/watch?v={self.id}'
+
+    @property
+    def duration_str(self) -> Optional[str]:
+        return format_duration(self.duration) if self.duration is not None else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'link':
+            return self.link
+        if key == 'duration_str':
+            value = self.duration_str
+        else:
+            slot = _SLOT_FOR_KEY.get(key)
+            value = getattr(self, slot) if slot else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in _FIELDS:
+            if key == 'publishedAt':
+                yield 'link'
+            if getattr(self, slot) is not None:
+                yield key
+        if self.duration is not None:
+            yield 'duration_str'
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A plain dict of the video's keys, for JSON."""
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"Video({dict(self)!r})"
+
+    def __sizeof__(self) -> int:
+        # Counts the strings too, so cache byte limits see what a record holds
+        return object.__sizeof__(self) + sum(
+            sys.getsizeof(getattr(self, slot)) for _, slot in _FIELDS if isinstance(getattr(self, slot), str)
+        )
+
+    def __reduce__(self):
+        # Records read back from a shared cache backend are interned too
+        return _restore, tuple(getattr(self, slot) for _, slot in _FIELDS)
+
+    def _fields(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for _, slot in _FIELDS[1:]}
+
+# The live record for each video ID; a record is dropped once nothing refers to it
+_records: 'weakref.WeakValueDictionary[str, Video]' = weakref.WeakValueDictionary()
+_records_lock = threading.Lock()
+
+def video_record(video_id: str, **fields: Any) -> Video:
+    """The shared record for a video, with the given fields.
+
+    Fields left out or None are unknown. A live record that agrees with
+    every given field is returned, with any it lacked filled in; if a field
+    changed (a new title or view count) a new record replaces it, and
+    records already cached keep the old values until they expire.
+
+    Args:
+        video_id: The YouTube video ID
+        **fields: title, description, thumbnail, published_at, view_count, duration
+
+    Returns:
+        The Video for video_id
+    """
+    if 'description' in fields:
+        fields['description'] = truncate_description(fields['description'])
+    known = {name: value for name, value in fields.items() if value is not None}
+    with _records_lock:
+        record = _records.get(video_id)
+        if record is not None:
+            current = record._fields()
+            if all(current[name] is None or current[name] == value for name, value in known.items()):
+                # Only fills in fields that were unknown, so readers never see a value change
+                for name, value in known.items():
+                    if current[name] is None:
+                        setattr(record, name, value)
+                return record
+            known = dict({name: value for name, value in current.items() if value is not None}, **known)
+        record = _records[video_id] = Video(video_id, **known)
+        return record
+
+def _restore(video_id, title, description, thumbnail, published_at, view_count, duration):
+    return video_record(video_id, title=title, description=description, thumbnail=thumbnail,
+                        published_at=published_at, view_count=view_count, duration=duration)
+
+def live_record_count() -> int:
+    """Number of Video records currently alive in this process."""
+    return len(_records)
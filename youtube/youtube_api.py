@@ -1,44 +1,45 @@
-import os
 import random
 from datetime import datetime, timedelta
 import re
 import json
-import requests
-from typing import List, Dict, Any, Optional, Union, Callable, TypeVar
+from typing import List, Dict, Any, Optional, Union, Callable, TypeVar, Tuple
 import logging
 import time
+from functools import partial, lru_cache
+import googleapiclient.errors
 
 # Fix imports to use relative imports for local modules
-from .youtube_client import youtube
+from .youtube_client import get_youtube
 from .api_cache import APICache
 from .retry_decorator import retry_on_error
-from .youtube_utils import parse_iso_duration_to_minutes, format_duration
+from .fetch_engine import fetch_all
+from .video_catalog import get_catalog
+from .video_record import Video, video_record
+from .quota_governor import QuotaUnavailableError, quota_governor, method_cost
+from .metrics import timed
+from .log_config import configure_logging
+from .youtube_utils import parse_iso_duration_to_minutes
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='youtube_api.log'
-)
+# Configure logging; records are written to youtube_api.log from a background thread
+configure_logging('youtube_api.log')
 logger = logging.getLogger('youtube_api')
 
 # Type variable for generic return type
 T = TypeVar('T')
 
-# Initialize cache with improved defaults for better performance
-# Increased TTL from 1800 (30 minutes) to 3600 (1 hour) to reduce API calls
-api_cache = APICache(max_size=150, ttl=3600)
-
 # Load environment variables
 load_dotenv()
 
-# Get API key from environment
-API_KEY = os.getenv('VITE_YT_API_KEY')
+# Initialize cache with improved defaults for better performance
+# Increased TTL from 1800 (30 minutes) to 3600 (1 hour) to reduce API calls
+# Raised max_size from 150 now that eviction is O(1); a single guide render
+# touches well over 150 keys (channel IDs, link videos, video details)
+# The backend (memory, sqlite or redis) is chosen with CACHE_BACKEND
+api_cache = APICache.from_env(max_size=2000, ttl=3600)
 
-if not API_KEY:
-    logger.error("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
-    raise ValueError("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
+# With a shared cache backend, every worker process counts quota spend there
+quota_governor.use_backend(api_cache.backend)
 
 # Maximum number of videos to fetch in one request
 # Reduced from 50 to 30 to decrease initial load time
@@ -48,6 +49,60 @@ MAX_VIDEOS_PER_REQUEST = 30
 # Reduced from 24 to 12 (showing fewer hours ahead)
 DEFAULT_MAX_SCHEDULE_VIDEOS = 12
 
+# Maximum number of video IDs accepted by a single videos.list call
+MAX_IDS_PER_VIDEOS_REQUEST = 50
+
+# Uploads are fetched in full playlistItems pages (the API maximum), since a
+# page costs 1 quota unit whatever its size and callers share cached pages
+UPLOADS_PAGE_SIZE = 50
+
+# Each channel keeps a local index of its newest uploads, synced with
+# conditional (ETag) requests. The index outlives the page caches so a
+# refresh of a channel that hasn't uploaded costs a single 304.
+UPLOAD_INDEX_TTL = 30 * 24 * 3600
+UPLOAD_INDEX_MAX_ITEMS = 200
+# Pages walked looking for the last seen upload before giving up
+UPLOAD_SYNC_MAX_PAGES = 4
+
+# Pages of older uploads loaded into the catalog the first time a channel is seen
+CATALOG_BACKFILL_MAX_PAGES = 20
+
+# How old catalog view counts may get before 'popular' refreshes them
+VIEW_COUNT_MAX_AGE = 24 * 3600
+
+# Per-entry cache lifetimes in seconds. Channel IDs and video durations
+# practically never change, while the schedule should pick up new uploads
+# within a guide slot. Everything else uses the cache-wide default TTL.
+CHANNEL_ID_TTL = 7 * 24 * 3600
+# A link whose resolution failed (API error or quota) is retried after this long
+CHANNEL_ID_FAILURE_TTL = 5 * 60
+VIDEO_DETAILS_TTL = 24 * 3600
+CHANNEL_VIDEOS_TTL = 15 * 60
+
+# Schedule data (videos:* and channel_videos:*) is served stale-while-revalidate:
+# after its soft TTL it is refreshed in the background, and it is never
+# served once older than SCHEDULE_HARD_TTL
+VIDEOS_SOFT_TTL = 3600
+SCHEDULE_HARD_TTL = 6 * 3600
+
+# Videos shown per station in the guide
+VIDEOS_PER_STATION = 5
+
+# Cache keys of the public fetch functions, also used by async_api to tell
+# whether a call can be answered from the cache
+def channel_id_cache_key(channel_url: str) -> str:
+    parsed = parse_channel_url(channel_url)
+    return f"channel_id:{_link_key(*parsed) if parsed else channel_url}"
+
+def videos_cache_key(channel_url: str, display_option: str, max_results: int) -> str:
+    return f"videos:{channel_url}:{display_option}:{max_results}"
+
+def channel_videos_cache_key(channel_id: str, max_results: int) -> str:
+    return f"channel_videos:{channel_id}:{max_results}"
+
+def more_videos_cache_key(channel_id: str, page_token: Optional[str], max_results: int) -> str:
+    return f"more_videos:{channel_id}:{page_token}:{max_results}"
+
 def get_channel_id_from_url(channel_url: str) -> Optional[str]:
     """Extract channel ID from various forms of YouTube channel URLs.
     
@@ -57,6 +112,10 @@ def get_channel_id_from_url(channel_url: str) -> Optional[str]:
     - https://www.youtube.com/user/USERNAME
     - https://www.youtube.com/@handle
     
+    Channel IDs are read from the URL itself. Other forms are resolved
+    once with the API and recorded in the catalog's persistent link index,
+    so they are never resolved again, even after a restart.
+    
     Args:
         channel_url: A YouTube channel URL
         
@@ -67,59 +126,119 @@ def get_channel_id_from_url(channel_url: str) -> Optional[str]:
         logger.warning("Empty channel URL provided")
         return None
     
-    # Check cache first    
-    cache_key = f"channel_id:{channel_url}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
+    parsed = parse_channel_url(channel_url)
+    if parsed is None:
+        logger.warning(f"Unsupported YouTube URL format: {channel_url}")
+        return None
+    channel_id = known_channel_id(channel_url)
+    if channel_id:
+        return channel_id
+    
+    # Concurrent misses for the same link share one lookup
+    kind, value = parsed
+    cache_key = channel_id_cache_key(channel_url)
+    return api_cache.get_or_load(cache_key, partial(_resolve_channel_id, kind, value, cache_key))
+
+# Channel URL forms, tried in this order: (kind, pattern capturing the name or ID)
+CHANNEL_URL_PATTERNS = (
+    ('channel', re.compile(r'youtube\.com/channel/([^/?&]+)')),
+    ('custom', re.compile(r'youtube\.com/c/([^/?&]+)')),
+    ('user', re.compile(r'youtube\.com/user/([^/?&]+)')),
+    ('handle', re.compile(r'youtube\.com/@([^/?&]+)'))
+)
+
+@lru_cache(maxsize=4096)
+def parse_channel_url(channel_url: str) -> Optional[Tuple[str, str]]:
+    """Split a channel URL into its form and the channel ID or name in it.
+    
+    Args:
+        channel_url: A YouTube channel URL
         
-    try:
-        # Direct channel ID format: youtube.com/channel/CHANNEL_ID
-        channel_match = re.search(r'youtube\.com/channel/([^/?&]+)', channel_url)
-        if channel_match:
-            channel_id = channel_match.group(1)
-            logger.info(f"Extracted channel ID directly: {channel_id}")
-            api_cache.set(cache_key, channel_id)
-            return channel_id
+    Returns:
+        A (kind, value) tuple, kind being 'channel', 'custom', 'user' or
+        'handle', or None for an unsupported URL
+    """
+    for kind, pattern in CHANNEL_URL_PATTERNS:
+        match = pattern.search(channel_url)
+        if match:
+            return kind, match.group(1)
+    return None
+
+def _link_key(kind: str, value: str) -> str:
+    # Handles are case-insensitive, so every spelling shares one entry
+    return f"{kind}:{value.lower() if kind == 'handle' else value}"
+
+def known_channel_id(channel_url: str) -> Optional[str]:
+    """The channel ID for a URL if it is known without calling the API.
+    
+    That is when the URL contains the ID, or its handle, custom URL or
+    username has been resolved before.
+    
+    Args:
+        channel_url: A YouTube channel URL
         
-        # Handle custom URL format: youtube.com/c/CUSTOM_URL
-        custom_match = re.search(r'youtube\.com/c/([^/?&]+)', channel_url)
-        if custom_match:
-            custom_url = custom_match.group(1)
-            logger.info(f"Extracted custom URL: {custom_url}, searching for channel ID")
-            channel_id = get_channel_id_by_search(custom_url)
-            if channel_id:
-                api_cache.set(cache_key, channel_id)
-            return channel_id
-                
-        # Handle username format: youtube.com/user/USERNAME
-        user_match = re.search(r'youtube\.com/user/([^/?&]+)', channel_url)
-        if user_match:
-            username = user_match.group(1)
-            logger.info(f"Extracted username: {username}, searching for channel ID")
-            channel_id = get_channel_id_by_username(username)
-            if channel_id:
-                api_cache.set(cache_key, channel_id)
-            return channel_id
-                
-        # Handle handle format: youtube.com/@handle
-        handle_match = re.search(r'youtube\.com/@([^/?&]+)', channel_url)
-        if handle_match:
-            handle = handle_match.group(1)
-            logger.info(f"Extracted handle: {handle}, searching for channel ID")
-            channel_id = get_channel_id_by_search(handle)
-            if channel_id:
-                api_cache.set(cache_key, channel_id)
-            return channel_id
-                
-        logger.warning(f"Unsupported YouTube URL format: {channel_url}")
+    Returns:
+        The channel ID, or None if it would have to be resolved
+    """
+    parsed = parse_channel_url(channel_url) if channel_url else None
+    if parsed is None:
         return None
+    kind, value = parsed
+    if kind == 'channel':
+        return value
+    return get_catalog().get_linked_channel_id(_link_key(kind, value))
+
+# Quota units of refreshing one channel link from a cold cache:
+# playlistItems.list, videos.list and channels.list for the uploads playlist
+LINK_REFRESH_QUOTA_COST = 3
+
+def link_quota_cost(channel_url: str) -> int:
+    """Quota units a cold-cache refresh of a channel link costs.
+    
+    One-time work still pending for the link is included: resolving a
+    handle or custom URL (a 100-unit search.list) or a username, and
+    backfilling the channel's catalog (up to CATALOG_BACKFILL_MAX_PAGES
+    pages). Once that is done a link costs LINK_REFRESH_QUOTA_COST.
+    
+    Args:
+        channel_url: A YouTube channel URL
+        
+    Returns:
+        The estimated quota units, 0 for an unsupported URL
+    """
+    parsed = parse_channel_url(channel_url) if channel_url else None
+    if parsed is None:
+        return 0
+    cost = LINK_REFRESH_QUOTA_COST
+    channel_id = known_channel_id(channel_url)
+    if channel_id is None:
+        cost += method_cost('channels.list' if parsed[0] == 'user' else 'search.list')
+    if channel_id is None or not get_catalog().is_backfilled(channel_id):
+        cost += CATALOG_BACKFILL_MAX_PAGES * method_cost('playlistItems.list')
+    return cost
+
+def _resolve_channel_id(kind: str, value: str, cache_key: str) -> Optional[str]:
+    """Resolve a handle, custom URL or username for get_channel_id_from_url with the API."""
+    try:
+        logger.info(f"Resolving {kind} {value} to a channel ID")
+        if kind == 'user':
+            channel_id = get_channel_id_by_username(value)
+        else:
+            # Custom URLs and handles can only be found by searching
+            channel_id = get_channel_id_by_search(value)
+        if channel_id:
+            get_catalog().set_linked_channel_id(_link_key(kind, value), channel_id)
+        # A link that matched no channel is cached as None, not looked up again
+        api_cache.set(cache_key, channel_id, ttl=CHANNEL_ID_TTL)
+        return channel_id
             
     except Exception as e:
-        logger.error(f"Error extracting channel ID from URL: {e}")
+        logger.error(f"Error resolving channel ID for {kind} {value}: {e}")
+        # Cached briefly, so callers right after (such as the view behind an
+        # async load) don't repeat the failing lookup
+        api_cache.set(cache_key, None, ttl=CHANNEL_ID_FAILURE_TTL)
         return None
 
-@retry_on_error(max_retries=3, base_delay=2)
 def get_channel_id_by_search(query: str) -> Optional[str]:
     """Get channel ID by searching for the channel name or custom URL.
     
@@ -129,14 +248,15 @@ def get_channel_id_by_search(query: str) -> Optional[str]:
     Returns:
         The channel ID or None if not found
     """
-    # Check cache first
+    # Check cache first; a search costs 100 quota units, so concurrent misses share one
     cache_key = f"search:{query}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-        
+    return api_cache.get_or_load(cache_key, partial(_search_channel_id, query, cache_key))
+
+@retry_on_error(max_retries=3, base_delay=2)
+def _search_channel_id(query: str, cache_key: str) -> Optional[str]:
+    """Search for a channel for get_channel_id_by_search, bypassing the cache."""
     try:
-        search_response = youtube.search().list(
+        search_response = get_youtube().search().list(
             q=query,
             type='channel',
             part='id',
@@ -146,11 +266,12 @@ def get_channel_id_by_search(query: str) -> Optional[str]:
         if search_response.get('items'):
             channel_id = search_response['items'][0]['id']['channelId']
             logger.info(f"Found channel ID via search: {channel_id}")
-            api_cache.set(cache_key, channel_id)
+            api_cache.set(cache_key, channel_id, ttl=CHANNEL_ID_TTL)
             return channel_id
             
         logger.warning(f"No channel found for search query: {query}")
-        api_cache.set(cache_key, None)  # Cache negative results too
+        # Cached too, so an unknown name isn't searched again (100 units) on every lookup
+        api_cache.set(cache_key, None, ttl=CHANNEL_ID_TTL)
         return None
     except Exception as e:
         logger.error(f"Search API error for query '{query}': {e}")
@@ -169,12 +290,12 @@ def get_channel_id_by_username(username: str) -> Optional[str]:
     """
     # Check cache first
     cache_key = f"username:{username}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
+    found, cached_result = api_cache.lookup(cache_key)
+    if found:
         return cached_result
         
     try:
-        channels_response = youtube.channels().list(
+        channels_response = get_youtube().channels().list(
             forUsername=username,
             part='id'
         ).execute()
@@ -182,19 +303,300 @@ def get_channel_id_by_username(username: str) -> Optional[str]:
         if channels_response.get('items'):
             channel_id = channels_response['items'][0]['id']
             logger.info(f"Found channel ID for username {username}: {channel_id}")
-            api_cache.set(cache_key, channel_id)
+            api_cache.set(cache_key, channel_id, ttl=CHANNEL_ID_TTL)
             return channel_id
             
         logger.warning(f"No channel found for username: {username}")
-        api_cache.set(cache_key, None)  # Cache negative results too
+        # Cached too, so an unknown username isn't looked up again
+        api_cache.set(cache_key, None, ttl=CHANNEL_ID_TTL)
         return None
     except Exception as e:
         logger.error(f"Username lookup error for '{username}': {e}")
         # Let the retry decorator handle retries
         raise
 
-@retry_on_error()
-def get_video_details(video_id: str, minimal: bool = False) -> Optional[Dict[str, Any]]:
+def get_uploads_playlist_id(channel_id: str) -> Optional[str]:
+    """Get the ID of a channel's uploads playlist.
+    
+    The ID never changes for a channel, so it is cached for CHANNEL_ID_TTL.
+    
+    Args:
+        channel_id: YouTube channel ID
+        
+    Returns:
+        The uploads playlist ID or None if the channel wasn't found
+    """
+    cache_key = f"uploads_playlist:{channel_id}"
+    return api_cache.get_or_load(cache_key, partial(_fetch_uploads_playlist_id, channel_id, cache_key))
+
+def _fetch_uploads_playlist_id(channel_id: str, cache_key: str) -> Optional[str]:
+    """Look up the uploads playlist for get_uploads_playlist_id, bypassing the cache."""
+    uploads_list_id = get_catalog().get_uploads_playlist_id(channel_id)
+    if uploads_list_id:
+        api_cache.set(cache_key, uploads_list_id, ttl=CHANNEL_ID_TTL)
+        return uploads_list_id
+        
+    channels_response = get_youtube().channels().list(
+        part='contentDetails',
+        id=channel_id
+    ).execute()
+    
+    if not channels_response.get('items'):
+        logger.warning(f"No channel found with ID: {channel_id}")
+        return None
+        
+    uploads_list_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+    get_catalog().set_uploads_playlist_id(channel_id, uploads_list_id)
+    api_cache.set(cache_key, uploads_list_id, ttl=CHANNEL_ID_TTL)
+    return uploads_list_id
+
+def get_channel_uploads(channel_id: str, page_token: Optional[str] = None, max_results: int = UPLOADS_PAGE_SIZE) -> Dict[str, Any]:
+    """Get one page of a channel's uploads, newest first.
+    
+    Pages come from playlistItems.list on the uploads playlist, which costs
+    1 quota unit instead of the 100 a date-ordered search.list costs. Pages
+    are cached, and concurrent callers asking for the same page share one
+    fetch.
+    
+    Args:
+        channel_id: YouTube channel ID
+        page_token: Token for the page to fetch, None for the newest uploads
+        max_results: Page size, at most 50
+        
+    Returns:
+        Dictionary with the uploads as Video records and next page token if available
+    """
+    cache_key = f"upload_page:{channel_id}:{page_token}:{max_results}"
+    return api_cache.get_or_load(cache_key, partial(_fetch_channel_uploads, channel_id, page_token, max_results, cache_key))
+
+def _fetch_channel_uploads(channel_id: str, page_token: Optional[str], max_results: int, cache_key: str) -> Dict[str, Any]:
+    """Fetch a page of uploads for get_channel_uploads, bypassing the cache."""
+    # The newest full page is served from the channel's synced upload index
+    if page_token is None and max_results == UPLOADS_PAGE_SIZE:
+        index = sync_channel_uploads(channel_id)
+        result = {
+            'items': index['items'][:max_results],
+            'next_page_token': index['next_page_token']
+        }
+        api_cache.set(cache_key, result, ttl=CHANNEL_VIDEOS_TTL)
+        return result
+        
+    uploads_list_id = get_uploads_playlist_id(channel_id)
+    if not uploads_list_id:
+        return {'items': [], 'next_page_token': None}
+        
+    playlist_items_response = get_youtube().playlistItems().list(
+        part='snippet,contentDetails,status',
+        playlistId=uploads_list_id,
+        maxResults=max_results,
+        pageToken=page_token
+    ).execute()
+    
+    # Private uploads are listed too, but can't be played
+    items = [
+        item for item in playlist_items_response.get('items', [])
+        if item.get('status', {}).get('privacyStatus') != 'private'
+    ]
+    # The catalog keeps the full descriptions the records truncate
+    get_catalog().upsert_playlist_items(channel_id, items)
+    
+    result = {
+        'items': [_video_from_playlist_item(item) for item in items],
+        'next_page_token': playlist_items_response.get('nextPageToken')
+    }
+    logger.info(f"Retrieved {len(items)} uploads for channel {channel_id}")
+    api_cache.set(cache_key, result, ttl=CHANNEL_VIDEOS_TTL)
+    return result
+
+def _video_from_playlist_item(item: Dict[str, Any]) -> Video:
+    """The shared Video record for a playlistItems response item."""
+    snippet = item['snippet']
+    return video_record(
+        item['contentDetails']['videoId'],
+        title=snippet.get('title', 'Untitled Video'),
+        description=snippet.get('description') or 'No description available.',
+        thumbnail=snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+        published_at=snippet.get('publishedAt', '')
+    )
+
+def _execute_conditional(request: Any, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Execute an API request with If-None-Match set to a previous ETag.
+    
+    Args:
+        request: An unexecuted googleapiclient request
+        etag: ETag of the previous response, or None for a plain request
+        
+    Returns:
+        The response, or None if the resource was not modified
+    """
+    if etag:
+        request.headers['If-None-Match'] = etag
+    try:
+        return request.execute()
+    except googleapiclient.errors.HttpError as e:
+        if etag and e.resp.status == 304:
+            return None
+        raise
+
+def sync_channel_uploads(channel_id: str) -> Dict[str, Any]:
+    """Bring a channel's local upload index up to date.
+    
+    The first uploads page is requested conditionally with the ETag from the
+    previous sync; a 304 means nothing changed and the index is reused as is.
+    Otherwise only the uploads newer than the last one seen are taken from
+    the response (walking further pages if needed) and merged in front of
+    the index.
+    
+    Args:
+        channel_id: YouTube channel ID
+        
+    Returns:
+        The upload index: Video records newest first, the first page's ETag
+        and next page token, and the newest video ID seen
+    """
+    index_key = f"upload_videos:{channel_id}"
+    index = api_cache.get(index_key)
+    
+    uploads_list_id = get_uploads_playlist_id(channel_id)
+    if not uploads_list_id:
+        return {'items': [], 'etag': None, 'next_page_token': None, 'last_video_id': None}
+        
+    request = get_youtube().playlistItems().list(
+        part='snippet,contentDetails,status',
+        playlistId=uploads_list_id,
+        maxResults=UPLOADS_PAGE_SIZE
+    )
+    try:
+        first_page = _execute_conditional(request, index['etag'] if index else None)
+    except QuotaUnavailableError as e:
+        if not index:
+            raise
+        # The API is unavailable; the last synced index is the best we have
+        logger.warning(f"Using last synced uploads for channel {channel_id}: {e}")
+        return index
+    if first_page is None:
+        logger.info(f"Uploads not modified for channel {channel_id}")
+        return index
+        
+    last_seen_id = index['last_video_id'] if index else None
+    new_items = []
+    page = first_page
+    pages = 1
+    while True:
+        found_last_seen = False
+        for item in page.get('items', []):
+            if item['contentDetails']['videoId'] == last_seen_id:
+                found_last_seen = True
+                break
+            new_items.append(item)
+        if found_last_seen or not last_seen_id or not page.get('nextPageToken') or pages >= UPLOAD_SYNC_MAX_PAGES:
+            break
+        page = get_youtube().playlistItems().list(
+            part='snippet,contentDetails,status',
+            playlistId=uploads_list_id,
+            maxResults=UPLOADS_PAGE_SIZE,
+            pageToken=page['nextPageToken']
+        ).execute()
+        pages += 1
+        
+    new_ids = {item['contentDetails']['videoId'] for item in new_items}
+    # Private uploads are listed too, but can't be played
+    merged = [
+        item for item in new_items
+        if item.get('status', {}).get('privacyStatus') != 'private'
+    ]
+    get_catalog().upsert_playlist_items(channel_id, merged)
+    merged = [_video_from_playlist_item(item) for item in merged]
+    if index:
+        merged.extend(video for video in index['items'] if video['id'] not in new_ids)
+        
+    first_items = first_page.get('items', [])
+    index = {
+        'items': merged[:UPLOAD_INDEX_MAX_ITEMS],
+        'etag': first_page.get('etag'),
+        'next_page_token': first_page.get('nextPageToken'),
+        'last_video_id': first_items[0]['contentDetails']['videoId'] if first_items else last_seen_id
+    }
+    logger.info(f"Synced {len(new_items)} new uploads for channel {channel_id}")
+    api_cache.set(index_key, index, ttl=UPLOAD_INDEX_TTL)
+    return index
+
+def backfill_channel_catalog(channel_id: str) -> None:
+    """Load a channel's older uploads into the catalog, once per channel.
+    
+    Walks the uploads playlist from the newest page for up to
+    CATALOG_BACKFILL_MAX_PAGES pages (1 quota unit each).
+    
+    Args:
+        channel_id: YouTube channel ID
+    """
+    if get_catalog().is_backfilled(channel_id):
+        return
+        
+    # Each page is stored in the catalog as it is fetched
+    page_token = None
+    for _ in range(CATALOG_BACKFILL_MAX_PAGES):
+        page = get_channel_uploads(channel_id, page_token=page_token)
+        page_token = page['next_page_token']
+        if not page_token:
+            break
+            
+    get_catalog().mark_backfilled(channel_id)
+    logger.info(f"Backfilled catalog with {get_catalog().count_videos(channel_id)} videos for channel {channel_id}")
+
+def refresh_view_counts(channel_id: str) -> None:
+    """Refresh catalog view counts older than VIEW_COUNT_MAX_AGE for a channel.
+    
+    Args:
+        channel_id: YouTube channel ID
+    """
+    stale_ids = get_catalog().get_stale_stats_ids(channel_id, VIEW_COUNT_MAX_AGE)
+    for start in range(0, len(stale_ids), MAX_IDS_PER_VIDEOS_REQUEST):
+        chunk = stale_ids[start:start + MAX_IDS_PER_VIDEOS_REQUEST]
+        videos_response = get_youtube().videos().list(
+            part='statistics',  # Only fetch statistics to reduce data size
+            id=','.join(chunk)
+        ).execute()
+        view_counts = {video_id: 0 for video_id in chunk}
+        for item in videos_response.get('items', []):
+            view_counts[item['id']] = int(item.get('statistics', {}).get('viewCount', 0))
+        get_catalog().set_view_counts(view_counts)
+    if stale_ids:
+        logger.info(f"Refreshed view counts for {len(stale_ids)} videos of channel {channel_id}")
+
+def _build_video_details(video: Dict[str, Any], minimal: bool) -> Video:
+    """Build the video's shared record from a videos.list response item.
+    
+    Args:
+        video: A single item from a videos.list response
+        minimal: If True, only the duration is taken from the item
+        
+    Returns:
+        The Video record with the details filled in
+    """
+    video_id = video['id']
+    content_details = video['contentDetails']
+    
+    # Parse duration from ISO 8601 format (e.g., PT1H30M15S)
+    duration_str = content_details.get('duration', 'PT0M0S')
+    duration_min = parse_iso_duration_to_minutes(duration_str)
+    
+    # Minimal details only carry the duration (and whatever the record already knows)
+    if minimal:
+        return video_record(video_id, duration=duration_min)
+        
+    snippet = video['snippet']
+    return video_record(
+        video_id,
+        title=snippet.get('title', 'Untitled Video'),
+        description=snippet.get('description') or 'No description available.',
+        thumbnail=snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+        published_at=snippet.get('publishedAt', ''),
+        duration=duration_min
+    )
+
+@timed()
+def get_video_details(video_id: str, minimal: bool = False) -> Optional[Video]:
     """Get detailed information about a video including description.
     
     Args:
@@ -202,167 +604,158 @@ def get_video_details(video_id: str, minimal: bool = False) -> Optional[Dict[str
         minimal: If True, fetch only essential fields (reduces API quota usage)
         
     Returns:
-        A dictionary with video details or None if not found
+        The video's Video record or None if not found
     """
+    return get_video_details_bulk([video_id], minimal=minimal).get(video_id)
+
+@timed()
+@retry_on_error()
+def get_video_details_bulk(video_ids: List[str], minimal: bool = False) -> Dict[str, Optional[Video]]:
+    """Get detailed information about several videos at once.
+    
+    Every ID is looked up in the cache first; only the misses are fetched,
+    using one videos.list call per chunk of up to 50 IDs. Each result is
+    cached under the same key that get_video_details uses. The cached
+    details are the videos' shared records, so caching them costs a
+    reference rather than a copy.
+    
+    Args:
+        video_ids: The YouTube video IDs
+        minimal: If True, fetch only essential fields (reduces API quota usage)
+        
+    Returns:
+        A dictionary mapping each video ID to its Video record, or None if not found
+    """
+    results = {}
+    missing_ids = []
+    
     # Check cache first
-    cache_key = f"video:{video_id}:{minimal}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
+    for video_id in dict.fromkeys(video_ids):
+        # A cached None is a video known not to exist
+        found, cached_result = api_cache.lookup(f"video:{video_id}:{minimal}")
+        if found:
+            results[video_id] = cached_result
+        else:
+            missing_ids.append(video_id)
+            
+    # Durations never change, so minimal details can come from the catalog
+    if minimal and missing_ids:
+        for video_id, duration_min in get_catalog().get_durations(missing_ids).items():
+            details = video_record(video_id, duration=duration_min)
+            results[video_id] = details
+            api_cache.set(f"video:{video_id}:{minimal}", details, ttl=VIDEO_DETAILS_TTL)
+        missing_ids = [video_id for video_id in missing_ids if video_id not in results]
+        
+    if not missing_ids:
+        return results
         
     try:
         # Use minimal part list if minimal flag is set to reduce data processing
         parts = 'snippet,contentDetails' if not minimal else 'contentDetails'
         
-        video_response = youtube.videos().list(
-            part=parts,
-            id=video_id
-        ).execute()
-        
-        if not video_response.get('items'):
-            logger.warning(f"No details found for video ID: {video_id}")
-            api_cache.set(cache_key, None)
-            return None
+        for start in range(0, len(missing_ids), MAX_IDS_PER_VIDEOS_REQUEST):
+            chunk = missing_ids[start:start + MAX_IDS_PER_VIDEOS_REQUEST]
+            video_response = get_youtube().videos().list(
+                part=parts,
+                id=','.join(chunk)
+            ).execute()
             
-        video = video_response['items'][0]
-        content_details = video['contentDetails']
-        
-        # Parse duration from ISO 8601 format (e.g., PT1H30M15S)
-        duration_str = content_details.get('duration', 'PT0M0S')
-        duration_min = parse_iso_duration_to_minutes(duration_str)
-        
-        # Create minimal detail object if minimal flag is set
-        if minimal:
-            details = {
-                'id': video_id,
-                'duration': duration_min,
-                'duration_str': format_duration(duration_min)
-            }
-        else:
-            snippet = video['snippet']
-            details = {
-                'id': video_id,
-                'title': snippet.get('title', 'Untitled Video'),
-                'description': snippet.get('description', 'No description available.'),
-                'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                'publishedAt': snippet.get('publishedAt', ''),
-                'duration': duration_min,
-                'duration_str': format_duration(duration_min)
-            }
-        
-        logger.info(f"Successfully retrieved {'minimal ' if minimal else ''}details for video ID: {video_id}")
-        api_cache.set(cache_key, details)
-        return details
+            for video in video_response.get('items', []):
+                details = _build_video_details(video, minimal)
+                results[video['id']] = details
+                api_cache.set(f"video:{video['id']}:{minimal}", details, ttl=VIDEO_DETAILS_TTL)
+            get_catalog().set_durations({
+                video_id: details['duration'] for video_id, details in results.items()
+                if video_id in chunk and details
+            })
+                
+            not_found_ids = [video_id for video_id in chunk if video_id not in results]
+            for video_id in not_found_ids:
+                logger.warning(f"No details found for video ID: {video_id}")
+                results[video_id] = None
+                api_cache.set(f"video:{video_id}:{minimal}", None, ttl=VIDEO_DETAILS_TTL)
+            # Deleted videos shouldn't be scheduled again
+            get_catalog().delete_videos(not_found_ids)
+                    
+        logger.info(f"Successfully retrieved {'minimal ' if minimal else ''}details for {len(missing_ids)} videos")
+        return results
+    except QuotaUnavailableError as e:
+        # Callers fall back to default durations for the videos left out
+        logger.warning(f"Returning cached details only for {len(video_ids)} videos: {e}")
+        return results
     except Exception as e:
-        logger.error(f"Error fetching video details for ID {video_id}: {e}")
+        logger.error(f"Error fetching video details for IDs {missing_ids}: {e}")
         # Let the retry decorator handle retries
         raise
 
-@retry_on_error(max_retries=3)
-def get_videos_for_channel(channel_url: str, display_option: str = 'random', max_results: int = 5) -> List[Dict[str, Any]]:
+@timed()
+def get_videos_for_channel(channel_url: str, display_option: str = 'random', max_results: int = 5) -> List[Video]:
     """Get videos from a YouTube channel based on the display option.
     
+    Results are cached stale-while-revalidate: after VIDEOS_SOFT_TTL the
+    cached list is still returned while a background refresh runs.
+    
     Args:
         channel_url: The URL of the YouTube channel.
         display_option: 'random', 'popular', or 'new'.
         max_results: Maximum number of videos to return.
         
     Returns:
-        A list of video objects with title, thumbnail, description, and link.
+        A list of Video records with title, thumbnail, description, and link.
     """
     # Add cache key for this specific query
-    cache_key = f"videos:{channel_url}:{display_option}:{max_results}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-        
+    cache_key = videos_cache_key(channel_url, display_option, max_results)
+    return api_cache.get_or_refresh(
+        cache_key,
+        partial(_fetch_videos_for_channel, channel_url, display_option, max_results),
+        soft_ttl=VIDEOS_SOFT_TTL,
+        hard_ttl=SCHEDULE_HARD_TTL
+    )
+
+@retry_on_error(max_retries=3)
+def _fetch_videos_for_channel(channel_url: str, display_option: str, max_results: int) -> List[Video]:
+    """Fetch videos for get_videos_for_channel from the API, bypassing the cache."""
     channel_id = get_channel_id_from_url(channel_url)
     if not channel_id:
         logger.warning(f"Could not extract channel ID from URL: {channel_url}")
         return []
     
     try:
-        # Get the channel's uploads playlist ID
-        channels_response = youtube.channels().list(
-            part='contentDetails',
-            id=channel_id
-        ).execute()
-        
-        if not channels_response['items']:
-            logger.warning(f"No channel found with ID: {channel_id}")
-            api_cache.set(cache_key, [])
-            return []
+        try:
+            # Bring the catalog up to date: the newest uploads, then the full history once
+            get_channel_uploads(channel_id)
+            backfill_channel_catalog(channel_id)
+            if display_option == 'popular':
+                refresh_view_counts(channel_id)
+        except QuotaUnavailableError as e:
+            # Schedule from what the catalog already holds until the API recovers
+            logger.warning(f"Using catalog data for channel {channel_id}: {e}")
             
-        uploads_list_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        
-        # Get videos from the uploads playlist - reduced max results
-        playlist_items_response = youtube.playlistItems().list(
-            part='snippet,contentDetails',
-            playlistId=uploads_list_id,
-            maxResults=min(MAX_VIDEOS_PER_REQUEST, max(10, max_results * 2))  # Fetch more than needed but with a cap
-        ).execute()
+        # Sort or filter videos based on display_option, over the channel's whole history
+        videos = get_catalog().query_videos(channel_id, order=display_option, limit=max_results)
         
-        videos = playlist_items_response['items']
+        # Get minimal video details (just duration) for all selected videos in one batch
+        details_by_id = get_video_details_bulk(
+            [video['video_id'] for video in videos],
+            minimal=True
+        )
         
-        # Sort or filter videos based on display_option
-        if display_option == 'popular':
-            # Get video statistics to sort by view count
-            video_ids = [item['contentDetails']['videoId'] for item in videos]
-            
-            if video_ids:
-                videos_response = youtube.videos().list(
-                    part='statistics',  # Only fetch statistics to reduce data size
-                    id=','.join(video_ids[:min(len(video_ids), 30)])  # API limitation + reduced limit
-                ).execute()
-                
-                # Map video statistics to the original video items
-                video_details = {item['id']: item for item in videos_response['items']}
-                
-                # Sort videos by view count (descending)
-                videos = sorted(
-                    videos, 
-                    key=lambda x: int(video_details.get(x['contentDetails']['videoId'], {}).get('statistics', {}).get('viewCount', 0)), 
-                    reverse=True
-                )
-                
-        elif display_option == 'new':
-            # Sort by published date (descending)
-            videos = sorted(
-                videos, 
-                key=lambda x: x['snippet']['publishedAt'], 
-                reverse=True
-            )
-            
-        elif display_option == 'random':
-            # Randomize the videos
-            random.shuffle(videos)
-        
-        # Prepare the results (limited to max_results)
+        # Prepare the results (limited to max_results), sharing each video's record
         results = []
-        for video in videos[:max_results]:
-            video_id = video['contentDetails']['videoId']
-            snippet = video['snippet']
-            
-            # Get minimal video details first (just duration)
-            video_details = get_video_details(video_id, minimal=True)
-            
-            # Create video object with basic info
-            video_obj = {
-                'id': video_id,
-                'title': snippet['title'],
-                'description': snippet.get('description', 'No description available.'),
-                'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                'link': f'https://www.youtube.com/watch?v={video_id}',
-                'publishedAt': snippet['publishedAt'],
-                'duration': video_details.get('duration', 30) if video_details else 30,
-                'duration_str': video_details.get('duration_str', '30m') if video_details else '30m'
-            }
-            results.append(video_obj)
+        for video in videos:
+            video_id = video['video_id']
+            video_details = details_by_id.get(video_id)
+            results.append(video_record(
+                video_id,
+                title=video['title'],
+                description=video['description'] or 'No description available.',
+                thumbnail=video['thumbnail'] or '',
+                published_at=video['published_at'],
+                view_count=video['view_count'] or 0,
+                duration=video_details.get('duration', 30) if video_details else 30
+            ))
             
         logger.info(f"Successfully retrieved {len(results)} videos for channel {channel_id}")
-        
-        # Cache the results
-        api_cache.set(cache_key, results)
         return results
         
     except Exception as e:
@@ -370,27 +763,26 @@ def get_videos_for_channel(channel_url: str, display_option: str = 'random', max
         # Let the retry decorator handle retries
         raise
 
-def batch_get_videos(channel_urls: List[str], display_option: str, max_results: int) -> List[Dict[str, Any]]:
-    """Batch process multiple channel URLs to get videos.
+def _combine_link_results(channel_urls: List[str], link_results: List[Any], display_option: str, max_results: int) -> List[Video]:
+    """Merge the per-link results of one station into its video list.
     
     Args:
-        channel_urls: List of YouTube channel URLs
+        channel_urls: The station's YouTube channel URLs
+        link_results: One video list or exception per URL, in the same order
         display_option: Display option for sorting videos
-        max_results: Maximum results per channel
+        max_results: Maximum results for the station
         
     Returns:
-        Combined list of videos from all channels
+        Combined list of videos from all links that succeeded
     """
     all_videos = []
     
-    for url in channel_urls:
-        try:
-            videos = get_videos_for_channel(url, display_option, max_results)
-            all_videos.extend(videos)
-        except Exception as e:
-            logger.error(f"Error getting videos for channel URL {url}: {e}")
+    for url, videos in zip(channel_urls, link_results):
+        if isinstance(videos, Exception):
+            logger.error(f"Error getting videos for channel URL {url}: {videos}")
             # Continue with other URLs even if one fails
             continue
+        all_videos.extend(videos)
             
     # Apply sorting based on display option to the combined results
     if display_option == 'popular' and all_videos:
@@ -402,107 +794,142 @@ def batch_get_videos(channel_urls: List[str], display_option: str, max_results:
         
     return all_videos[:max_results]
 
-def get_videos_for_channels(channels_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def batch_get_videos(channel_urls: List[str], display_option: str, max_results: int, deadline: Optional[float] = None) -> List[Video]:
+    """Batch process multiple channel URLs to get videos.
+    
+    The URLs are fetched concurrently on the shared fetch pool.
+    
+    Args:
+        channel_urls: List of YouTube channel URLs
+        display_option: Display option for sorting videos
+        max_results: Maximum results per channel
+        deadline: time.monotonic() value after which slow links are skipped
+        
+    Returns:
+        Combined list of videos from all channels
+    """
+    link_results = fetch_all(
+        [partial(get_videos_for_channel, url, display_option, max_results) for url in channel_urls],
+        deadline=deadline
+    )
+    return _combine_link_results(channel_urls, link_results, display_option, max_results)
+
+def get_videos_for_channels(channels_data: List[Dict[str, Any]], deadline: Optional[float] = None) -> List[Dict[str, Any]]:
     """Get videos for multiple channels based on their display options.
     
+    Every link of every station is fetched concurrently; the results keep
+    the station order of channels_data.
+    
     Args:
         channels_data: List of channel data dictionaries
+        deadline: time.monotonic() value after which slow links are skipped
         
     Returns:
         List of channel data with videos included
     """
-    result = []
+    tasks = [
+        partial(get_videos_for_channel, url, channel['displayOption'], VIDEOS_PER_STATION)
+        for channel in channels_data
+        for url in channel['youtubeLinks']
+    ]
+    link_results = fetch_all(tasks, deadline=deadline)
+    return _assemble_stations(channels_data, link_results)
+
+def _assemble_stations(channels_data: List[Dict[str, Any]], link_results: List[Any]) -> List[Dict[str, Any]]:
+    """Split flat per-link results back into stations, as get_videos_for_channels returns them.
     
+    Args:
+        channels_data: List of channel data dictionaries
+        link_results: One video list or exception per link of every station, in order
+        
+    Returns:
+        List of channel data with videos included
+    """
+    result = []
+    offset = 0
     for channel in channels_data:
+        channel_urls = channel['youtubeLinks']
+        station_results = link_results[offset:offset + len(channel_urls)]
+        offset += len(channel_urls)
+        
+        # Create a copy of the channel data and add videos
+        channel_copy = channel.copy()
         try:
-            # Use the batch processing function to get videos for all links in this channel
-            channel_videos = batch_get_videos(
-                channel_urls=channel['youtubeLinks'],
-                display_option=channel['displayOption'],
-                max_results=5  # Limit to 5 videos per channel
+            channel_copy['videos'] = _combine_link_results(
+                channel_urls, station_results, channel['displayOption'], VIDEOS_PER_STATION
             )
-            
-            # Create a copy of the channel data and add videos
-            channel_copy = channel.copy()
-            channel_copy['videos'] = channel_videos
-            result.append(channel_copy)
-            
         except Exception as e:
             logger.error(f"Error processing channel {channel.get('name')}: {e}")
             # Add the channel without videos to avoid breaking the UI
-            channel_copy = channel.copy()
             channel_copy['videos'] = []
-            result.append(channel_copy)
+        result.append(channel_copy)
     
     return result
 
-@retry_on_error(max_retries=2)
-def get_channel_videos(channel_id: str, max_results: int = DEFAULT_MAX_SCHEDULE_VIDEOS) -> List[Dict[str, Any]]:
+@timed()
+def get_channel_videos(channel_id: str, max_results: int = DEFAULT_MAX_SCHEDULE_VIDEOS) -> List[Optional[Video]]:
     """
     Get videos for a channel, distributed across time slots.
     Returns videos to fill the schedule.
     
+    Results are cached stale-while-revalidate: after CHANNEL_VIDEOS_TTL the
+    cached schedule is still returned while a background refresh runs.
+    
     Args:
         channel_id: YouTube channel ID
         max_results: Maximum number of videos to return (default reduced to 12 hours ahead)
         
     Returns:
-        List of video data dictionaries
+        List of Video records, padded with None up to max_results
     """
     # Add cache key for this specific request
-    cache_key = f"channel_videos:{channel_id}:{max_results}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-    
-    base_url = "https://www.googleapis.com/youtube/v3/search"
-    params = {
-        'key': API_KEY,
-        'channelId': channel_id,
-        'part': 'snippet',
-        'order': 'date',
-        'type': 'video',
-        'maxResults': max_results
-    }
+    cache_key = channel_videos_cache_key(channel_id, max_results)
+    return api_cache.get_or_refresh(
+        cache_key,
+        partial(_fetch_channel_videos, channel_id, max_results),
+        soft_ttl=CHANNEL_VIDEOS_TTL,
+        hard_ttl=SCHEDULE_HARD_TTL
+    )
 
+@retry_on_error(max_retries=2)
+def _fetch_channel_videos(channel_id: str, max_results: int) -> List[Optional[Video]]:
+    """Fetch videos for get_channel_videos from the API, bypassing the cache."""
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        # Sync the newest uploads into the catalog, then read them back newest first
+        try:
+            get_channel_uploads(channel_id)
+        except QuotaUnavailableError as e:
+            logger.warning(f"Using catalog data for channel {channel_id}: {e}")
+        items = get_catalog().query_videos(channel_id, order='new', limit=max_results)
+        
+        # Get only minimal video details (duration only) in one batch
+        details_by_id = get_video_details_bulk(
+            [item['video_id'] for item in items],
+            minimal=True
+        )
 
+        # is_current is set on the schedule engine's copies, not on the shared records
         videos = []
-        for item in data.get('items', []):
-            video_id = item['id']['videoId']
-            
-            # Get only minimal video details (duration only)
-            video_details = get_video_details(video_id, minimal=True) or {}
-            
-            video = {
-                'id': video_id,
-                'title': item['snippet']['title'],
-                'description': item['snippet'].get('description', 'No description available.'),
-                'thumbnail': item['snippet']['thumbnails']['medium']['url'],
-                'publishedAt': item['snippet']['publishedAt'],
-                'is_current': False,  # Will be set by the app based on current time
-                'duration': video_details.get('duration', 30),
-                'duration_str': video_details.get('duration_str', '30m')
-            }
-            videos.append(video)
+        for item in items:
+            video_id = item['video_id']
+            video_details = details_by_id.get(video_id) or {}
+            videos.append(video_record(
+                video_id,
+                title=item['title'],
+                description=item['description'] or 'No description available.',
+                thumbnail=item['thumbnail'] or '',
+                published_at=item['published_at'],
+                view_count=item['view_count'],
+                duration=video_details.get('duration', 30)
+            ))
 
         # Pad with None if we don't have enough videos
         while len(videos) < max_results:
             videos.append(None)
 
         logger.info(f"Successfully retrieved {len(videos)} videos for channel {channel_id}")
-        
-        # Cache the results
-        api_cache.set(cache_key, videos)
         return videos
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error fetching videos for channel {channel_id}: {str(e)}")
-        # Let the retry decorator handle retries
-        raise
     except Exception as e:
         logger.error(f"Unexpected error fetching videos for channel {channel_id}: {str(e)}")
         # Let the retry decorator handle retries
@@ -522,51 +949,36 @@ def load_more_channel_videos(channel_id: str, page_token: str, max_results: int
     Returns:
         Dictionary with videos list and next page token if available
     """
-    cache_key = f"more_videos:{channel_id}:{page_token}:{max_results}"
-    cached_result = api_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-    
-    base_url = "https://www.googleapis.com/youtube/v3/search"
-    params = {
-        'key': API_KEY,
-        'channelId': channel_id,
-        'part': 'snippet',
-        'order': 'date',
-        'type': 'video',
-        'maxResults': max_results,
-        'pageToken': page_token
-    }
-    
+    cache_key = more_videos_cache_key(channel_id, page_token, max_results)
+    return api_cache.get_or_load(cache_key, partial(_fetch_more_channel_videos, channel_id, page_token, max_results, cache_key))
+
+def _fetch_more_channel_videos(channel_id: str, page_token: str, max_results: int, cache_key: str) -> Dict[str, Any]:
+    """Fetch a page of videos for load_more_channel_videos, bypassing the cache."""
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        uploads = get_channel_uploads(channel_id, page_token=page_token, max_results=max_results)
+        items = uploads['items']
         
+        # Only get minimal details, in one batch
+        details_by_id = get_video_details_bulk(
+            [item['id'] for item in items],
+            minimal=True
+        )
+        
+        # The uploads page already holds each video's record; add its duration
         videos = []
-        for item in data.get('items', []):
-            video_id = item['id']['videoId']
-            # Only get minimal details
-            video_details = get_video_details(video_id, minimal=True) or {}
-            
-            video = {
-                'id': video_id,
-                'title': item['snippet']['title'],
-                'thumbnail': item['snippet']['thumbnails']['medium']['url'],
-                'publishedAt': item['snippet']['publishedAt'],
-                'duration': video_details.get('duration', 30),
-                'duration_str': video_details.get('duration_str', '30m')
-            }
-            videos.append(video)
+        for item in items:
+            video_details = details_by_id.get(item['id']) or {}
+            videos.append(video_record(item['id'], duration=video_details.get('duration', 30)))
         
         result = {
             'videos': videos,
-            'next_page_token': data.get('nextPageToken')
+            'next_page_token': uploads['next_page_token']
         }
         
-        api_cache.set(cache_key, result)
+        # Pages shift as new uploads arrive, so they live as long as the uploads pages
+        api_cache.set(cache_key, result, ttl=CHANNEL_VIDEOS_TTL)
         return result
         
     except Exception as e:
         logger.error(f"Error loading more videos for channel {channel_id}: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -1,6 +1,7 @@
 import os
 import logging
-import googleapiclient.discovery
+import threading
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
 logger = logging.getLogger('youtube_api')
@@ -8,22 +9,70 @@ logger = logging.getLogger('youtube_api')
 # Load environment variables
 load_dotenv()
 
-# Get API key from environment
-API_KEY = os.getenv('VITE_YT_API_KEY')
-
-if not API_KEY:
-    logger.error("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
-    raise ValueError("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
-
-# Initialize YouTube API client with explicit API key authentication
-try:
-    youtube = googleapiclient.discovery.build(
-        'youtube', 
-        'v3', 
-        developerKey=API_KEY,
-        static_discovery=False
-    )
-    logger.info("YouTube API client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize YouTube API client: {e}")
-    raise
+# The client is built on first use rather than at import, so the app (and
+# tests) can start without an API key, network access or the discovery parse
+_youtube = None
+_youtube_lock = threading.Lock()
+
+# Root URL of the API, e.g. the local stand-in used by benchmarks/fake_youtube.py;
+# empty for the real YouTube Data API
+YOUTUBE_API_ENDPOINT = os.getenv('YOUTUBE_API_ENDPOINT', '')
+
+def get_api_key():
+    """Return the YouTube API key, raising ValueError if it isn't configured."""
+    api_key = os.getenv('VITE_YT_API_KEY')
+    if not api_key:
+        logger.error("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
+        raise ValueError("YouTube API key not found. Make sure you have a .env file with VITE_YT_API_KEY set.")
+    return api_key
+
+def get_youtube():
+    """Return the shared YouTube API client, building it on first use."""
+    global _youtube
+    if _youtube is None:
+        with _youtube_lock:
+            if _youtube is None:
+                _youtube = _build_client(get_api_key())
+    return _youtube
+
+def _build_client(api_key):
+    # Deferred: googleapiclient.discovery is the slowest import in the package
+    import googleapiclient.discovery
+    from googleapiclient.errors import UnknownApiNameOrVersion
+    from .transport import get_transport
+
+    client_options = None
+    if YOUTUBE_API_ENDPOINT:
+        if urlsplit(YOUTUBE_API_ENDPOINT).scheme in ('http', 'https'):
+            client_options = {'api_endpoint': YOUTUBE_API_ENDPOINT}
+        else:
+            logger.warning(f"Ignoring YOUTUBE_API_ENDPOINT={YOUTUBE_API_ENDPOINT!r}: not an http(s) URL")
+
+    # Initialize YouTube API client with explicit API key authentication
+    try:
+        try:
+            # Discovery document bundled with google-api-python-client, no fetch
+            youtube = googleapiclient.discovery.build(
+                'youtube',
+                'v3',
+                developerKey=api_key,
+                # Shared pooled transport; safe to use from every fetch thread
+                http=get_transport(),
+                client_options=client_options,
+                static_discovery=True
+            )
+        except UnknownApiNameOrVersion:
+            logger.warning("No bundled YouTube discovery document, fetching it instead")
+            youtube = googleapiclient.discovery.build(
+                'youtube',
+                'v3',
+                developerKey=api_key,
+                http=get_transport(),
+                client_options=client_options,
+                static_discovery=False
+            )
+        logger.info("YouTube API client initialized successfully")
+        return youtube
+    except Exception as e:
+        logger.error(f"Failed to initialize YouTube API client: {e}")
+        raise